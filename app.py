@@ -6,10 +6,10 @@
 # ============================================================
 
 import streamlit as st
-import joblib
 
 from champion_challenger_engine import run_champion_challenger
 from reason_codes import get_reason_codes
+from model_registry import load_lr_bundle
 
 
 # ============================================================
@@ -44,7 +44,7 @@ st.divider()
 # LOAD LR MODEL (FOR DEBUG + REASON CODES)
 # ============================================================
 
-lr_bundle = joblib.load("model.joblib")
+lr_bundle = load_lr_bundle()
 lr_model = lr_bundle["model"]
 
 
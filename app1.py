@@ -6,11 +6,11 @@
 # ============================================================
 
 import streamlit as st
-import joblib
 
 from champion_challenger_engine import run_champion_challenger
 # from woe_transformer import transform_user_input_to_woe
 from reason_codes import get_reason_codes
+from model_registry import load_lr_bundle
 
 
 # ============================================================
@@ -50,7 +50,7 @@ st.divider()
 # LOAD LR MODEL (FOR REASON CODES ONLY)
 # ============================================================
 
-lr_bundle = joblib.load("model.joblib")
+lr_bundle = load_lr_bundle()
 lr_model = lr_bundle["model"]
 
 
@@ -0,0 +1,90 @@
+# ============================================================
+# batch_scoring.py
+# ------------------------------------------------------------
+# Batch scoring CLI
+# Raw portfolio CSV -> Champion–Challenger scores CSV,
+# streamed in chunks through run_champion_challenger_batch
+# ============================================================
+
+import pandas as pd
+
+from champion_challenger_engine import run_champion_challenger_batch
+from low_memory_scoring import LowMemoryScorer, decode
+from profiling import RequestProfiler
+
+
+def score_csv(
+    in_path: str,
+    out_path: str,
+    chunksize: int = 50_000,
+    profiler: RequestProfiler | None = None,
+    low_memory: bool = False
+) -> int:
+    """
+    Score a raw CSV chunk by chunk and append the results
+    (input columns + model outputs) to out_path.
+
+    low_memory=True scores through LowMemoryScorer (reused
+    float32 buffers, no intermediate feature DataFrames).
+
+    Returns
+    -------
+    int
+        Rows scored
+    """
+    if low_memory:
+        scorer = LowMemoryScorer(chunksize)
+
+        def score(chunk):
+            return decode(scorer.score_chunk(chunk), chunk.index)
+    else:
+        score = run_champion_challenger_batch
+
+    rows = 0
+    for i, chunk in enumerate(pd.read_csv(in_path, chunksize=chunksize)):
+        if profiler is not None:
+            with profiler.profile("chunk"):
+                scored = score(chunk)
+        else:
+            scored = score(chunk)
+
+        pd.concat([chunk, scored], axis=1).to_csv(
+            out_path, mode="w" if i == 0 else "a", header=(i == 0), index=False
+        )
+        rows += len(chunk)
+    return rows
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Score a portfolio CSV")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    parser.add_argument("--profile-rate", type=float, default=0.0,
+                        help="fraction of chunks to profile (0 = off)")
+    parser.add_argument("--profile-dir", default="profiles")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="also run tracemalloc in profiled chunks (slows every thread while active)")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="float32 reusable buffers, no feature DataFrames")
+    args = parser.parse_args()
+
+    profiler = None
+    if args.profile_rate > 0:
+        profiler = RequestProfiler(
+            args.profile_rate, args.profile_dir, trace_memory=args.profile_memory
+        )
+
+    n = score_csv(args.input, args.output, args.chunksize, profiler, args.low_memory)
+    print(f"{n} rows scored -> {args.output}")
+
+    if profiler is not None:
+        for kind, path in profiler.dump().items():
+            print(f"{kind:>12}: {path}")
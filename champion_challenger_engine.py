@@ -6,11 +6,23 @@
 # XGBoost (Challenger)
 # ============================================================
 
-import joblib
-
-from feature_pipeline import prepare_lr_input, prepare_xgb_input
+import pandas as pd
+
+from feature_pipeline import (
+    prepare_lr_input,
+    prepare_xgb_input,
+    prepare_lr_input_batch,
+    prepare_xgb_input_batch,
+)
 from scorecard import pd_to_score
-from decision_engine import make_decision
+from latency import stage
+from model_registry import load_lr_bundle, load_xgb_model, load_pd_calibration
+from pd_calibration import calibrate
+from decision_engine import (
+    make_decision,
+    score_to_decision_batch,
+    score_to_risk_band_batch,
+)
 
 
 # ============================================================
@@ -18,22 +30,28 @@ from decision_engine import make_decision
 # ============================================================
 
 # Logistic Regression model bundle
-lr_bundle = joblib.load("model.joblib")
+lr_bundle = load_lr_bundle()
 lr_model = lr_bundle["model"]
 
 # XGBoost model
-xgb_model = joblib.load("xgb_model.joblib")
+xgb_model = load_xgb_model()
+
+# Optional PD calibration tables ({} = raw PDs)
+calibrators = load_pd_calibration()
 
 
 # ============================================================
 # Champion–Challenger Runner
 # ============================================================
 
-def run_champion_challenger(user_input: dict) -> dict:
+def run_champion_challenger(user_input: dict, decision_log=None) -> dict:
     """
     Run both Logistic Regression (Champion)
     and XGBoost (Challenger) for a borrower.
 
+    decision_log : decision_log.DecisionLog, optional
+        Shadow log; the result is enqueued (non-blocking)
+
     Returns
     -------
     dict with:
@@ -47,16 +65,24 @@ def run_champion_challenger(user_input: dict) -> dict:
     # 1️⃣ Logistic Regression (Champion)
     # ========================================================
 
-    X_lr = prepare_lr_input(user_input)
+    with stage("cc.lr.woe_binning"):
+        X_lr = prepare_lr_input(user_input)
 
-    pd_lr = lr_model.predict_proba(X_lr)[0, 1]
-    score_lr = pd_to_score(pd_lr)
+    with stage("cc.lr.predict_proba"):
+        pd_lr = lr_model.predict_proba(X_lr)[0, 1]
 
-    lr_result = make_decision(
-        score=score_lr,
-        pd=pd_lr,
-        model_name="Logistic Regression"
-    )
+    with stage("cc.lr.calibrate"):
+        pd_lr = calibrate(calibrators, "lr", pd_lr)
+
+    with stage("cc.lr.pd_to_score"):
+        score_lr = pd_to_score(pd_lr)
+
+    with stage("cc.lr.make_decision"):
+        lr_result = make_decision(
+            score=score_lr,
+            pd=pd_lr,
+            model_name="Logistic Regression"
+        )
 
     # Attach model input vector for debugging
     lr_result["X_lr"] = X_lr
@@ -66,16 +92,24 @@ def run_champion_challenger(user_input: dict) -> dict:
     # 2️⃣ XGBoost (Challenger)
     # ========================================================
 
-    X_xgb = prepare_xgb_input(user_input)
+    with stage("cc.xgb.build_frame"):
+        X_xgb = prepare_xgb_input(user_input)
 
-    pd_xgb = xgb_model.predict_proba(X_xgb)[0, 1]
-    score_xgb = pd_to_score(pd_xgb)
+    with stage("cc.xgb.predict_proba"):
+        pd_xgb = xgb_model.predict_proba(X_xgb)[0, 1]
+
+    with stage("cc.xgb.calibrate"):
+        pd_xgb = calibrate(calibrators, "xgb", pd_xgb)
 
-    xgb_result = make_decision(
-        score=score_xgb,
-        pd=pd_xgb,
-        model_name="XGBoost"
-    )
+    with stage("cc.xgb.pd_to_score"):
+        score_xgb = pd_to_score(pd_xgb)
+
+    with stage("cc.xgb.make_decision"):
+        xgb_result = make_decision(
+            score=score_xgb,
+            pd=pd_xgb,
+            model_name="XGBoost"
+        )
 
     # Attach XGB input for debugging
     xgb_result["X_xgb"] = X_xgb
@@ -92,8 +126,70 @@ def run_champion_challenger(user_input: dict) -> dict:
     # Final Output
     # ========================================================
 
-    return {
+    result = {
         "logistic": lr_result,
         "xgboost": xgb_result,
         "agreement": agreement
     }
+
+    if decision_log is not None:
+        decision_log.log_result(user_input, result)
+
+    return result
+
+
+# ============================================================
+# Champion–Challenger Batch Runner
+# ============================================================
+
+BATCH_RESULT_COLUMNS = [
+    "pd_lr", "score_lr", "risk_band_lr", "decision_lr",
+    "pd_xgb", "score_xgb", "risk_band_xgb", "decision_xgb",
+    "agreement",
+]
+
+def run_champion_challenger_batch(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Score many borrowers through both models in one pass.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        One row per borrower, raw input columns
+        (same keys as the run_champion_challenger dict)
+
+    Returns
+    -------
+    pd.DataFrame
+        Same index as df, columns:
+        pd_lr, score_lr, risk_band_lr, decision_lr,
+        pd_xgb, score_xgb, risk_band_xgb, decision_xgb,
+        agreement
+    """
+
+    if df.empty:
+        return pd.DataFrame(index=df.index, columns=BATCH_RESULT_COLUMNS)
+
+    pd_lr = lr_model.predict_proba(prepare_lr_input_batch(df))[:, 1]
+    pd_xgb = xgb_model.predict_proba(prepare_xgb_input_batch(df))[:, 1]
+
+    pd_lr = calibrate(calibrators, "lr", pd_lr)
+    pd_xgb = calibrate(calibrators, "xgb", pd_xgb)
+
+    score_lr = pd_to_score(pd_lr)
+    score_xgb = pd_to_score(pd_xgb)
+
+    decision_lr = score_to_decision_batch(score_lr)
+    decision_xgb = score_to_decision_batch(score_xgb)
+
+    return pd.DataFrame({
+        "pd_lr": pd_lr,
+        "score_lr": score_lr,
+        "risk_band_lr": score_to_risk_band_batch(score_lr),
+        "decision_lr": decision_lr,
+        "pd_xgb": pd_xgb,
+        "score_xgb": score_xgb,
+        "risk_band_xgb": score_to_risk_band_batch(score_xgb),
+        "decision_xgb": decision_xgb,
+        "agreement": decision_lr == decision_xgb,
+    }, index=df.index, columns=BATCH_RESULT_COLUMNS)
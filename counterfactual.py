@@ -0,0 +1,213 @@
+# ============================================================
+# counterfactual.py
+# ------------------------------------------------------------
+# "What change gets this borrower approved?"
+# - Expands ONE borrower into a grid of loan-structure
+#   variations (loan_amnt, term, int_rate, ... )
+# - Scores the whole grid in one run_champion_challenger_batch
+#   call (vectorised binning + one predict_proba per model)
+# - Returns the smallest changes whose score crosses the
+#   score_to_decision cutoff for the target decision
+# ============================================================
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from decision_engine import DECISIONS
+
+
+# Fraction of the borrower's value per grid step
+LOAN_AMNT_FRACTIONS = np.round(np.arange(0.30, 1.001, 0.05), 2)
+LOAN_AMNT_ROUNDING = 500
+
+INT_RATE_DELTAS = np.round(np.arange(-6.0, 0.01, 0.25), 2)
+INT_RATE_FLOOR = 5.0
+
+TERMS = [36, 60]
+
+MODELS = ("lr", "xgb")
+
+
+# ============================================================
+# GRID
+# ============================================================
+
+def default_grid(borrower: dict) -> dict:
+    """
+    {column: candidate values} around the borrower's own values.
+    """
+    loan = float(borrower["loan_amnt"])
+    amounts = np.round(loan * LOAN_AMNT_FRACTIONS / LOAN_AMNT_ROUNDING) * LOAN_AMNT_ROUNDING
+    amounts = np.unique(np.append(amounts[amounts > 0], loan))
+
+    rate = float(borrower["int_rate"])
+    rates = np.unique(np.append(np.maximum(rate + INT_RATE_DELTAS, INT_RATE_FLOOR), rate))
+
+    return {"loan_amnt": amounts, "term": TERMS, "int_rate": rates}
+
+
+def expand_grid(borrower: dict, grid: dict) -> pd.DataFrame:
+    """
+    One row per combination of grid values; every other column
+    keeps the borrower's value.
+    """
+    columns = list(grid)
+    combos = np.array(list(itertools.product(*(list(grid[c]) for c in columns))), dtype=object)
+    n = len(combos)
+
+    data = {k: np.full(n, v, dtype=object) for k, v in borrower.items()}
+    for j, c in enumerate(columns):
+        data[c] = combos[:, j]
+
+    frame = pd.DataFrame(data)
+    return frame.infer_objects()
+
+
+# ============================================================
+# SEARCH
+# ============================================================
+
+def _change_cost(borrower: dict, candidates: pd.DataFrame, columns: list) -> tuple:
+    """
+    (number of changed columns, sum of relative changes).
+    Categorical / non-numeric changes cost 1 each.
+    """
+    n_changed = np.zeros(len(candidates), dtype=int)
+    cost = np.zeros(len(candidates))
+
+    for c in columns:
+        base = borrower[c]
+        values = candidates[c]
+        changed = (values != base).to_numpy()
+        n_changed += changed
+
+        if isinstance(base, (int, float, np.number)) and base != 0:
+            cost += np.abs(values.to_numpy(dtype=float) - base) / abs(base)
+        else:
+            cost += changed
+    return n_changed, cost
+
+
+def _describe(borrower: dict, row: pd.Series, columns: list) -> str:
+    changes = [
+        f"{c}: {borrower[c]} -> {row[c]}" for c in columns if row[c] != borrower[c]
+    ]
+    return "; ".join(changes) or "no change"
+
+
+def find_counterfactuals(
+    borrower: dict,
+    target: str = "APPROVE",
+    model: str = "lr",
+    grid: dict | None = None,
+    top_k: int = 5
+) -> dict:
+    """
+    Smallest grid changes that reach `target` (or better).
+
+    Parameters
+    ----------
+    borrower : dict
+        Raw borrower input (run_champion_challenger format)
+    target : str
+        "REVIEW" or "APPROVE"
+    model : str
+        "lr", "xgb" or "both" (both models must reach target)
+    grid : dict, optional
+        {column: candidate values}; default_grid(borrower)
+    top_k : int
+        Number of counterfactuals returned
+
+    Returns
+    -------
+    dict
+        base         : scores / decisions of the unchanged borrower
+        candidates   : number of grid points scored
+        counterfactuals : DataFrame (fewest changed columns, then
+                       smallest relative change), possibly empty
+        best_reachable  : highest-scoring candidate (always set)
+    """
+    from champion_challenger_engine import run_champion_challenger_batch
+
+    if target not in DECISIONS:
+        raise ValueError(f"unknown decision {target!r}")
+    if model not in MODELS + ("both",):
+        raise ValueError(f"unknown model {model!r}")
+
+    grid = grid or default_grid(borrower)
+    columns = list(grid)
+
+    candidates = expand_grid(borrower, grid)
+    base_frame = pd.DataFrame([borrower])
+
+    scored = run_champion_challenger_batch(pd.concat([base_frame, candidates], ignore_index=True))
+    base, scored = scored.iloc[0], scored.iloc[1:].set_index(candidates.index)
+
+    models = MODELS if model == "both" else (model,)
+    rank = {d: i for i, d in enumerate(DECISIONS)}
+    target_rank = rank[target]
+
+    reached = np.ones(len(candidates), dtype=bool)
+    for m in models:
+        reached &= scored[f"decision_{m}"].map(rank).to_numpy() >= target_rank
+
+    n_changed, cost = _change_cost(borrower, candidates, columns)
+
+    result = candidates[columns].copy()
+    result["n_changed"] = n_changed
+    result["relative_change"] = cost
+    for m in MODELS:
+        result[f"score_{m}"] = scored[f"score_{m}"]
+        result[f"decision_{m}"] = scored[f"decision_{m}"]
+
+    hits = result[reached].sort_values(["n_changed", "relative_change"], kind="stable").head(top_k)
+    hits.insert(0, "changes", [_describe(borrower, r, columns) for _, r in hits.iterrows()])
+
+    # highest score; ties -> fewest / smallest changes
+    score_key = sum(scored[f"score_{m}"].to_numpy(dtype=float) for m in models)
+    best = result.iloc[np.lexsort((cost, n_changed, -score_key))[0]]
+
+    return {
+        "base": {
+            **{f"score_{m}": float(base[f"score_{m}"]) for m in MODELS},
+            **{f"decision_{m}": base[f"decision_{m}"] for m in MODELS},
+        },
+        "candidates": len(candidates),
+        "counterfactuals": hits.reset_index(drop=True),
+        "best_reachable": {
+            "changes": _describe(borrower, best, columns),
+            **{f"score_{m}": float(best[f"score_{m}"]) for m in MODELS},
+            **{f"decision_{m}": best[f"decision_{m}"] for m in MODELS},
+        },
+    }
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(
+        description="Minimal loan-structure changes that reach a target decision"
+    )
+    parser.add_argument("borrower_json", help="path to one borrower JSON")
+    parser.add_argument("--target", default="APPROVE", choices=DECISIONS[1:])
+    parser.add_argument("--model", default="lr", choices=list(MODELS) + ["both"])
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.borrower_json, "r") as f:
+        borrower = json.load(f)
+
+    out = find_counterfactuals(borrower, args.target, args.model, top_k=args.top)
+    print(f"base: {out['base']}  ({out['candidates']} candidates)")
+    if out["counterfactuals"].empty:
+        print(f"no candidate reaches {args.target}; best: {out['best_reachable']}")
+    else:
+        print(out["counterfactuals"].to_string(index=False))
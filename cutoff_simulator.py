@@ -0,0 +1,189 @@
+# ============================================================
+# cutoff_simulator.py
+# ------------------------------------------------------------
+# Policy cutoff what-if analysis on CACHED scores
+# - Sort each model's scores once, keep prefix sums of PD
+#   (and of observed defaults, if labels are supplied)
+# - Any cutoff set is then answered with np.searchsorted:
+#   O(log n) per cutoff, no re-scoring
+# ============================================================
+
+import numpy as np
+import pandas as pd
+
+from decision_engine import (
+    DECISION_EDGES,
+    RISK_BAND_EDGES,
+    RISK_BANDS,
+)
+
+
+MODEL_COLUMNS = {
+    # model key : (score column, pd column)
+    "lr": ("score_lr", "pd_lr"),
+    "xgb": ("score_xgb", "pd_xgb"),
+}
+
+
+# ============================================================
+# SORTED-SCORE INDEX (one per model)
+# ============================================================
+
+class SortedScoreIndex:
+    """
+    Ascending scores plus prefix sums so that count, expected
+    defaults and observed defaults of any score range
+    [lo, hi) are three searchsorted calls.
+    """
+
+    def __init__(self, scores, pds, bad_flags=None):
+        order = np.argsort(scores, kind="stable")
+        self.scores = np.asarray(scores, dtype=float)[order]
+        self.n = len(self.scores)
+
+        self.pd_cum = np.concatenate(
+            [[0.0], np.cumsum(np.asarray(pds, dtype=float)[order])]
+        )
+        self.bad_cum = None
+        if bad_flags is not None:
+            self.bad_cum = np.concatenate(
+                [[0.0], np.cumsum(np.asarray(bad_flags, dtype=float)[order])]
+            )
+
+    def position(self, cutoffs) -> np.ndarray:
+        # rows with score >= cutoff start at this position
+        return np.searchsorted(self.scores, cutoffs, side="left")
+
+    def range_stats(self, lo, hi) -> dict:
+        """
+        Stats for scores in [lo, hi); lo / hi may be arrays.
+        """
+        a = self.position(lo)
+        b = self.position(hi)
+        count = b - a
+        out = {
+            "count": count,
+            "expected_bads": self.pd_cum[b] - self.pd_cum[a],
+        }
+        if self.bad_cum is not None:
+            out["observed_bads"] = self.bad_cum[b] - self.bad_cum[a]
+        return out
+
+
+def _rate(num, den):
+    num = np.asarray(num, dtype=float)
+    den = np.asarray(den, dtype=float)
+    return np.divide(num, den, out=np.full_like(num, np.nan), where=den > 0)
+
+
+# ============================================================
+# SIMULATOR
+# ============================================================
+
+class CutoffSimulator:
+    """
+    What-if simulator for decision and risk-band cutoffs.
+
+    Parameters
+    ----------
+    scored : pd.DataFrame
+        Output of run_champion_challenger_batch
+    bad_flag : array-like, optional
+        Observed default flag (1 = bad) aligned with scored
+    """
+
+    def __init__(self, scored: pd.DataFrame, bad_flag=None):
+        self.n = len(scored)
+        self.index = {
+            model: SortedScoreIndex(
+                scored[score_col].to_numpy(dtype=float),
+                scored[pd_col].to_numpy(dtype=float),
+                None if bad_flag is None else np.asarray(bad_flag),
+            )
+            for model, (score_col, pd_col) in MODEL_COLUMNS.items()
+        }
+
+    # --------------------------------------------------------
+    # Decisions (APPROVE >= approve, REVIEW >= review)
+    # --------------------------------------------------------
+
+    def decision_rates(
+        self,
+        model: str,
+        approve_cutoff=DECISION_EDGES[1],
+        review_cutoff=DECISION_EDGES[0]
+    ) -> dict:
+        """
+        Approval / review / reject rates and bad rates for one
+        cutoff pair, or element-wise for arrays of cutoffs.
+        """
+        idx = self.index[model]
+        approve_cutoff = np.asarray(approve_cutoff, dtype=float)
+        review_cutoff = np.minimum(
+            np.asarray(review_cutoff, dtype=float), approve_cutoff
+        )
+
+        groups = {
+            "approve": idx.range_stats(approve_cutoff, np.inf),
+            "review": idx.range_stats(review_cutoff, approve_cutoff),
+            "reject": idx.range_stats(-np.inf, review_cutoff),
+        }
+
+        out = {}
+        for name, st in groups.items():
+            out[f"{name}_rate"] = _rate(st["count"], idx.n)
+            out[f"{name}_expected_bad_rate"] = _rate(st["expected_bads"], st["count"])
+            if "observed_bads" in st:
+                out[f"{name}_observed_bad_rate"] = _rate(st["observed_bads"], st["count"])
+
+        if approve_cutoff.ndim == 0 and review_cutoff.ndim == 0:
+            out = {k: float(v) for k, v in out.items()}
+        return out
+
+    def sweep(self, model: str, approve_cutoffs, review_cutoffs) -> pd.DataFrame:
+        """
+        Evaluate every (approve, review) combination in one
+        vectorised call. Pairs with review > approve collapse
+        the REVIEW band to empty.
+        """
+        a, r = np.meshgrid(
+            np.asarray(approve_cutoffs, dtype=float),
+            np.asarray(review_cutoffs, dtype=float),
+            indexing="ij",
+        )
+        a, r = a.ravel(), r.ravel()
+        rates = self.decision_rates(model, a, r)
+        return pd.DataFrame({"approve_cutoff": a, "review_cutoff": r, **rates})
+
+    # --------------------------------------------------------
+    # Risk bands
+    # --------------------------------------------------------
+
+    def band_distribution(
+        self,
+        model: str,
+        edges=RISK_BAND_EDGES,
+        bands=RISK_BANDS
+    ) -> pd.DataFrame:
+        """
+        Share and bad rates per risk band for candidate band
+        edges (ascending, len(bands) - 1 of them).
+        """
+        if len(edges) != len(bands) - 1:
+            raise ValueError("need exactly len(bands) - 1 edges")
+
+        idx = self.index[model]
+        bounds = np.concatenate([[-np.inf], np.asarray(edges, dtype=float), [np.inf]])
+        st = idx.range_stats(bounds[:-1], bounds[1:])
+
+        out = pd.DataFrame({
+            "risk_band": bands,
+            "lower": bounds[:-1],
+            "upper": bounds[1:],
+            "count": st["count"],
+            "share": _rate(st["count"], idx.n),
+            "expected_bad_rate": _rate(st["expected_bads"], st["count"]),
+        })
+        if "observed_bads" in st:
+            out["observed_bad_rate"] = _rate(st["observed_bads"], st["count"])
+        return out
@@ -2,6 +2,21 @@
 # Credit Decision Engine
 # ============================================================
 
+import numpy as np
+
+
+# ============================================================
+# Policy cutoffs (ascending edges, score >= edge moves up)
+# Same thresholds as score_to_risk_band / score_to_decision
+# ============================================================
+
+RISK_BAND_EDGES = [600, 640, 680, 720]
+RISK_BANDS = ["VERY_HIGH", "HIGH", "MEDIUM", "LOW", "VERY_LOW"]
+
+DECISION_EDGES = [620, 680]
+DECISIONS = ["REJECT", "REVIEW", "APPROVE"]
+
+
 def score_to_risk_band(score: float) -> str:
     """
     Map credit score to risk band
@@ -59,10 +74,31 @@ def make_decision(
 
     if pd is not None:
         result["pd_percent"] = round(pd * 100, 2)
+        result["pd"] = float(pd)        # unrounded, for monitoring
 
     return result
 
 
+# ============================================================
+# Batch mapping (vectorised, one searchsorted per call)
+# ============================================================
+
+def score_to_risk_band_batch(scores) -> np.ndarray:
+    """
+    Vectorised score_to_risk_band for an array of scores
+    """
+    idx = np.searchsorted(RISK_BAND_EDGES, np.asarray(scores), side="right")
+    return np.asarray(RISK_BANDS, dtype=object)[idx]
+
+
+def score_to_decision_batch(scores) -> np.ndarray:
+    """
+    Vectorised score_to_decision for an array of scores
+    """
+    idx = np.searchsorted(DECISION_EDGES, np.asarray(scores), side="right")
+    return np.asarray(DECISIONS, dtype=object)[idx]
+
+
 # # ============================================================
 # # REQUIRED WRAPPER (THIS FIXES YOUR ERROR)
 # # ============================================================
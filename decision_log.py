@@ -0,0 +1,309 @@
+# ============================================================
+# decision_log.py
+# ------------------------------------------------------------
+# Non-blocking Champion–Challenger shadow log
+# - Scoring threads only enqueue (never touch disk)
+# - Bounded queue: when full, records are DROPPED + counted
+# - Background writer flushes batches to rotating
+#   gzip JSONL (default) or Parquet files; every batch reaches
+#   the file when written (one Parquet row group per batch;
+#   the Parquet footer is added when the file rotates/closes)
+# ============================================================
+
+import atexit
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+_STOP = object()
+
+
+# ============================================================
+# RECORD FORMATTING (runs on the writer thread)
+# ============================================================
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _model_summary(result: dict) -> dict:
+    # drop debug input vectors (X_lr / X_xgb DataFrames)
+    return {k: v for k, v in result.items() if not k.startswith("X_")}
+
+
+def to_record(ts: float, user_input: dict, result: dict) -> dict:
+    """
+    Flatten one run_champion_challenger call into a log row.
+    """
+    return {
+        "ts": ts,
+        "input": user_input,
+        "logistic": _model_summary(result["logistic"]),
+        "xgboost": _model_summary(result["xgboost"]),
+        "agreement": bool(result["agreement"]),
+    }
+
+
+# ============================================================
+# DECISION LOG
+# ============================================================
+
+class DecisionLog:
+    """
+    Asynchronous, bounded, batched decision log.
+
+    Parameters
+    ----------
+    directory : str
+        Output folder for log files
+    fmt : str
+        "jsonl" (gzip-compressed) or "parquet"
+    max_queue : int
+        Queue capacity; records beyond it are dropped
+    batch_size : int
+        Max records written per flush
+    flush_interval : float
+        Seconds the writer waits before flushing a partial batch
+    max_records_per_file : int
+        Rotate to a new file after this many records
+    """
+
+    def __init__(
+        self,
+        directory: str = "decision_logs",
+        fmt: str = "jsonl",
+        max_queue: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_records_per_file: int = 100_000
+    ):
+        if fmt not in ("jsonl", "parquet"):
+            raise ValueError("fmt must be 'jsonl' or 'parquet'")
+
+        if fmt == "parquet" and pa is None:
+            raise ImportError("fmt='parquet' requires pyarrow; use fmt='jsonl'")
+
+        self.directory = directory
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_records_per_file = max_records_per_file
+
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        # guards _closed + dropped; shared by producers and close()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # metrics (dropped is bumped by producers, rest by writer;
+        # written counts records whose write has completed)
+        self.dropped = 0
+        self.written = 0
+        self.files_written = 0
+        self.write_errors = 0
+
+        # current output file (gzip handle or ParquetWriter)
+        self._file = None
+        self._schema = None         # parquet schema of current file
+        self._file_records = 0
+        self._seq = 0
+
+        self._writer = threading.Thread(
+            target=self._run, name="decision-log-writer", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    # --------------------------------------------------------
+    # Producer side (scoring threads)
+    # --------------------------------------------------------
+
+    def log_result(self, user_input: dict, result: dict) -> bool:
+        """
+        Enqueue one champion–challenger result without blocking.
+
+        Returns False if the record was dropped (queue full
+        or log closed).
+        """
+        with self._lock:
+            if not self._closed:
+                try:
+                    self._queue.put_nowait((time.time(), user_input, result))
+                    return True
+                except queue.Full:
+                    pass
+            self.dropped += 1
+        return False
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "dropped": self.dropped,
+            "written": self.written,
+            "files_written": self.files_written,
+            "write_errors": self.write_errors,
+        }
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        """
+        Stop accepting records, flush everything queued and
+        close the current file. Safe to call more than once.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        # no producer can enqueue past this point, so _STOP is last.
+        # Never block on a full queue the writer no longer drains
+        # (it died, or is stuck past the timeout).
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._writer.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=0.1)
+            except queue.Full:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+                continue
+            self._writer.join(
+                None if deadline is None else max(0.0, deadline - time.monotonic())
+            )
+            return
+
+    # --------------------------------------------------------
+    # Consumer side (writer thread)
+    # --------------------------------------------------------
+
+    def _run(self) -> None:
+        stopping = False
+
+        while not stopping:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write_batch(batch)
+
+        try:
+            self._rotate()
+        except Exception:
+            self.write_errors += 1
+
+    def _write_batch(self, batch: list) -> None:
+        try:
+            records = [to_record(*item) for item in batch]
+        except Exception:
+            self.write_errors += 1
+            return
+
+        start = 0
+        while start < len(records):
+            room = self.max_records_per_file - self._file_records
+            part = records[start:start + room]
+            try:
+                if self.fmt == "jsonl":
+                    self._write_jsonl(part)
+                else:
+                    self._write_parquet(part)
+
+                start += len(part)
+                self._file_records += len(part)
+                self.written += len(part)
+
+                if self._file_records >= self.max_records_per_file:
+                    self._rotate()
+            except Exception:
+                # a failed write or rotation (disk full, permissions)
+                # may leave the file half-written: start a new one
+                self.write_errors += 1
+                self._close_quietly()
+                return
+
+    def _write_jsonl(self, records: list) -> None:
+        if self._file is None:
+            self._file = gzip.open(self._next_path(), "wt")
+        for record in records:
+            self._file.write(json.dumps(record, default=_json_default) + "\n")
+        self._file.flush()
+
+    def _write_parquet(self, records: list) -> None:
+        frame = pd.json_normalize(records)
+
+        table = None
+        if self._file is not None:
+            # same file only while the batch fits its schema
+            if set(frame.columns) <= set(self._schema.names):
+                try:
+                    table = pa.Table.from_pandas(
+                        frame.reindex(columns=self._schema.names),
+                        schema=self._schema, preserve_index=False,
+                    )
+                except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                    table = None
+            if table is None:
+                self._rotate()
+
+        if self._file is None:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            self._schema = table.schema
+            self._file = pq.ParquetWriter(
+                self._next_path(), self._schema, compression="snappy"
+            )
+
+        self._file.write_table(table)
+
+    def _next_path(self) -> str:
+        self._seq += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        ext = "jsonl.gz" if self.fmt == "jsonl" else "parquet"
+        return os.path.join(
+            self.directory, f"decisions-{stamp}-{self._seq:05d}.{ext}"
+        )
+
+    def _rotate(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._schema = None
+            self.files_written += 1
+
+        self._file_records = 0
+
+    def _close_quietly(self) -> None:
+        try:
+            self._rotate()
+        except Exception:
+            self._file = None
+            self._schema = None
+            self._file_records = 0
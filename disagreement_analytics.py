@@ -0,0 +1,139 @@
+# ============================================================
+# disagreement_analytics.py
+# ------------------------------------------------------------
+# Batch Champion–Challenger comparison
+# Input  : run_champion_challenger_batch output (any size)
+# Output : decision confusion matrix, risk-band migration,
+#          swap-in / swap-out sets, PD & score correlation,
+#          positions of disagreeing rows
+# ------------------------------------------------------------
+# Everything is computed on small integer code arrays;
+# row sets are returned as positional indices (no row copies).
+# ============================================================
+
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+from decision_engine import RISK_BANDS, DECISIONS
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def _codes(values, categories) -> np.ndarray:
+    return pd.Categorical(values, categories=categories).codes.astype(np.int64)
+
+
+def _cross_tab(a: np.ndarray, b: np.ndarray, labels: list) -> pd.DataFrame:
+    """
+    k x k count matrix (rows = champion, cols = challenger)
+    with one bincount. Unknown labels (code -1) are ignored.
+    """
+    k = len(labels)
+    valid = (a >= 0) & (b >= 0)
+    counts = np.bincount(a[valid] * k + b[valid], minlength=k * k)
+    return pd.DataFrame(
+        counts.reshape(k, k),
+        index=pd.Index(labels, name="champion_lr"),
+        columns=pd.Index(labels, name="challenger_xgb"),
+    )
+
+
+def _pearson(x: np.ndarray, y: np.ndarray) -> float:
+    if len(x) < 2:
+        return np.nan
+    return float(np.corrcoef(x, y)[0, 1])
+
+
+def _spearman(x: np.ndarray, y: np.ndarray) -> float:
+    return _pearson(rankdata(x), rankdata(y))
+
+
+# ============================================================
+# PUBLIC FUNCTIONS
+# ============================================================
+
+def disagreement_positions(scored: pd.DataFrame) -> np.ndarray:
+    """
+    Positional indices (for .iloc / .take) of rows where the
+    LR and XGB decisions differ.
+    """
+    return np.flatnonzero(
+        scored["decision_lr"].to_numpy() != scored["decision_xgb"].to_numpy()
+    )
+
+
+def analyse_disagreement(scored: pd.DataFrame) -> dict:
+    """
+    Champion vs Challenger comparison over a scored batch.
+
+    Parameters
+    ----------
+    scored : pd.DataFrame
+        Output of run_champion_challenger_batch
+
+    Returns
+    -------
+    dict
+        {
+          "n_rows", "agreement_rate",
+          "decision_confusion"  : 3x3 DataFrame (LR x XGB),
+          "band_migration"      : 5x5 DataFrame (LR x XGB),
+          "swap_in"             : positions XGB approves, LR does not,
+          "swap_out"            : positions LR approves, XGB does not,
+          "disagreement"        : positions with different decisions,
+          "pd_pearson", "pd_spearman",
+          "score_pearson", "score_spearman",
+          "mean_score_shift"    : mean(score_xgb - score_lr)
+        }
+    """
+
+    dec_lr = _codes(scored["decision_lr"], DECISIONS)
+    dec_xgb = _codes(scored["decision_xgb"], DECISIONS)
+    band_lr = _codes(scored["risk_band_lr"], RISK_BANDS)
+    band_xgb = _codes(scored["risk_band_xgb"], RISK_BANDS)
+
+    approve = DECISIONS.index("APPROVE")
+    approve_lr = dec_lr == approve
+    approve_xgb = dec_xgb == approve
+
+    pd_lr = scored["pd_lr"].to_numpy(dtype=float)
+    pd_xgb = scored["pd_xgb"].to_numpy(dtype=float)
+    score_lr = scored["score_lr"].to_numpy(dtype=float)
+    score_xgb = scored["score_xgb"].to_numpy(dtype=float)
+
+    disagree = np.flatnonzero(dec_lr != dec_xgb)
+    n = len(scored)
+
+    return {
+        "n_rows": n,
+        "agreement_rate": 1 - len(disagree) / n if n else np.nan,
+        "decision_confusion": _cross_tab(dec_lr, dec_xgb, DECISIONS),
+        "band_migration": _cross_tab(band_lr, band_xgb, RISK_BANDS),
+        "swap_in": np.flatnonzero(approve_xgb & ~approve_lr),
+        "swap_out": np.flatnonzero(approve_lr & ~approve_xgb),
+        "disagreement": disagree,
+        "pd_pearson": _pearson(pd_lr, pd_xgb),
+        "pd_spearman": _spearman(pd_lr, pd_xgb),
+        "score_pearson": _pearson(score_lr, score_xgb),
+        "score_spearman": _spearman(score_lr, score_xgb),
+        "mean_score_shift": float(np.mean(score_xgb - score_lr)) if n else np.nan,
+    }
+
+
+def export_disagreements(
+    scored: pd.DataFrame,
+    path: str,
+    positions: np.ndarray | None = None
+) -> int:
+    """
+    Write the index labels of disagreeing rows to a .npy file
+    (positions default to disagreement_positions(scored)).
+    Returns the number of rows exported.
+    """
+    if positions is None:
+        positions = disagreement_positions(scored)
+    np.save(path, scored.index.to_numpy()[positions])
+    return len(positions)
@@ -0,0 +1,250 @@
+# ============================================================
+# drift_monitor.py
+# ------------------------------------------------------------
+# Incremental PSI / CSI monitoring on the WOE bins
+# - Characteristic groups = LR bins (woe_transformer codes)
+# - Score groups = fixed score bands per model
+# - Only bin COUNTERS are kept (no raw data), in a ring of
+#   time buckets -> O(bins x buckets) memory at any volume
+# - PSI (scores) / CSI (LR_FEATURES) vs a stored baseline
+# - Bins are exactly the scorer's (bin_codes / bin_codes_batch,
+#   incl. any fitted binning); a feature whose values mostly
+#   miss every WOE bin is flagged UNMATCHED instead of showing
+#   a misleadingly stable CSI
+# ============================================================
+
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from feature_schema import LR_FEATURES
+from woe_transformer import bin_codes, bin_codes_batch, bin_labels
+
+
+# Score bands for PSI: <450, 450-474, ..., 775-799, 800+
+SCORE_BIN_EDGES = list(range(450, 801, 25))
+
+SCORE_CHARACTERISTICS = {
+    # characteristic : score column (batch) / result key
+    "score_lr": ("score_lr", "logistic"),
+    "score_xgb": ("score_xgb", "xgboost"),
+}
+
+# Conventional PSI reading
+PSI_STABLE = 0.10
+PSI_SHIFT = 0.25
+
+EPSILON = 1e-4      # floor on bin shares inside the log
+
+# CSI of a feature whose window is mostly in the unmatched code
+# (values the scorer has no WOE bin for, scored at WOE 0) is
+# flagged UNMATCHED: its drift is invisible on the model's bins
+UNMATCHED_WARN = 0.05
+
+
+def _characteristic_sizes() -> dict:
+    sizes = {name: len(SCORE_BIN_EDGES) + 1 for name in SCORE_CHARACTERISTICS}
+    for f in LR_FEATURES:
+        sizes[f] = len(bin_labels(f)) + 1      # + unmatched code
+    return sizes
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """
+    Population stability index between two count vectors.
+    """
+    e_total, a_total = expected.sum(), actual.sum()
+    if e_total == 0 or a_total == 0:
+        return float("nan")
+    e = np.maximum(expected / e_total, EPSILON)
+    a = np.maximum(actual / a_total, EPSILON)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def stability_flag(value: float) -> str:
+    if np.isnan(value):
+        return "NO_DATA"
+    if value < PSI_STABLE:
+        return "STABLE"
+    if value < PSI_SHIFT:
+        return "MONITOR"
+    return "SHIFT"
+
+
+# ============================================================
+# DRIFT MONITOR
+# ============================================================
+
+class DriftMonitor:
+    """
+    Sliding-window PSI / CSI monitor.
+
+    Parameters
+    ----------
+    bucket_seconds : int
+        Width of one time bucket
+    n_buckets : int
+        Buckets kept; the longest window is
+        bucket_seconds * n_buckets
+    baseline : dict, optional
+        {characteristic: counts} (see baseline_counts / save_baseline)
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: int = 3600,
+        n_buckets: int = 24 * 7,
+        baseline: dict | None = None
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.n_buckets = n_buckets
+
+        self.sizes = _characteristic_sizes()
+        self.offsets = {}
+        start = 0
+        for name, size in self.sizes.items():
+            self.offsets[name] = start
+            start += size
+        self.width = start
+
+        # ring of per-bucket counters, one flat row per bucket
+        self._counts = np.zeros((n_buckets, self.width), dtype=np.int64)
+        self._bucket_ids = np.full(n_buckets, -1, dtype=np.int64)
+        self._lock = threading.Lock()
+
+        self.baseline = None
+        if baseline is not None:
+            self.set_baseline(baseline)
+
+    # --------------------------------------------------------
+    # Baseline
+    # --------------------------------------------------------
+
+    def set_baseline(self, counts: dict) -> None:
+        for name, size in self.sizes.items():
+            if len(counts[name]) != size:
+                raise ValueError(
+                    f"baseline for {name} has {len(counts[name])} bins, "
+                    f"expected {size}"
+                )
+        self.baseline = {k: np.asarray(v, dtype=float) for k, v in counts.items()}
+
+    def baseline_counts(self, window_seconds: float | None = None) -> dict:
+        """
+        Current window counts in baseline format (e.g. feed a
+        development-sample monitor into save_baseline).
+        """
+        flat = self._window_counts(window_seconds)
+        return {
+            name: flat[self.offsets[name]:self.offsets[name] + size].tolist()
+            for name, size in self.sizes.items()
+        }
+
+    def save_baseline(self, path: str, window_seconds: float | None = None) -> None:
+        with open(path, "w") as f:
+            json.dump(self.baseline_counts(window_seconds), f)
+
+    def load_baseline(self, path: str) -> None:
+        with open(path, "r") as f:
+            self.set_baseline(json.load(f))
+
+    # --------------------------------------------------------
+    # Counting
+    # --------------------------------------------------------
+
+    def _slot(self, now: float) -> int:
+        bucket_id = int(now // self.bucket_seconds)
+        slot = bucket_id % self.n_buckets
+        if self._bucket_ids[slot] != bucket_id:
+            self._counts[slot] = 0
+            self._bucket_ids[slot] = bucket_id
+        return slot
+
+    def _add(self, flat_index: np.ndarray, now: float | None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            slot = self._slot(now)
+            self._counts[slot] += np.bincount(flat_index, minlength=self.width)
+
+    def observe(self, user_input: dict, result: dict, now: float | None = None) -> None:
+        """
+        Count one scored request (run_champion_challenger output).
+        """
+        codes = bin_codes(user_input)
+        idx = [self.offsets[f] + codes[f] for f in LR_FEATURES]
+        for name, (_, key) in SCORE_CHARACTERISTICS.items():
+            band = np.searchsorted(SCORE_BIN_EDGES, result[key]["score"], side="right")
+            idx.append(self.offsets[name] + int(band))
+        self._add(np.asarray(idx, dtype=np.int64), now)
+
+    def observe_batch(
+        self,
+        df: pd.DataFrame,
+        scored: pd.DataFrame,
+        now: float | None = None
+    ) -> None:
+        """
+        Count a batch (raw inputs + run_champion_challenger_batch
+        output) in one bincount.
+        """
+        parts = [
+            self.offsets[f] + bin_codes_batch(f, df).astype(np.int64)
+            for f in LR_FEATURES
+        ]
+        for name, (col, _) in SCORE_CHARACTERISTICS.items():
+            band = np.searchsorted(
+                SCORE_BIN_EDGES, scored[col].to_numpy(dtype=float), side="right"
+            )
+            parts.append(self.offsets[name] + band)
+        self._add(np.concatenate(parts), now)
+
+    # --------------------------------------------------------
+    # Reporting
+    # --------------------------------------------------------
+
+    def _window_counts(self, window_seconds: float | None, now: float | None = None) -> np.ndarray:
+        # window_seconds=None -> the longest window the ring holds;
+        # slots not rewritten since then are expired and skipped
+        now = time.time() if now is None else now
+        current = int(now // self.bucket_seconds)
+        if window_seconds is None:
+            n = self.n_buckets
+        else:
+            n = min(self.n_buckets, max(1, int(np.ceil(window_seconds / self.bucket_seconds))))
+        with self._lock:
+            live = (self._bucket_ids > current - n) & (self._bucket_ids <= current)
+            return self._counts[live].sum(axis=0)
+
+    def report(self, window_seconds: float | None = None, now: float | None = None) -> pd.DataFrame:
+        """
+        PSI for each model score and CSI for every LR feature
+        over the most recent window (default: the whole ring).
+        unmatched_share is the share of the window in the
+        unmatched code (values with no WOE bin, scored at WOE 0);
+        above UNMATCHED_WARN the feature is flagged UNMATCHED,
+        since its CSI cannot see drift in those values.
+        """
+        if self.baseline is None:
+            raise ValueError("no baseline set – call set_baseline / load_baseline")
+
+        flat = self._window_counts(window_seconds, now)
+        rows = []
+        for name, size in self.sizes.items():
+            actual = flat[self.offsets[name]:self.offsets[name] + size]
+            value = psi(self.baseline[name], actual)
+            unmatched = (
+                float(actual[-1] / actual.sum())
+                if name not in SCORE_CHARACTERISTICS and actual.sum() else float("nan")
+            )
+            rows.append({
+                "characteristic": name,
+                "index": "PSI" if name in SCORE_CHARACTERISTICS else "CSI",
+                "value": value,
+                "n": int(actual.sum()),
+                "unmatched_share": unmatched,
+                "flag": "UNMATCHED" if unmatched > UNMATCHED_WARN else stability_flag(value),
+            })
+        return pd.DataFrame(rows)
@@ -6,8 +6,71 @@
 # - XGB rebuilds exact training feature space
 # ============================================================
 
+import numpy as np
 import pandas as pd
-from woe_transformer import transform_user_input_to_woe
+from woe_transformer import transform_user_input_to_woe, transform_batch_to_woe
+
+
+# ============================================================
+# XGBOOST TRAINING FEATURE SPACE
+# ============================================================
+
+XGB_TRAIN_FEATURES = [
+    'grade',
+    'sub_grade',
+    'fico_range_low',
+    'term',
+    'int_rate',
+    'loan_amnt',
+    'annual_inc',
+    'dti',
+    'emp_length',
+    'verification_status_Source Verified',
+    'home_ownership_MORTGAGE',
+    'home_ownership_RENT',
+    'mort_acc',
+    'acc_open_past_24mths',
+    'num_actv_rev_tl',
+    'delinq_2yrs',
+    'mths_since_recent_bc',
+    'mths_since_recent_inq',
+    'mo_sin_old_rev_tl_op',
+    'mo_sin_rcnt_tl',
+    'avg_cur_bal',
+    'tot_cur_bal',
+    'total_bc_limit',
+    'purpose_small_business'
+]
+
+XGB_NUMERIC_FIELDS = [
+    'fico_range_low', 'term', 'int_rate', 'loan_amnt',
+    'annual_inc', 'dti', 'mort_acc', 'acc_open_past_24mths',
+    'num_actv_rev_tl', 'delinq_2yrs', 'mths_since_recent_bc',
+    'mths_since_recent_inq', 'mo_sin_old_rev_tl_op',
+    'mo_sin_rcnt_tl', 'avg_cur_bal', 'tot_cur_bal',
+    'total_bc_limit'
+]
+
+GRADE_MAP = {"A":1,"B":2,"C":3,"D":4,"E":5,"F":6,"G":7}
+
+SUB_GRADE_MAP = {
+    f"{g}{i}": idx
+    for idx, (g, i) in enumerate(
+        [(g, i) for g in "ABCDEFG" for i in range(1,6)], start=1
+    )
+}
+
+EMP_LENGTH_MAP = {
+    "<1":0,"1-3":1,"3-5":2,"5-10":3,"10+":4,"Missing":0
+}
+
+# one-hot column : (raw column, matching value)
+XGB_ONE_HOT = {
+    "home_ownership_MORTGAGE": ("home_ownership", "MORTGAGE"),
+    "home_ownership_RENT": ("home_ownership", "RENT"),
+    "verification_status_Source Verified": ("verification_status", "Source Verified"),
+    "purpose_small_business": ("purpose", "small_business"),
+}
 
 
 # ============================================================
@@ -32,82 +95,74 @@ def prepare_xgb_input(user_input: dict) -> pd.DataFrame:
     Must match xgb_model.feature_names exactly.
     """
 
-    XGB_TRAIN_FEATURES = [
-        'grade',
-        'sub_grade',
-        'fico_range_low',
-        'term',
-        'int_rate',
-        'loan_amnt',
-        'annual_inc',
-        'dti',
-        'emp_length',
-        'verification_status_Source Verified',
-        'home_ownership_MORTGAGE',
-        'home_ownership_RENT',
-        'mort_acc',
-        'acc_open_past_24mths',
-        'num_actv_rev_tl',
-        'delinq_2yrs',
-        'mths_since_recent_bc',
-        'mths_since_recent_inq',
-        'mo_sin_old_rev_tl_op',
-        'mo_sin_rcnt_tl',
-        'avg_cur_bal',
-        'tot_cur_bal',
-        'total_bc_limit',
-        'purpose_small_business'
-    ]
-
     row = {f: 0 for f in XGB_TRAIN_FEATURES}
 
     # -------------------------
     # NUMERIC FEATURES
     # -------------------------
-    numeric_fields = [
-        'fico_range_low', 'term', 'int_rate', 'loan_amnt',
-        'annual_inc', 'dti', 'mort_acc', 'acc_open_past_24mths',
-        'num_actv_rev_tl', 'delinq_2yrs', 'mths_since_recent_bc',
-        'mths_since_recent_inq', 'mo_sin_old_rev_tl_op',
-        'mo_sin_rcnt_tl', 'avg_cur_bal', 'tot_cur_bal',
-        'total_bc_limit'
-    ]
-
-    for f in numeric_fields:
+    for f in XGB_NUMERIC_FIELDS:
         row[f] = user_input.get(f, 0)
 
     # -------------------------
     # ORDINAL ENCODING
     # -------------------------
-    grade_map = {"A":1,"B":2,"C":3,"D":4,"E":5,"F":6,"G":7}
-    row["grade"] = grade_map.get(user_input.get("grade"), 0)
-
-    sub_grade_map = {
-        f"{g}{i}": idx
-        for idx, (g, i) in enumerate(
-            [(g, i) for g in "ABCDEFG" for i in range(1,6)], start=1
-        )
-    }
-    row["sub_grade"] = sub_grade_map.get(user_input.get("sub_grade"), 0)
-
-    emp_length_map = {
-        "<1":0,"1-3":1,"3-5":2,"5-10":3,"10+":4,"Missing":0
-    }
-    row["emp_length"] = emp_length_map.get(user_input.get("emp_length"), 0)
+    row["grade"] = GRADE_MAP.get(user_input.get("grade"), 0)
+    row["sub_grade"] = SUB_GRADE_MAP.get(user_input.get("sub_grade"), 0)
+    row["emp_length"] = EMP_LENGTH_MAP.get(user_input.get("emp_length"), 0)
 
     # -------------------------
     # ONE-HOT FEATURES
     # -------------------------
-    if user_input.get("home_ownership") == "MORTGAGE":
-        row["home_ownership_MORTGAGE"] = 1
+    for col, (source, value) in XGB_ONE_HOT.items():
+        if user_input.get(source) == value:
+            row[col] = 1
+
+    return pd.DataFrame([row], columns=XGB_TRAIN_FEATURES)
+
 
-    if user_input.get("home_ownership") == "RENT":
-        row["home_ownership_RENT"] = 1
+# ============================================================
+# BATCH PIPELINES (many borrowers per call)
+# ============================================================
 
-    if user_input.get("verification_status") == "Source Verified":
-        row["verification_status_Source Verified"] = 1
+def prepare_lr_input_batch(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorised prepare_lr_input: one WOE row per borrower.
+    """
+    return transform_batch_to_woe(df)
 
-    if user_input.get("purpose") == "small_business":
-        row["purpose_small_business"] = 1
 
-    return pd.DataFrame([row], columns=XGB_TRAIN_FEATURES)
+def xgb_column_batch(col: str, df: pd.DataFrame) -> np.ndarray:
+    """
+    Build a single XGBoost training column for every row of df.
+    Same encoding rules as prepare_xgb_input.
+    """
+    n = len(df)
+
+    if col in XGB_NUMERIC_FIELDS:
+        if col not in df.columns:
+            return np.zeros(n)
+        return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+    if col in XGB_ONE_HOT:
+        source, value = XGB_ONE_HOT[col]
+        if source not in df.columns:
+            return np.zeros(n)
+        return (df[source] == value).to_numpy(dtype=float)
+
+    ordinal_maps = {
+        "grade": GRADE_MAP,
+        "sub_grade": SUB_GRADE_MAP,
+        "emp_length": EMP_LENGTH_MAP,
+    }
+    if col not in df.columns:
+        return np.zeros(n)
+    return df[col].map(ordinal_maps[col]).fillna(0).to_numpy(dtype=float)
+
+
+def prepare_xgb_input_batch(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorised prepare_xgb_input: one XGBoost row per borrower,
+    columns in XGB_TRAIN_FEATURES order, same index as df.
+    """
+    data = {col: xgb_column_batch(col, df) for col in XGB_TRAIN_FEATURES}
+    return pd.DataFrame(data, index=df.index, columns=XGB_TRAIN_FEATURES)
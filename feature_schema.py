@@ -112,3 +112,17 @@ XGB_FEATURES = [
     "mths_since_recent_inq",
     "credit_age_months"
 ]
+
+# ------------------------------------------------------------
+# 4. SCORING INPUT COLUMNS (BATCH / PORTFOLIO SCORING)
+# ------------------------------------------------------------
+# Every raw column read by the LR WOE transform or the XGB
+# feature builder. RAW_FEATURES plus the extra utilisation /
+# balance inputs the pipelines consume.
+# ------------------------------------------------------------
+
+SCORING_INPUT_COLUMNS = RAW_FEATURES + [
+    "bc_util",
+    "percent_bc_gt_75",
+    "tot_cur_bal"
+]
@@ -0,0 +1,323 @@
+# ============================================================
+# feature_screening.py
+# ------------------------------------------------------------
+# Univariate screening of candidate attributes before a
+# redevelopment: IV, KS and Gini per feature
+# - The CSV is parsed ONCE, in chunks, by the driver; chunks
+#   are fanned out to a process pool that summarises them and
+#   the partial summaries merge
+# - Numeric features: KLL sketches of the good and the bad
+#   values over the WHOLE file; quantile edges and per-bin
+#   counts are read off the merged sketches (rank error
+#   ~ 1 / SKETCH_K), so chunk order never decides the edges.
+#   Sketch compaction is randomised; every sketch is seeded from
+#   (seed, chunk number, feature name) and partials merge in
+#   chunk order, so a file screens identically on every run
+#   Categoricals are counted exactly per level. All metrics
+#   come from the rows / bads histograms.
+# - Rows without a usable target are skipped
+# - Flags which candidates the current LR / XGB models use
+# ============================================================
+
+import os
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from feature_schema import XGB_FEATURES
+from quantile_sketch import KLLSketch
+from woe_fitter import SMOOTHING, TARGET_COLUMN
+from woe_transformer import CATEGORICAL_SOURCES, NUMERIC_BINS
+
+
+# Raw columns feeding the current LR scorecard
+LR_SOURCE_COLUMNS = (
+    {column for column, _, _ in NUMERIC_BINS.values()}
+    | set(CATEGORICAL_SOURCES.values())
+)
+
+N_BINS = 20
+SKETCH_K = 2000
+
+MISSING = "__missing__"
+
+
+# ============================================================
+# PER-FEATURE SUMMARY (mergeable)
+# ============================================================
+
+class FeatureHistogram:
+    """
+    Mergeable rows / bads summary of one candidate feature.
+
+    Numeric: sketches of good and bad values + exact missing
+    counts; binned into quantile edges only in ordered_counts.
+    Categorical: one slot per level.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        n_bins: int = N_BINS,
+        k: int = SKETCH_K,
+        seed=None
+    ):
+        self.name = name
+        self.kind = kind
+        self.n_bins = n_bins
+        goods_seed, bads_seed = np.random.SeedSequence(seed).spawn(2)
+        self.goods = KLLSketch(k, seed=goods_seed)
+        self.bads = KLLSketch(k, seed=bads_seed)
+        self.missing = np.zeros(2)      # rows, bads
+        self.levels = {}
+
+    def update(self, series: pd.Series, bad: np.ndarray) -> "FeatureHistogram":
+        if self.kind == "numeric":
+            values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+            nan = np.isnan(values)
+            is_bad = bad > 0
+            self.missing += [nan.sum(), bad[nan].sum()]
+            self.goods.update(values[~nan & ~is_bad])
+            self.bads.update(values[~nan & is_bad])
+            return self
+
+        codes, uniques = pd.factorize(series.astype(object).where(series.notna(), MISSING))
+        rows = np.bincount(codes, minlength=len(uniques))
+        bads = np.bincount(codes, weights=bad, minlength=len(uniques))
+        for i, level in enumerate(uniques):
+            c = self.levels.setdefault(str(level), np.zeros(2))
+            c[0] += rows[i]
+            c[1] += bads[i]
+        return self
+
+    def merge(self, other: "FeatureHistogram") -> "FeatureHistogram":
+        self.goods.merge(other.goods)
+        self.bads.merge(other.bads)
+        self.missing += other.missing
+        for level, c in other.levels.items():
+            self.levels[level] = self.levels.get(level, np.zeros(2)) + c
+        return self
+
+    def edges(self) -> np.ndarray:
+        """
+        Quantile edges of all non-missing values (merged sketches).
+        """
+        both = KLLSketch(self.goods.k, seed=0).merge(self.goods).merge(self.bads)
+        if both.n == 0:
+            return np.empty(0)
+        qs = np.linspace(0, 1, self.n_bins + 1)[1:-1]
+        return np.unique(both.quantile(qs))
+
+    def ordered_counts(self) -> tuple:
+        """
+        (rows, bads, missing rows) in scoring order: value order
+        for numerics (missing last), bad-rate order for levels.
+        """
+        if self.kind == "numeric":
+            edges = self.edges()
+
+            def per_bin(sketch):
+                # values < edge, as np.searchsorted(side="right") bins
+                below = [sketch.n * sketch.rank(e, inclusive=False) if sketch.n else 0.0 for e in edges]
+                return np.diff(np.concatenate([[0.0], below, [sketch.n]]))
+
+            bads = np.append(per_bin(self.bads), self.missing[1])
+            rows = np.append(per_bin(self.goods), self.missing[0] - self.missing[1]) + bads
+            return rows, bads, self.missing[0]
+
+        counts = np.array(list(self.levels.values())).reshape(-1, 2)
+        order = np.argsort(counts[:, 1] / np.maximum(counts[:, 0], 1), kind="stable")
+        missing = self.levels.get(MISSING, np.zeros(2))[0]
+        return counts[order, 0], counts[order, 1], missing
+
+
+# ============================================================
+# METRICS FROM HISTOGRAMS
+# ============================================================
+
+def histogram_metrics(rows: np.ndarray, bads: np.ndarray) -> dict:
+    """
+    IV, KS and Gini of an ordered rows / bads histogram.
+    Gini treats rows in the same bin as ties (counted half).
+    """
+    goods = rows - bads
+    total_bads, total_goods = bads.sum(), goods.sum()
+    if total_bads == 0 or total_goods == 0:
+        return {"iv": 0.0, "ks": 0.0, "gini": 0.0}
+
+    keep = rows > 0
+    b = (bads[keep] + SMOOTHING) / (total_bads + SMOOTHING * keep.sum())
+    g = (goods[keep] + SMOOTHING) / (total_goods + SMOOTHING * keep.sum())
+    iv = float(np.sum((g - b) * np.log(g / b)))
+
+    cum_bad = np.cumsum(bads) / total_bads
+    cum_good = np.cumsum(goods) / total_goods
+    ks = float(np.max(np.abs(cum_bad - cum_good)))
+
+    # P(bad ranks above good) with ties = 0.5
+    goods_below = np.concatenate([[0.0], np.cumsum(goods)[:-1]])
+    auc = float(np.sum(bads * (goods_below + 0.5 * goods)) / (total_bads * total_goods))
+    gini = abs(2 * auc - 1)
+
+    return {"iv": iv, "ks": ks, "gini": gini}
+
+
+# ============================================================
+# SCREENING
+# ============================================================
+
+def feature_kinds(chunk: pd.DataFrame, features: list) -> dict:
+    """
+    "numeric" / "categorical" per feature, fixed from the first
+    chunk so every worker bins a feature the same way.
+    """
+    return {
+        f: "numeric" if pd.api.types.is_numeric_dtype(chunk[f]) else "categorical"
+        for f in features
+    }
+
+
+def _labeled(chunk: pd.DataFrame, target: str) -> tuple:
+    bad = pd.to_numeric(chunk[target], errors="coerce")
+    keep = bad.notna().to_numpy()
+    return chunk[keep], bad[keep].to_numpy(dtype=float), int((~keep).sum())
+
+
+def screen_chunk(
+    chunk: pd.DataFrame,
+    kinds: dict,
+    bad: np.ndarray,
+    n_bins: int = N_BINS,
+    seed: tuple = (0, 0)
+) -> dict:
+    """
+    {feature: FeatureHistogram} for one labeled chunk; seed is
+    (run seed, chunk number).
+    """
+    return {
+        f: FeatureHistogram(
+            f, kind, n_bins, seed=[*seed, zlib.crc32(f.encode())]
+        ).update(chunk[f], bad)
+        for f, kind in kinds.items()
+    }
+
+
+def _merge_into(total: dict, part: dict) -> None:
+    for f, hist in part.items():
+        if f in total:
+            total[f].merge(hist)
+        else:
+            total[f] = hist
+
+
+def screening_report(hists: dict, n_rows: int) -> pd.DataFrame:
+    """
+    One row per feature, sorted by IV descending.
+    """
+    report = []
+    for f, hist in hists.items():
+        rows, bads, missing = hist.ordered_counts()
+        report.append({
+            "feature": f,
+            "kind": hist.kind,
+            **histogram_metrics(rows, bads),
+            "missing_rate": missing / n_rows if n_rows else np.nan,
+            "n_bins": int((rows > 0).sum()),
+            "in_lr": f in LR_SOURCE_COLUMNS,
+            "in_xgb": f in XGB_FEATURES,
+        })
+    return (
+        pd.DataFrame(report)
+        .sort_values("iv", ascending=False)
+        .reset_index(drop=True)
+    )
+
+
+def screen_features(
+    path: str,
+    features: list | None = None,
+    target: str = TARGET_COLUMN,
+    chunksize: int = 500_000,
+    n_bins: int = N_BINS,
+    max_workers: int | None = None,
+    seed: int = 0
+) -> pd.DataFrame:
+    """
+    Screen every candidate feature (default: all columns but
+    the target) in one pass over the CSV.
+
+    The driver parses each chunk once and submits it to the
+    pool; at most 2 x workers chunks are in flight, and partial
+    summaries are merged in chunk order. Results depend only on
+    the file, chunksize, n_bins and seed (not on max_workers).
+
+    Returns
+    -------
+    pd.DataFrame
+        feature, kind, iv, ks, gini, missing_rate, n_bins,
+        in_lr, in_xgb; sorted by IV descending.
+        attrs["rows"] / attrs["unlabeled_rows"]: rows used /
+        skipped for a missing target
+    """
+    if features is None:
+        features = [c for c in pd.read_csv(path, nrows=0).columns if c != target]
+
+    workers = max_workers or os.cpu_count() or 1
+    hists, kinds = {}, None
+    n_rows = unlabeled = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        reader = pd.read_csv(path, chunksize=chunksize, usecols=list(features) + [target])
+        for chunk_no, chunk in enumerate(reader):
+            chunk, bad, dropped = _labeled(chunk, target)
+            unlabeled += dropped
+            n_rows += len(chunk)
+            if kinds is None:
+                kinds = feature_kinds(chunk, features)
+
+            in_flight.append(pool.submit(
+                screen_chunk, chunk[features], kinds, bad, n_bins, (seed, chunk_no)
+            ))
+            if len(in_flight) >= 2 * workers:
+                _merge_into(hists, in_flight.popleft().result())
+
+        while in_flight:
+            _merge_into(hists, in_flight.popleft().result())
+
+    report = screening_report(hists, n_rows)
+    report.attrs.update(rows=n_rows, unlabeled_rows=unlabeled)
+    return report
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="IV / KS / Gini screening of candidate features"
+    )
+    parser.add_argument("path")
+    parser.add_argument("--target", default=TARGET_COLUMN)
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    parser.add_argument("--bins", type=int, default=N_BINS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="feature_screening.csv")
+    args = parser.parse_args()
+
+    report = screen_features(
+        args.path, None, args.target, args.chunksize, args.bins, args.workers, args.seed
+    )
+    report.to_csv(args.out, index=False)
+    print(report.head(30).to_string(index=False))
+    print(f"{len(report)} features, {report.attrs['rows']} rows "
+          f"({report.attrs['unlabeled_rows']} unlabeled skipped) -> {args.out}")
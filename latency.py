@@ -0,0 +1,241 @@
+# ============================================================
+# latency.py
+# ------------------------------------------------------------
+# Per-stage latency instrumentation
+# - `with stage("cc.lr.predict_proba"): ...` around each step
+# - Fixed log-bucket histograms per stage (p50 / p95 / p99)
+# - Disabled by default: stage() then returns a shared no-op
+#   context manager (one global check, no clock reads)
+#
+# Enable with latency.enable() or env CREDIT_RISK_LATENCY=1
+# ============================================================
+
+import json
+import math
+import os
+import signal
+import sys
+import threading
+import time
+
+
+ENABLED = os.environ.get("CREDIT_RISK_LATENCY", "") not in ("", "0")
+
+
+# ============================================================
+# HISTOGRAM (geometric buckets, 8 per octave ~ 9% width)
+# ============================================================
+
+MIN_SECONDS = 1e-6
+BUCKETS_PER_OCTAVE = 8
+N_BUCKETS = 27 * BUCKETS_PER_OCTAVE      # 1 µs .. ~134 s
+
+
+def bucket_upper_bound(i: int) -> float:
+    return MIN_SECONDS * 2 ** ((i + 1) / BUCKETS_PER_OCTAVE)
+
+
+class LatencyHistogram:
+    """
+    Thread-safe fixed-bucket latency histogram.
+    Percentiles are reported as bucket upper bounds
+    (capped at the observed max).
+    """
+
+    def __init__(self):
+        self.counts = [0] * N_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        if seconds <= MIN_SECONDS:
+            i = 0
+        else:
+            i = min(
+                int(math.log2(seconds / MIN_SECONDS) * BUCKETS_PER_OCTAVE),
+                N_BUCKETS - 1,
+            )
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def state(self) -> tuple:
+        """
+        Consistent copy: (bucket counts, count, total seconds).
+        """
+        with self._lock:
+            return list(self.counts), self.count, self.total
+
+    def percentile(self, q: float) -> float:
+        with self._lock:
+            counts, n, top = list(self.counts), self.count, self.max
+        if n == 0:
+            return float("nan")
+        target = q * n
+        running = 0
+        for i, c in enumerate(counts):
+            running += c
+            if running >= target:
+                return min(bucket_upper_bound(i), top)
+        return top
+
+    def summary(self) -> dict:
+        with self._lock:
+            count, total, top = self.count, self.total, self.max
+        return {
+            "count": count,
+            "mean_ms": 1e3 * total / count if count else float("nan"),
+            "p50_ms": 1e3 * self.percentile(0.50),
+            "p95_ms": 1e3 * self.percentile(0.95),
+            "p99_ms": 1e3 * self.percentile(0.99),
+            "max_ms": 1e3 * top,
+        }
+
+
+# ============================================================
+# STAGE REGISTRY
+# ============================================================
+
+_HISTOGRAMS = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def histogram(name: str) -> LatencyHistogram:
+    h = _HISTOGRAMS.get(name)
+    if h is None:
+        with _REGISTRY_LOCK:
+            h = _HISTOGRAMS.setdefault(name, LatencyHistogram())
+    return h
+
+
+class _StageTimer:
+    __slots__ = ("hist", "start")
+
+    def __init__(self, name: str):
+        self.hist = histogram(name)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.record(time.perf_counter() - self.start)
+        return False
+
+
+class _NoOp:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoOp()
+
+
+def stage(name: str):
+    """
+    Context manager timing one pipeline stage (no-op when
+    instrumentation is disabled).
+    """
+    if not ENABLED:
+        return _NOOP
+    return _StageTimer(name)
+
+
+# ============================================================
+# CONTROL + READOUT
+# ============================================================
+
+def enable(flag: bool = True) -> None:
+    global ENABLED
+    ENABLED = flag
+
+
+def disable() -> None:
+    enable(False)
+
+
+def reset() -> None:
+    with _REGISTRY_LOCK:
+        _HISTOGRAMS.clear()
+
+
+def histograms() -> list:
+    """
+    Sorted (stage, LatencyHistogram) pairs, copied under the
+    registry lock (a first stage() may add one concurrently).
+    """
+    with _REGISTRY_LOCK:
+        return sorted(_HISTOGRAMS.items())
+
+
+def snapshot() -> dict:
+    """
+    {stage: {count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}
+    """
+    return {name: h.summary() for name, h in histograms()}
+
+
+def dump(file=None, as_json: bool = False) -> None:
+    """
+    Write the current per-stage summary (table or JSON).
+    """
+    file = file or sys.stderr
+    snap = snapshot()
+
+    if as_json:
+        json.dump(snap, file, indent=2)
+        file.write("\n")
+        return
+
+    file.write(
+        f"{'stage':<34}{'count':>9}{'mean':>10}{'p50':>10}"
+        f"{'p95':>10}{'p99':>10}{'max':>10}   (ms)\n"
+    )
+    for name, s in snap.items():
+        file.write(
+            f"{name:<34}{s['count']:>9}{s['mean_ms']:>10.3f}{s['p50_ms']:>10.3f}"
+            f"{s['p95_ms']:>10.3f}{s['p99_ms']:>10.3f}{s['max_ms']:>10.3f}\n"
+        )
+    file.flush()
+
+
+_DUMP_REQUESTED = threading.Event()
+_DUMP_THREAD = None
+
+
+def _dump_on_request() -> None:
+    while True:
+        _DUMP_REQUESTED.wait()
+        _DUMP_REQUESTED.clear()
+        dump()
+
+
+def install_signal_dump(signum=getattr(signal, "SIGUSR1", None)) -> None:
+    """
+    Dump the latency table to stderr on a signal
+    (default SIGUSR1: `kill -USR1 <pid>`). POSIX only.
+
+    The handler only sets an event; a daemon thread does the
+    dump, so a signal arriving while the main thread holds a
+    histogram lock cannot deadlock.
+    """
+    global _DUMP_THREAD
+
+    if signum is None:
+        raise RuntimeError("signal-triggered dump needs a POSIX platform")
+    if _DUMP_THREAD is None:
+        _DUMP_THREAD = threading.Thread(
+            target=_dump_on_request, name="latency-dump", daemon=True
+        )
+        _DUMP_THREAD.start()
+    signal.signal(signum, lambda *_: _DUMP_REQUESTED.set())
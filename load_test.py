@@ -0,0 +1,258 @@
+# ============================================================
+# load_test.py
+# ------------------------------------------------------------
+# Open-loop load generator for the scoring entry points
+# - Records: replayed JSONL (one borrower per line, or a
+#   {"input": {...}} decision-log row) or synthetic borrowers
+# - Targets: in-process run_champion_challenger or a local
+#   HTTP /score endpoint (scoring_service.py)
+# - Arrivals follow a fixed schedule at the target QPS (open
+#   loop: slow responses never delay later sends); a bounded
+#   worker pool caps concurrency
+# - Reports throughput, error rate and p50/p95/p99/p99.9
+#   latency per interval and overall
+# ============================================================
+
+import gzip
+import itertools
+import json
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+# RECORD SOURCES
+# ============================================================
+
+def load_records(path: str) -> list:
+    """
+    Borrower dicts from a (optionally gzip) JSONL file.
+    Decision-log rows are unwrapped to their "input".
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    records = []
+    with opener(path, "rt") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            records.append(row.get("input", row))
+    return records
+
+
+def synthetic_borrowers(n: int, seed: int = 0) -> list:
+    """
+    Random but schema-complete borrowers (UI value ranges).
+    """
+    rng = np.random.default_rng(seed)
+
+    def pick(values):
+        return [values[i] for i in rng.integers(0, len(values), n)]
+
+    fico = rng.integers(600, 830, n)
+    frame = pd.DataFrame({
+        "loan_amnt": rng.integers(1000, 40000, n),
+        "term": pick([36, 60]),
+        "int_rate": rng.uniform(5, 28, n).round(2),
+        "emp_length": pick(["<1", "1-3", "3-5", "5-10", "10+", "Missing"]),
+        "home_ownership": pick(["RENT", "OWN", "MORTGAGE", "OTHER"]),
+        "annual_inc": rng.integers(20000, 200000, n),
+        "purpose": pick(["debt_consolidation", "credit_card", "small_business",
+                         "home_improvement", "other"]),
+        "verification_status": pick(["Not Verified", "Source Verified", "Verified"]),
+        "fico": fico,
+        "fico_range_low": fico,
+        "dti": rng.uniform(0, 45, n).round(1),
+        "inq_last_6mths": rng.integers(0, 6, n),
+        "revol_util": rng.uniform(0, 100, n).round(1),
+        "bc_util": rng.uniform(0, 100, n).round(1),
+        "percent_bc_gt_75": rng.uniform(0, 100, n).round(1),
+        "acc_open_past_24mths": rng.integers(0, 10, n),
+        "mo_sin_old_rev_tl_op": rng.integers(12, 400, n),
+        "mo_sin_rcnt_tl": rng.integers(0, 40, n),
+        "mths_since_recent_inq": rng.integers(0, 24, n),
+        "credit_age_months": rng.integers(12, 400, n),
+        "mort_acc": rng.integers(0, 5, n),
+        "total_bc_limit": rng.integers(1000, 80000, n),
+        "delinq_2yrs": rng.integers(0, 3, n),
+        "avg_cur_bal": rng.integers(500, 40000, n),
+        "num_actv_rev_tl": rng.integers(0, 15, n),
+        "mths_since_recent_bc": rng.integers(0, 60, n),
+        "tot_cur_bal": rng.integers(1000, 400000, n),
+        "grade": pick(list("ABCDEFG")),
+        "sub_grade": pick([f"{g}{i}" for g in "ABCDEFG" for i in range(1, 6)]),
+    })
+    # plain Python scalars, as a JSON client would send
+    return json.loads(frame.to_json(orient="records"))
+
+
+# ============================================================
+# TARGETS
+# ============================================================
+
+def in_process_target():
+    from champion_challenger_engine import run_champion_challenger
+    return run_champion_challenger
+
+
+def http_target(url: str = "http://127.0.0.1:8080/score", timeout: float = 10.0):
+    def call(user_input: dict):
+        request = urllib.request.Request(
+            url,
+            data=json.dumps(user_input).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read()
+    return call
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+def _percentiles(latencies: np.ndarray) -> dict:
+    if len(latencies) == 0:
+        return {f"p{q}_ms": np.nan for q in ("50", "95", "99", "99.9")}
+    p = np.percentile(latencies, [50, 95, 99, 99.9]) * 1e3
+    return {"p50_ms": p[0], "p95_ms": p[1], "p99_ms": p[2], "p99.9_ms": p[3]}
+
+
+def run_load(
+    target,
+    records: list,
+    qps: float,
+    duration: float,
+    concurrency: int = 8,
+    interval: float = 1.0
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Fire requests at a fixed arrival rate for `duration` seconds.
+
+    Latency is measured from the SCHEDULED send time, so time
+    spent queued behind the concurrency limit counts (no
+    coordinated omission).
+
+    Returns
+    -------
+    (timeline, summary)
+        timeline : one row per `interval` seconds
+        summary  : overall throughput, errors, percentiles
+    """
+    n_requests = int(qps * duration)
+    results = []                       # (scheduled offset, latency, ok)
+    results_lock = threading.Lock()
+    source = itertools.cycle(records)
+    dropped = 0
+
+    def fire(user_input, scheduled_at):
+        ok = True
+        try:
+            target(user_input)
+        except Exception:
+            ok = False
+        done = time.perf_counter()
+        with results_lock:
+            results.append((scheduled_at - start, done - scheduled_at, ok))
+
+    # one slot per worker plus a small backlog; beyond that
+    # arrivals are counted as dropped instead of queueing forever
+    slots = threading.BoundedSemaphore(concurrency * 4)
+
+    def release(_):
+        slots.release()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(n_requests):
+            scheduled_at = start + i / qps
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if not slots.acquire(blocking=False):
+                dropped += 1
+                continue
+            pool.submit(fire, next(source), scheduled_at).add_done_callback(release)
+    wall = time.perf_counter() - start
+
+    df = pd.DataFrame(results, columns=["offset", "latency", "ok"])
+    df["window"] = (df["offset"] // interval).astype(int)
+
+    timeline = []
+    for window, g in df.groupby("window"):
+        timeline.append({
+            "t_start": window * interval,
+            "completed": len(g),
+            "throughput_rps": len(g) / interval,
+            "error_rate": 1 - g["ok"].mean(),
+            **_percentiles(g.loc[g["ok"], "latency"].to_numpy()),
+        })
+
+    summary = {
+        "target_qps": qps,
+        "offered": n_requests,
+        "completed": len(df),
+        "dropped_at_client": dropped,
+        "achieved_rps": len(df) / wall if wall else np.nan,
+        "error_rate": 1 - df["ok"].mean() if len(df) else np.nan,
+        **_percentiles(df.loc[df["ok"], "latency"].to_numpy()),
+    }
+    return pd.DataFrame(timeline), summary
+
+
+def find_saturation(target, records, qps_steps, duration=10.0, concurrency=8, p99_slo_ms=250.0) -> pd.DataFrame:
+    """
+    Step through increasing QPS levels; the saturation point
+    is the first level missing the target rate or the p99 SLO.
+    """
+    rows = []
+    for qps in qps_steps:
+        _, summary = run_load(target, records, qps, duration, concurrency)
+        summary["saturated"] = (
+            summary["achieved_rps"] < 0.95 * qps
+            or summary["p99_ms"] > p99_slo_ms
+            or summary["error_rate"] > 0.01
+        )
+        rows.append(summary)
+    return pd.DataFrame(rows)
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scoring load test")
+    parser.add_argument("--records", help="JSONL(.gz) of borrowers; default synthetic")
+    parser.add_argument("--synthetic", type=int, default=1000)
+    parser.add_argument("--url", help="HTTP /score endpoint; default in-process")
+    parser.add_argument("--qps", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--sweep", help="comma-separated QPS levels for a saturation sweep")
+    args = parser.parse_args()
+
+    records = load_records(args.records) if args.records else synthetic_borrowers(args.synthetic)
+    target = http_target(args.url) if args.url else in_process_target()
+
+    if args.sweep:
+        levels = [float(x) for x in args.sweep.split(",")]
+        print(find_saturation(target, records, levels, args.duration, args.concurrency).to_string(index=False))
+    else:
+        timeline, summary = run_load(
+            target, records, args.qps, args.duration, args.concurrency, args.interval
+        )
+        print(timeline.to_string(index=False))
+        print()
+        for k, v in summary.items():
+            print(f"{k:>18}: {v:.3f}" if isinstance(v, float) else f"{k:>18}: {v}")
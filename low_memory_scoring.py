@@ -0,0 +1,187 @@
+# ============================================================
+# low_memory_scoring.py
+# ------------------------------------------------------------
+# Low-memory Champion–Challenger batch scoring
+# - Model inputs live in two PREALLOCATED float32 buffers
+#   (chunk_size x 18 LR WOE, chunk_size x 24 XGB) reused
+#   for every chunk
+# - Columns are filled in place, one feature at a time;
+#   no per-chunk WOE / XGB DataFrames are built
+# - LR PD is computed directly as sigmoid(X @ coef + b)
+# ------------------------------------------------------------
+# Peak-memory bound per chunk (excluding the input chunk and
+# the model artifacts themselves), see peak_bytes_bound():
+#
+#   buffers   : chunk_size * (18 + 24) * 4       bytes
+#   outputs   : chunk_size * (4 * 8 + 4 * 1)     bytes
+#   temporary : chunk_size * 8 * 4               bytes
+#               (one float64 source column, its codes /
+#                mask, and the LR logit vector at a time)
+#   xgboost   : chunk_size * 8 * 2 per calibrated fold
+#               (margin + probability output)
+#   fixed     : 128 KB per call (sklearn / xgboost input
+#               validation, small lookups)
+#
+# i.e. 128 KB + ~0.3 KB per row of chunk_size, independent
+# of the total number of rows scored.
+# ============================================================
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from decision_engine import (
+    DECISION_EDGES,
+    DECISIONS,
+    RISK_BAND_EDGES,
+    RISK_BANDS,
+)
+from feature_pipeline import XGB_TRAIN_FEATURES, xgb_column_batch
+from feature_schema import LR_FEATURES
+from model_registry import load_lr_bundle, load_xgb_model, load_pd_calibration
+from scorecard import pd_to_score
+from woe_transformer import WOE_TABLES, bin_codes_batch
+
+
+N_XGB_FOLDS_ESTIMATE = 5
+FIXED_OVERHEAD_BYTES = 128 * 1024
+
+
+def peak_bytes_bound(chunk_size: int, xgb_folds: int = N_XGB_FOLDS_ESTIMATE) -> int:
+    """
+    Documented upper bound on scorer-owned bytes for one chunk
+    (see module header).
+    """
+    buffers = chunk_size * (len(LR_FEATURES) + len(XGB_TRAIN_FEATURES)) * 4
+    outputs = chunk_size * (4 * 8 + 4 * 1)
+    temporary = chunk_size * 8 * 4
+    xgboost = chunk_size * 8 * 2 * xgb_folds
+    return FIXED_OVERHEAD_BYTES + buffers + outputs + temporary + xgboost
+
+
+# ============================================================
+# SCORER
+# ============================================================
+
+class LowMemoryScorer:
+    """
+    Reusable-buffer scorer for chunks of at most chunk_size rows.
+
+    score_chunk() returns VIEWS into the output buffers; copy
+    them (or write them out) before scoring the next chunk.
+    """
+
+    def __init__(self, chunk_size: int = 50_000):
+        self.chunk_size = chunk_size
+
+        bundle = load_lr_bundle()
+        lr_model = bundle["model"]
+        self.lr_coef = lr_model.coef_[0].astype(np.float32)
+        self.lr_intercept = np.float32(lr_model.intercept_[0])
+        self.xgb_model = load_xgb_model()
+        self.calibrators = load_pd_calibration()
+
+        # input buffers (C-contiguous, float32)
+        self.X_lr = np.empty((chunk_size, len(LR_FEATURES)), dtype=np.float32)
+        self.X_xgb = np.empty((chunk_size, len(XGB_TRAIN_FEATURES)), dtype=np.float32)
+
+        # output buffers
+        self.pd_lr = np.empty(chunk_size, dtype=np.float64)
+        self.pd_xgb = np.empty(chunk_size, dtype=np.float64)
+        self.score_lr = np.empty(chunk_size, dtype=np.float64)
+        self.score_xgb = np.empty(chunk_size, dtype=np.float64)
+        self.band_lr = np.empty(chunk_size, dtype=np.int8)
+        self.band_xgb = np.empty(chunk_size, dtype=np.int8)
+        self.decision_lr = np.empty(chunk_size, dtype=np.int8)
+        self.decision_xgb = np.empty(chunk_size, dtype=np.int8)
+
+    def score_chunk(self, df: pd.DataFrame) -> dict:
+        """
+        Score one raw-input chunk (len(df) <= chunk_size).
+
+        Returns
+        -------
+        dict of array views
+            pd_lr, score_lr, risk_band_lr, decision_lr,
+            pd_xgb, score_xgb, risk_band_xgb, decision_xgb
+            (band / decision as int8 codes into RISK_BANDS /
+            DECISIONS – see decode())
+        """
+        n = len(df)
+        if n > self.chunk_size:
+            raise ValueError(f"chunk of {n} rows exceeds chunk_size={self.chunk_size}")
+
+        X_lr = self.X_lr[:n]
+        X_xgb = self.X_xgb[:n]
+
+        # ----------------------------
+        # Fill inputs column by column
+        # ----------------------------
+        for j, f in enumerate(LR_FEATURES):
+            X_lr[:, j] = WOE_TABLES[f][bin_codes_batch(f, df)]
+
+        for j, col in enumerate(XGB_TRAIN_FEATURES):
+            X_xgb[:, j] = xgb_column_batch(col, df)
+
+        # ----------------------------
+        # PDs
+        # ----------------------------
+        logit = X_lr @ self.lr_coef
+        logit += self.lr_intercept
+        np.negative(logit, out=logit)
+        np.exp(logit, out=logit)
+        logit += 1
+        np.reciprocal(logit, out=logit)
+        self.pd_lr[:n] = logit
+
+        with warnings.catch_warnings():
+            # buffers carry no column names; order is XGB_TRAIN_FEATURES
+            warnings.filterwarnings("ignore", message="X does not have valid feature names")
+            self.pd_xgb[:n] = self.xgb_model.predict_proba(X_xgb)[:, 1]
+
+        # ----------------------------
+        # Scores, bands, decisions
+        # ----------------------------
+        out = {}
+        for model in ("lr", "xgb"):
+            pds = getattr(self, f"pd_{model}")[:n]
+            scores = getattr(self, f"score_{model}")[:n]
+            bands = getattr(self, f"band_{model}")[:n]
+            decisions = getattr(self, f"decision_{model}")[:n]
+
+            calibrator = self.calibrators.get(model)
+            if calibrator is not None:
+                pds[:] = calibrator(pds)
+
+            scores[:] = pd_to_score(pds)
+            bands[:] = np.searchsorted(RISK_BAND_EDGES, scores, side="right")
+            decisions[:] = np.searchsorted(DECISION_EDGES, scores, side="right")
+
+            out[f"pd_{model}"] = pds
+            out[f"score_{model}"] = scores
+            out[f"risk_band_{model}"] = bands
+            out[f"decision_{model}"] = decisions
+
+        return out
+
+
+def decode(result: dict, index=None) -> pd.DataFrame:
+    """
+    Turn score_chunk() views into the run_champion_challenger_batch
+    column layout (copies; use only for output).
+    """
+    bands = np.asarray(RISK_BANDS, dtype=object)
+    decisions = np.asarray(DECISIONS, dtype=object)
+    out = pd.DataFrame({
+        "pd_lr": result["pd_lr"],
+        "score_lr": result["score_lr"],
+        "risk_band_lr": bands[result["risk_band_lr"]],
+        "decision_lr": decisions[result["decision_lr"]],
+        "pd_xgb": result["pd_xgb"],
+        "score_xgb": result["score_xgb"],
+        "risk_band_xgb": bands[result["risk_band_xgb"]],
+        "decision_xgb": decisions[result["decision_xgb"]],
+    }, index=index)
+    out["agreement"] = out["decision_lr"] == out["decision_xgb"]
+    return out
@@ -0,0 +1,193 @@
+# ============================================================
+# lr_refit.py
+# ------------------------------------------------------------
+# Out-of-core refit of the WOE logistic scorecard
+# - Streams labeled raw training CSVs in chunks through the
+#   batch WOE transform (transform_batch_to_woe)
+# - Newton / IRLS passes: each chunk adds its gradient and
+#   19 x 19 Hessian to running sums, so only one chunk plus
+#   the sums are ever in memory
+# - Rows without a usable target are skipped
+# - Warm start from the current model.joblib coefficients;
+#   same objective as sklearn LogisticRegression (L2, C,
+#   unpenalised intercept), so a few passes converge
+# - Writes a {"model", "features"} bundle pd_predictor loads
+# ============================================================
+
+import copy
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from feature_schema import LR_FEATURES
+from model_registry import load_lr_bundle
+from woe_fitter import TARGET_COLUMN
+from woe_transformer import transform_batch_to_woe
+
+
+# ============================================================
+# ONE PASS OVER THE DATA
+# ============================================================
+
+def _chunks(paths, target: str, chunksize: int):
+    for path in paths:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            y = pd.to_numeric(chunk[target], errors="coerce")
+            chunk, y = chunk[y.notna()], y[y.notna()]
+            if chunk.empty:
+                continue
+            X = transform_batch_to_woe(chunk).to_numpy(dtype=float)
+            yield X, y.to_numpy(dtype=float)
+
+
+def newton_pass(paths, theta: np.ndarray, C: float, target: str, chunksize: int) -> tuple:
+    """
+    Accumulate gradient, Hessian and log-loss of the penalised
+    objective at theta = [coef..., intercept] over all chunks.
+    """
+    k = len(theta)
+    grad, hess = np.zeros(k), np.zeros((k, k))
+    loss, rows = 0.0, 0
+
+    for X, y in _chunks(paths, target, chunksize):
+        Xa = np.column_stack([X, np.ones(len(X))])
+        z = Xa @ theta
+        p = 1.0 / (1.0 + np.exp(-z))
+
+        grad += Xa.T @ (p - y)
+        hess += (Xa * (p * (1 - p))[:, None]).T @ Xa
+        loss += float(np.sum(np.logaddexp(0, z) - y * z))
+        rows += len(y)
+
+    # objective = C * sum(logloss) + 0.5 * ||coef||^2
+    penalty = np.r_[np.ones(k - 1), 0.0]
+    grad = C * grad + penalty * theta
+    hess = C * hess + np.diag(penalty)
+    objective = C * loss + 0.5 * float(np.sum(penalty * theta ** 2))
+
+    return grad, hess, objective, loss / max(rows, 1), rows
+
+
+# ============================================================
+# REFIT
+# ============================================================
+
+def refit_lr(
+    paths,
+    target: str = TARGET_COLUMN,
+    chunksize: int = 500_000,
+    max_passes: int = 10,
+    tol: float = 1e-6,
+    base_bundle: dict | None = None,
+    verbose: bool = False
+) -> dict:
+    """
+    Refit the LR scorecard out of core.
+
+    Parameters
+    ----------
+    paths : str or list[str]
+        Labeled raw training CSV(s)
+    target : str
+        Default flag column (1 = bad)
+    max_passes : int
+        Maximum Newton passes over the data
+    tol : float
+        Stop when the max absolute parameter step is below tol
+        (history row 0 is the warm-start fit before any step)
+    base_bundle : dict, optional
+        Warm start + hyperparameters (default: registry bundle)
+
+    Returns
+    -------
+    dict
+        {"model": LogisticRegression, "features": LR_FEATURES,
+         "history": [{"pass", "rows", "logloss", "step"}]}
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+
+    base = base_bundle or load_lr_bundle()
+    if list(base["features"]) != LR_FEATURES:
+        raise ValueError("base bundle features do not match LR_FEATURES")
+
+    model = copy.deepcopy(base["model"])
+    C = float(model.C)
+    theta = np.r_[model.coef_[0], model.intercept_[0]].astype(float)
+
+    grad, hess, objective, logloss, rows = newton_pass(
+        paths, theta, C, target, chunksize
+    )
+    history = [{"pass": 0, "rows": rows, "logloss": logloss, "step": 0.0}]
+
+    for i in range(max_passes):
+        step = np.linalg.solve(hess, grad)
+
+        # the pass at the candidate also checks the objective;
+        # halve the step while it increases
+        for _ in range(20):
+            candidate = theta - step
+            result = newton_pass(paths, candidate, C, target, chunksize)
+            if result[2] <= objective:
+                break
+            step /= 2
+        else:
+            # no descent step found: keep the current theta
+            if verbose:
+                print(f"pass {i + 1}: line search failed, stopping")
+            break
+
+        theta = candidate
+        grad, hess, objective, logloss, rows = result
+        history.append({
+            "pass": i + 1,
+            "rows": rows,
+            "logloss": logloss,
+            "step": float(np.max(np.abs(step))),
+        })
+        if verbose:
+            print(history[-1])
+        if history[-1]["step"] < tol:
+            break
+
+    model.coef_ = theta[:-1].reshape(1, -1)
+    model.intercept_ = theta[-1:].copy()
+    model.n_iter_ = np.array([len(history) - 1])
+
+    return {"model": model, "features": list(LR_FEATURES), "history": history}
+
+
+def save_bundle(bundle: dict, path: str = "model_refit.joblib") -> None:
+    """
+    Persist in the pd_predictor format ({"model", "features"}).
+    """
+    joblib.dump({"model": bundle["model"], "features": bundle["features"]}, path)
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Out-of-core refit of the WOE logistic scorecard"
+    )
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--target", default=TARGET_COLUMN)
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    parser.add_argument("--max-passes", type=int, default=10)
+    parser.add_argument("--tol", type=float, default=1e-6)
+    parser.add_argument("--out", default="model_refit.joblib")
+    args = parser.parse_args()
+
+    bundle = refit_lr(
+        args.paths, args.target, args.chunksize, args.max_passes, args.tol,
+        verbose=True
+    )
+    save_bundle(bundle, args.out)
+    print(f"{bundle['history'][-1]['rows']} rows, "
+          f"{len(bundle['history']) - 1} Newton steps -> {args.out}")
@@ -0,0 +1,149 @@
+# ============================================================
+# memory_report.py
+# ------------------------------------------------------------
+# Memory footprint accounting for the scoring pods
+# 1) Resident bytes per loaded artifact (LR bundle, XGB
+#    model, XGB feature list, WOE maps)
+# 2) Peak bytes per batch size, standard vs low-memory mode
+# ------------------------------------------------------------
+# Python-heap bytes come from tracemalloc. XGBoost keeps its
+# trees in native memory tracemalloc cannot see, so the RSS
+# delta (Linux /proc) is reported next to it.
+# ============================================================
+
+import gc
+import json
+import os
+import tracemalloc
+
+import joblib
+import pandas as pd
+
+import model_registry
+
+
+ARTIFACTS = {
+    "lr_bundle": (model_registry.LR_BUNDLE_PATH, joblib.load),
+    "xgb_model": (model_registry.XGB_MODEL_PATH, joblib.load),
+    "xgb_features": (model_registry.XGB_FEATURES_PATH, model_registry._load_json),
+    "woe_maps": (model_registry.WOE_MAPS_PATH, model_registry._load_json),
+}
+
+
+def rss_bytes() -> int | None:
+    """
+    Current resident set size (Linux), None elsewhere.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+# ============================================================
+# 1) ARTIFACT FOOTPRINT
+# ============================================================
+
+def artifact_footprint() -> pd.DataFrame:
+    """
+    Load a throw-away copy of each artifact and measure what
+    it costs to keep resident.
+    """
+    rows = []
+    for name, (path, loader) in ARTIFACTS.items():
+        # warm-up load so library imports are not billed to the
+        # artifact; kept alive so its pages are not reused below
+        warm = loader(path)
+
+        gc.collect()
+        rss_before = rss_bytes()
+        tracemalloc.start()
+
+        obj = loader(path)
+
+        traced, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rss_after = rss_bytes()
+
+        rows.append({
+            "artifact": name,
+            "path": path,
+            "file_bytes": os.path.getsize(path),
+            "python_heap_bytes": traced,
+            "rss_delta_bytes": (
+                rss_after - rss_before if rss_before is not None else None
+            ),
+            "loaded_in_registry": path in model_registry.loaded_artifacts(),
+        })
+        del obj, warm
+
+    return pd.DataFrame(rows)
+
+
+# ============================================================
+# 2) PEAK BYTES PER BATCH SIZE
+# ============================================================
+
+def batch_peak_bytes(sample: pd.DataFrame, batch_sizes=(1, 100, 1_000, 10_000)) -> pd.DataFrame:
+    """
+    tracemalloc peak while scoring one batch of each size,
+    in standard (DataFrame) and low-memory (buffer) mode.
+    `sample` must hold at least max(batch_sizes) raw rows.
+    """
+    from champion_challenger_engine import run_champion_challenger_batch
+    from low_memory_scoring import LowMemoryScorer, peak_bytes_bound
+
+    rows = []
+    for n in batch_sizes:
+        batch = sample.iloc[:n]
+        scorer = LowMemoryScorer(n)          # buffers allocated up front
+
+        for mode, fn in (
+            ("standard", run_champion_challenger_batch),
+            ("low_memory", scorer.score_chunk),
+        ):
+            fn(batch)                        # warm-up (lazy imports, caches)
+            gc.collect()
+            tracemalloc.start()
+            fn(batch)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            rows.append({
+                "batch_size": n,
+                "mode": mode,
+                "peak_bytes": peak,
+                "peak_bytes_per_row": peak / n,
+                "documented_bound": peak_bytes_bound(n) if mode == "low_memory" else None,
+            })
+
+    return pd.DataFrame(rows)
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scoring memory report")
+    parser.add_argument("--sample", help="raw CSV used for batch peaks")
+    parser.add_argument("--batch-sizes", default="1,100,1000,10000")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report = {"artifacts": artifact_footprint()}
+    if args.sample:
+        sizes = [int(x) for x in args.batch_sizes.split(",")]
+        sample = pd.read_csv(args.sample, nrows=max(sizes))
+        report["batches"] = batch_peak_bytes(sample, sizes)
+
+    if args.json:
+        print(json.dumps({k: v.to_dict("records") for k, v in report.items()}, indent=2))
+    else:
+        for name, df in report.items():
+            print(f"\n== {name} ==")
+            print(df.to_string(index=False))
@@ -0,0 +1,297 @@
+# ============================================================
+# metrics.py
+# ------------------------------------------------------------
+# Prometheus text-format metrics for the scoring service
+# - Counters / histograms are SHARDED per thread: the hot
+#   path only touches its own thread-local dict (no lock);
+#   a scrape sums the shards, so collection never blocks
+#   scoring threads
+# - Shards of finished threads are folded into a retired
+#   total at scrape time, so per-connection threads don't
+#   leak memory
+# ============================================================
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ============================================================
+# SHARDED PRIMITIVES
+# ============================================================
+
+class _Sharded:
+
+    def __init__(self, name: str, help_text: str, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._local = threading.local()
+        self._shards = []                  # (thread, dict)
+        self._retired = {}
+        self._lock = threading.Lock()      # registration / scrape only
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+            self._local.shard = shard
+            return shard
+
+    def _merge(self, into: dict, shard: dict) -> None:
+        raise NotImplementedError
+
+    def collect(self) -> dict:
+        """
+        {label values tuple: aggregated value} across all threads.
+        """
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    self._merge(self._retired, shard)
+            self._shards = live
+            totals = {}
+            self._merge(totals, self._retired)
+            for _, shard in live:
+                self._merge(totals, dict(shard))
+        return totals
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge(self, into, shard):
+        for k, v in shard.items():
+            into[k] = into.get(k, 0) + v
+
+
+# Default buckets (seconds) for request / stage latency
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, label_names=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels) -> None:
+        shard = self._shard()
+        state = shard.get(labels)
+        if state is None:
+            state = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        # non-cumulative bucket counts; last count slot = +Inf
+        i = 0
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                break
+        else:
+            i = len(self.buckets)
+        state[i] += 1
+        state[-1] += value
+
+    def _merge(self, into, shard):
+        for k, v in shard.items():
+            acc = into.get(k)
+            if acc is None:
+                into[k] = list(v)
+            else:
+                for i, x in enumerate(v):
+                    acc[i] += x
+
+
+# ============================================================
+# REGISTRY
+# ============================================================
+
+REQUESTS = Counter(
+    "scoring_requests_total", "Scored requests per model", ["model"])
+DECISIONS = Counter(
+    "scoring_decisions_total", "Decisions per model (score_to_decision)", ["model", "decision"])
+ERRORS = Counter(
+    "scoring_errors_total", "Requests that failed to score")
+COMPARISONS = Counter(
+    "champion_challenger_comparisons_total", "Requests scored by both models")
+DISAGREEMENTS = Counter(
+    "champion_challenger_disagreements_total", "LR vs XGB decision disagreements")
+REQUEST_LATENCY = Histogram(
+    "scoring_request_duration_seconds", "End-to-end scoring latency")
+# request-path caches: the reason_codes XGB LRU, used by the
+# service when started with --reason-codes
+CACHE_HITS = Counter(
+    "cache_hits_total", "Request-path cache hits", ["cache"])
+CACHE_MISSES = Counter(
+    "cache_misses_total", "Request-path cache misses", ["cache"])
+
+REGISTRY = [
+    REQUESTS, DECISIONS, ERRORS, COMPARISONS, DISAGREEMENTS,
+    REQUEST_LATENCY, CACHE_HITS, CACHE_MISSES,
+]
+
+
+def record_result(result: dict, seconds: float | None = None) -> None:
+    """
+    Count one run_champion_challenger result.
+    """
+    for model, key in (("lr", "logistic"), ("xgb", "xgboost")):
+        REQUESTS.inc(model)
+        DECISIONS.inc(model, result[key]["decision"])
+    COMPARISONS.inc()
+    if not result["agreement"]:
+        DISAGREEMENTS.inc()
+    if seconds is not None:
+        REQUEST_LATENCY.observe(seconds)
+
+
+# ============================================================
+# TEXT EXPOSITION
+# ============================================================
+
+def _escape(value) -> str:
+    return (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    )
+
+
+def _fmt_labels(names, values, extra=()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _render_metric(metric, lines: list) -> None:
+    lines.append(f"# HELP {metric.name} {metric.help}")
+    lines.append(f"# TYPE {metric.name} {metric.kind}")
+    values = metric.collect()
+
+    if metric.kind == "counter":
+        if not values and not metric.label_names:
+            # unlabelled counters always have their one sample
+            values = {(): 0}
+        for labels, v in sorted(values.items()):
+            lines.append(f"{metric.name}{_fmt_labels(metric.label_names, labels)} {v}")
+        return
+
+    for labels, state in sorted(values.items()):
+        running = 0
+        for upper, c in zip(list(metric.buckets) + ["+Inf"], state[:-1]):
+            running += c
+            le = upper if upper == "+Inf" else repr(float(upper))
+            lines.append(
+                f"{metric.name}_bucket"
+                f"{_fmt_labels(metric.label_names, labels, [('le', le)])} {running}"
+            )
+        base = _fmt_labels(metric.label_names, labels)
+        lines.append(f"{metric.name}_sum{base} {state[-1]}")
+        lines.append(f"{metric.name}_count{base} {running}")
+
+
+def _stage_bounds() -> list:
+    """
+    (latency.py bucket index, its upper bound) for the largest
+    latency.py bound at or below each LATENCY_BUCKETS bound.
+    Exported le values are these native bounds, so no latency.py
+    bucket straddles an exported one (le is e.g. 0.000917, not
+    0.001).
+    """
+    import latency
+
+    bounds = {}
+    for upper in LATENCY_BUCKETS:
+        k = max(
+            (i for i in range(latency.N_BUCKETS) if latency.bucket_upper_bound(i) <= upper),
+            default=None,
+        )
+        if k is not None:
+            bounds[k] = latency.bucket_upper_bound(k)
+    return sorted(bounds.items())
+
+
+def _render_stage_latency(lines: list) -> None:
+    # per-stage histograms from latency.py (when enabled),
+    # exported on latency.py bounds close to LATENCY_BUCKETS
+    import latency
+
+    snap = latency.histograms()
+    if not snap:
+        return
+
+    name = "scoring_stage_duration_seconds"
+    lines.append(f"# HELP {name} Per-stage latency (latency.stage hooks)")
+    lines.append(f"# TYPE {name} histogram")
+    bounds = _stage_bounds()
+    for stage_name, h in snap:
+        counts, n, total = h.state()
+        for k, upper in bounds:
+            c = sum(counts[:k + 1])
+            lines.append(f'{name}_bucket{{stage="{stage_name}",le="{float(upper)!r}"}} {c}')
+        lines.append(f'{name}_bucket{{stage="{stage_name}",le="+Inf"}} {n}')
+        lines.append(f'{name}_sum{{stage="{stage_name}"}} {total}')
+        lines.append(f'{name}_count{{stage="{stage_name}"}} {n}')
+
+
+def _render_model_loads(lines: list) -> None:
+    import model_registry
+
+    name = "model_load_seconds"
+    lines.append(f"# HELP {name} Time spent loading each artifact")
+    lines.append(f"# TYPE {name} gauge")
+    for path, seconds in sorted(model_registry.LOAD_SECONDS.items()):
+        lines.append(f'{name}{{artifact="{path}"}} {seconds}')
+
+
+def render() -> str:
+    """
+    Prometheus text exposition (format 0.0.4).
+    """
+    lines = []
+    for metric in REGISTRY:
+        _render_metric(metric, lines)
+    _render_stage_latency(lines)
+    _render_model_loads(lines)
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ============================================================
+# STANDALONE ENDPOINT (batch jobs / non-HTTP processes)
+# ============================================================
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(host: str = "127.0.0.1", port: int = 9100) -> ThreadingHTTPServer:
+    """
+    Serve /metrics from a daemon thread.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
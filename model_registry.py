@@ -0,0 +1,202 @@
+# ============================================================
+# model_registry.py
+# ------------------------------------------------------------
+# Shared, load-once access to every scoring artifact
+# - One in-memory copy per artifact per process, however
+#   many modules import it
+# - Load time recorded per artifact (LOAD_SECONDS)
+# ============================================================
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import joblib
+
+
+LR_BUNDLE_PATH = "model.joblib"
+XGB_MODEL_PATH = "xgb_model.joblib"
+XGB_FEATURES_PATH = "xgb_features.json"
+WOE_MAPS_PATH = "woe_maps.json"
+PD_CALIBRATION_PATH = "pd_calibration.json"
+
+_CACHE = {}
+_LOCK = threading.Lock()
+
+# artifact path -> seconds spent loading it
+LOAD_SECONDS = {}
+
+# Artifacts whose content determines every score
+SCORING_ARTIFACTS = [
+    LR_BUNDLE_PATH,
+    XGB_MODEL_PATH,
+    XGB_FEATURES_PATH,
+    WOE_MAPS_PATH,
+    PD_CALIBRATION_PATH,
+]
+
+# path -> ((mtime_ns, size), sha256)
+_FILE_HASHES = {}
+
+# artifact path -> sha256 of the file as it was when loaded
+LOADED_HASHES = {}
+
+# in-process overrides that change scores (name -> "source@sha256"),
+# e.g. woe_transformer.apply_binning; part of loaded_fingerprint
+OVERRIDES = {}
+
+# env var naming the binning spec woe_transformer applies at import
+BINNING_ENV = "CREDIT_RISK_BINNING"
+
+
+def _load(path: str, loader):
+    obj = _CACHE.get(path)
+    if obj is None:
+        with _LOCK:
+            obj = _CACHE.get(path)
+            if obj is None:
+                start = time.perf_counter()
+                # re-load if the file was replaced while being read
+                sha = None
+                while sha is None or sha != file_hash(path):
+                    sha = file_hash(path)
+                    obj = loader(path)
+                LOAD_SECONDS[path] = time.perf_counter() - start
+                LOADED_HASHES[path] = sha
+                _CACHE[path] = obj
+    return obj
+
+
+def _load_json(path: str):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+# ============================================================
+# PUBLIC LOADERS
+# ============================================================
+
+def load_lr_bundle(path: str = LR_BUNDLE_PATH) -> dict:
+    """
+    {"model": LogisticRegression, "features": [...]}
+    """
+    return _load(path, joblib.load)
+
+
+def load_xgb_model(path: str = XGB_MODEL_PATH):
+    return _load(path, joblib.load)
+
+
+def load_xgb_features(path: str = XGB_FEATURES_PATH) -> list:
+    return _load(path, _load_json)
+
+
+def load_woe_maps(path: str = WOE_MAPS_PATH) -> dict:
+    return _load(path, _load_json)
+
+
+def _load_calibration(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    from pd_calibration import load_calibration
+    return load_calibration(path)
+
+
+def load_pd_calibration(path: str = PD_CALIBRATION_PATH) -> dict:
+    """
+    {model key: PDCalibrator}; empty (no calibration) when the
+    file does not exist.
+    """
+    return _load(path, _load_calibration)
+
+
+def loaded_artifacts() -> dict:
+    """
+    {path: object} for everything loaded so far.
+    """
+    return dict(_CACHE)
+
+
+def loaded_hash(path: str):
+    """
+    file_hash of an artifact as it was when it was loaded (None
+    if it has not been loaded).
+    """
+    return LOADED_HASHES.get(path)
+
+
+# ============================================================
+# ARTIFACT FINGERPRINT
+# ============================================================
+
+def file_hash(path: str) -> str:
+    """
+    sha256 of a file's bytes ("missing" if it does not exist).
+    Re-hashed only when mtime / size change.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return "missing"
+
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _FILE_HASHES.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    _FILE_HASHES[path] = (key, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def register_override(name: str, source: str, content: bytes) -> None:
+    """
+    Record an in-process override of scoring behaviour (its
+    source and a hash of its content) for loaded_fingerprint.
+    """
+    OVERRIDES[name] = f"{source}@{hashlib.sha256(content).hexdigest()}"
+
+
+def loaded_fingerprint() -> str:
+    """
+    artifact_fingerprint of the scoring artifacts as they were
+    loaded into this process (the objects that actually score),
+    loading any that are not loaded yet, plus every registered
+    override (e.g. fitted binning). A file replaced on disk after
+    loading does not change it.
+    """
+    loaders = {
+        LR_BUNDLE_PATH: load_lr_bundle,
+        XGB_MODEL_PATH: load_xgb_model,
+        XGB_FEATURES_PATH: load_xgb_features,
+        WOE_MAPS_PATH: load_woe_maps,
+        PD_CALIBRATION_PATH: load_pd_calibration,
+    }
+    digest = hashlib.sha256()
+    for path in SCORING_ARTIFACTS:
+        if path not in LOADED_HASHES:
+            loaders[path]()
+        digest.update(f"{path}={LOADED_HASHES[path]};".encode())
+    for name, value in sorted(OVERRIDES.items()):
+        digest.update(f"{name}={value};".encode())
+    return digest.hexdigest()
+
+
+def artifact_fingerprint(paths=None) -> str:
+    """
+    One hash over the scoring artifacts on disk: changes whenever
+    any of them is added, removed or rewritten. By default it also
+    covers the binning spec named by CREDIT_RISK_BINNING (path and
+    content).
+    """
+    if paths is None:
+        paths = SCORING_ARTIFACTS + [p for p in [os.environ.get(BINNING_ENV)] if p]
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(f"{path}={file_hash(path)};".encode())
+    return digest.hexdigest()
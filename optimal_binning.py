@@ -0,0 +1,352 @@
+# ============================================================
+# optimal_binning.py
+# ------------------------------------------------------------
+# Automatic WOE-monotonic binning for the numeric LR features
+# - Works on pre-aggregated FINE histograms (rows / bads per
+#   fine grid cell), never on raw rows; histograms are built
+#   in chunks and merge exactly across workers
+# - Per feature: enforce minimum bin share, merge adjacent
+#   bins until bad rate is monotonic (pool-adjacent-violators),
+#   then merge the cheapest pairs (least IV lost) down to
+#   max_bins; both directions tried, higher IV kept
+# - Features are binned in parallel (one task per feature)
+# - Missing values are kept out of the binning search and get
+#   their own WOE (missing_woe) on the same good / bad totals
+# - Rows without a usable target are skipped
+# - Output JSON: edges + labels + WOE per feature, loaded by
+#   woe_transformer.apply_binning / CREDIT_RISK_BINNING
+# ============================================================
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from woe_fitter import SMOOTHING, TARGET_COLUMN
+from woe_transformer import NUMERIC_BINS, _source_values
+
+
+# LR feature -> fine grid (cell c covers [grid[c-1], grid[c]))
+FINE_GRIDS = {
+    "fico": np.arange(300, 851, 5),
+    "dti": np.arange(0, 61, 1),
+    "loan_amnt": np.arange(0, 40001, 500),
+    "revol_util": np.arange(0, 151, 2),
+    "int_rate": np.arange(5, 31, 0.25),
+    "credit_age": np.arange(0, 601, 6),
+    "bc_util": np.arange(0, 151, 2),
+    "percent_bc_gt_75": np.arange(0, 101, 5),
+}
+
+LABEL_SUFFIX = {
+    "revol_util": "%",
+    "int_rate": "%",
+    "bc_util": "%",
+    "percent_bc_gt_75": "%",
+}
+
+
+# ============================================================
+# FINE HISTOGRAMS (mergeable)
+# ============================================================
+
+class FineHistogram:
+    """
+    rows / bads per fine grid cell for each numeric LR feature.
+    NaN values are counted separately (missing_rows /
+    missing_bads) and not binned.
+    """
+
+    def __init__(self, grids: dict | None = None):
+        self.grids = {f: np.asarray(g, dtype=float) for f, g in (grids or FINE_GRIDS).items()}
+        self.rows = {f: np.zeros(len(g) + 1) for f, g in self.grids.items()}
+        self.bads = {f: np.zeros(len(g) + 1) for f, g in self.grids.items()}
+        self.missing_rows = {f: 0.0 for f in self.grids}
+        self.missing_bads = {f: 0.0 for f in self.grids}
+        self.unlabeled = 0
+
+    def update(self, df: pd.DataFrame, target: str = TARGET_COLUMN) -> "FineHistogram":
+        bad = pd.to_numeric(df[target], errors="coerce")
+        labeled = bad.notna().to_numpy()
+        self.unlabeled += int((~labeled).sum())
+        df, bad = df[labeled], bad[labeled].to_numpy(dtype=float)
+
+        for feature, grid in self.grids.items():
+            column = NUMERIC_BINS[feature][0]
+            values = pd.to_numeric(
+                _source_values(df, column), errors="coerce"
+            ).to_numpy(dtype=float)
+
+            ok = ~np.isnan(values)
+            cells = np.searchsorted(grid, values[ok], side="right")
+            n = len(grid) + 1
+            self.rows[feature] += np.bincount(cells, minlength=n)
+            self.bads[feature] += np.bincount(cells, weights=bad[ok], minlength=n)
+            self.missing_rows[feature] += float((~ok).sum())
+            self.missing_bads[feature] += float(bad[~ok].sum())
+        return self
+
+    def merge(self, other: "FineHistogram") -> "FineHistogram":
+        for feature in self.grids:
+            self.rows[feature] += other.rows[feature]
+            self.bads[feature] += other.bads[feature]
+            self.missing_rows[feature] += other.missing_rows[feature]
+            self.missing_bads[feature] += other.missing_bads[feature]
+        self.unlabeled += other.unlabeled
+        return self
+
+
+def histogram_csv(
+    path: str,
+    target: str = TARGET_COLUMN,
+    chunksize: int = 500_000
+) -> FineHistogram:
+    hist = FineHistogram()
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        hist.update(chunk, target)
+    return hist
+
+
+def histogram_csv_files(
+    paths,
+    target: str = TARGET_COLUMN,
+    chunksize: int = 500_000,
+    max_workers: int | None = None
+) -> FineHistogram:
+    """
+    One worker process per file, partial histograms merged.
+    """
+    total = FineHistogram()
+    n = len(paths)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for partial in pool.map(histogram_csv, paths, [target] * n, [chunksize] * n):
+            total.merge(partial)
+    return total
+
+
+# ============================================================
+# MONOTONIC BINNING (one feature)
+# ============================================================
+
+def _woe(rows: np.ndarray, bads: np.ndarray) -> tuple:
+    b = bads + SMOOTHING
+    g = rows - bads + SMOOTHING
+    good_dist, bad_dist = g / g.sum(), b / b.sum()
+    woe = np.log(good_dist / bad_dist)
+    return woe, float(np.sum((good_dist - bad_dist) * woe))
+
+
+def _merge(groups: list, i: int) -> None:
+    """
+    Merge group i+1 into group i. group = [start, end, rows, bads].
+    """
+    a, b = groups[i], groups.pop(i + 1)
+    groups[i] = [a[0], b[1], a[2] + b[2], a[3] + b[3]]
+
+
+def _bin_direction(
+    rows: np.ndarray,
+    bads: np.ndarray,
+    direction: int,
+    max_bins: int,
+    min_rows: float
+) -> list:
+    # non-empty fine cells; empty cells absorbed by the next one
+    groups, start = [], 0
+    for c in range(len(rows)):
+        if rows[c] > 0:
+            groups.append([start, c + 1, rows[c], bads[c]])
+            start = c + 1
+    if not groups:
+        return groups
+    groups[-1][1] = len(rows)
+
+    def rate(g):
+        return g[3] / g[2]
+
+    # 1. minimum bin share: fold the smallest bin into the
+    #    neighbour with the closer bad rate
+    while len(groups) > 1:
+        i = min(range(len(groups)), key=lambda k: groups[k][2])
+        if groups[i][2] >= min_rows:
+            break
+        if i == 0:
+            _merge(groups, 0)
+        elif i == len(groups) - 1:
+            _merge(groups, i - 1)
+        elif abs(rate(groups[i]) - rate(groups[i - 1])) <= abs(rate(groups[i]) - rate(groups[i + 1])):
+            _merge(groups, i - 1)
+        else:
+            _merge(groups, i)
+
+    # 2. monotonic bad rate (pool adjacent violators)
+    i = 0
+    while i < len(groups) - 1:
+        if (rate(groups[i + 1]) - rate(groups[i])) * direction < 0:
+            _merge(groups, i)
+            i = max(i - 1, 0)
+        else:
+            i += 1
+
+    # 3. at most max_bins: drop the boundary that loses least IV
+    while len(groups) > max_bins:
+        best, best_iv = 0, -np.inf
+        for i in range(len(groups) - 1):
+            trial = [g[:] for g in groups]
+            _merge(trial, i)
+            iv = _woe(np.array([g[2] for g in trial]), np.array([g[3] for g in trial]))[1]
+            if iv > best_iv:
+                best, best_iv = i, iv
+        _merge(groups, best)
+
+    return groups
+
+
+def _label(lo, hi, suffix: str) -> str:
+    if lo is None:
+        return f"<{hi:g}{suffix}"
+    if hi is None:
+        return f"{lo:g}{suffix}+"
+    return f"{lo:g}-{hi:g}{suffix}"
+
+
+def monotonic_bins(
+    feature: str,
+    grid: np.ndarray,
+    rows: np.ndarray,
+    bads: np.ndarray,
+    max_bins: int = 6,
+    min_share: float = 0.05,
+    missing_rows: float = 0.0,
+    missing_bads: float = 0.0
+) -> dict:
+    """
+    Best WOE-monotonic binning of one feature from its fine
+    histogram (rows / bads per grid cell).
+
+    Returns
+    -------
+    dict
+        {"column", "edges", "labels", "woe", "missing_woe", "iv",
+         "direction"}
+        edges follow the transformer convention
+        (np.searchsorted(edges, x, side="right") -> bin index);
+        missing_woe is 0.0 (neutral) when no value was missing.
+        None when the feature has no non-missing values (nothing
+        to bin; apply_binning would reject an empty spec)
+    """
+    if rows.sum() <= 0:
+        return None
+
+    min_rows = min_share * rows.sum()
+
+    best = None
+    for direction in (1, -1):
+        groups = _bin_direction(rows, bads, direction, max_bins, min_rows)
+        woe, iv = _woe(np.array([g[2] for g in groups]), np.array([g[3] for g in groups]))
+        if best is None or iv > best[2]:
+            best = (groups, woe, iv, direction)
+
+    groups, woe, iv, direction = best
+
+    # WOE of every bin + the missing bin on the full totals
+    missing_woe = 0.0
+    if missing_rows > 0:
+        all_woe, iv = _woe(
+            np.array([g[2] for g in groups] + [missing_rows]),
+            np.array([g[3] for g in groups] + [missing_bads]),
+        )
+        woe, missing_woe = all_woe[:-1], float(all_woe[-1])
+
+    # group starting at fine cell s begins at grid[s - 1]
+    edges = [float(grid[g[0] - 1]) for g in groups[1:]]
+    bounds = [None] + edges + [None]
+    suffix = LABEL_SUFFIX.get(feature, "")
+    labels = [_label(bounds[i], bounds[i + 1], suffix) for i in range(len(groups))]
+
+    return {
+        "column": NUMERIC_BINS[feature][0],
+        "edges": edges,
+        "labels": labels,
+        "woe": np.round(woe, 6).tolist(),
+        "missing_woe": round(missing_woe, 6),
+        "iv": round(iv, 6),
+        "direction": "increasing" if direction == 1 else "decreasing",
+    }
+
+
+# ============================================================
+# ALL FEATURES (parallel)
+# ============================================================
+
+def optimal_binning(
+    hist: FineHistogram,
+    max_bins: int = 6,
+    min_share: float = 0.05,
+    max_workers: int | None = None
+) -> dict:
+    """
+    {feature: monotonic_bins(...)} for every histogram feature
+    with non-missing values, one process-pool task per feature.
+    Features without any are left out (see unbinnable).
+    """
+    features = list(hist.grids)
+    n = len(features)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(
+            monotonic_bins,
+            features,
+            [hist.grids[f] for f in features],
+            [hist.rows[f] for f in features],
+            [hist.bads[f] for f in features],
+            [max_bins] * n,
+            [min_share] * n,
+            [hist.missing_rows[f] for f in features],
+            [hist.missing_bads[f] for f in features],
+        )
+        return {f: s for f, s in zip(features, results) if s is not None}
+
+
+def unbinnable(hist: FineHistogram, spec: dict) -> list:
+    """
+    Histogram features optimal_binning left out (no non-missing
+    values); they keep their hand-written bins.
+    """
+    return [f for f in hist.grids if f not in spec]
+
+
+def save_binning(spec: dict, path: str = "optimal_bins.json") -> None:
+    with open(path, "w") as f:
+        json.dump(spec, f, indent=2)
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Monotonic optimal binning from labeled training CSVs"
+    )
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--target", default=TARGET_COLUMN)
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    parser.add_argument("--max-bins", type=int, default=6)
+    parser.add_argument("--min-share", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="optimal_bins.json")
+    args = parser.parse_args()
+
+    hist = histogram_csv_files(args.paths, args.target, args.chunksize, args.workers)
+    spec = optimal_binning(hist, args.max_bins, args.min_share, args.workers)
+    save_binning(spec, args.out)
+
+    for feature, s in spec.items():
+        print(f"{feature:18s} IV={s['iv']:.4f} {s['direction']:10s} {s['labels']}")
+    for feature in unbinnable(hist, spec):
+        print(f"{feature:18s} skipped: no non-missing values")
+    print(f"-> {args.out}")
@@ -0,0 +1,181 @@
+# ============================================================
+# pd_calibration.py
+# ------------------------------------------------------------
+# PD calibration layer between predict_proba and pd_to_score
+# - Fitted OFFLINE (isotonic or Platt) on raw model PDs
+# - Stored as a compact monotone interpolation table
+#   {model: {"method", "x": [...], "y": [...]}} in JSON
+# - Applied to a whole batch with one np.interp call
+#   (sorted search over the knots)
+# - Target may be default flags (calibrate to observed rates)
+#   or another model's PD (e.g. map XGB onto the LR scale)
+# ============================================================
+
+import json
+
+import numpy as np
+import pandas as pd
+from sklearn.isotonic import IsotonicRegression
+from sklearn.linear_model import LogisticRegression
+
+
+PD_MIN, PD_MAX = 1e-6, 1 - 1e-6
+
+MAX_KNOTS = 256
+
+
+# ============================================================
+# CALIBRATOR (interpolation table)
+# ============================================================
+
+class PDCalibrator:
+    """
+    Monotone piecewise-linear map raw PD -> calibrated PD.
+    Outside [x[0], x[-1]] the end values are held.
+    """
+
+    def __init__(self, x, y, method: str = "isotonic"):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.method = method
+
+        if len(self.x) < 2 or np.any(np.diff(self.x) <= 0):
+            raise ValueError("calibration knots must be strictly increasing")
+        if np.any(np.diff(self.y) < 0):
+            raise ValueError("calibration table must be monotone")
+
+    def __call__(self, pds):
+        return np.clip(np.interp(pds, self.x, self.y), PD_MIN, PD_MAX)
+
+    def to_dict(self) -> dict:
+        return {"method": self.method, "x": self.x.tolist(), "y": self.y.tolist()}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "PDCalibrator":
+        return cls(d["x"], d["y"], d.get("method", "isotonic"))
+
+
+def calibrate(calibrators: dict, model: str, pds):
+    """
+    Apply calibrators[model] if present, else return pds as-is.
+    """
+    calibrator = calibrators.get(model)
+    return pds if calibrator is None else calibrator(pds)
+
+
+# ============================================================
+# FITTING
+# ============================================================
+
+def _thin(x: np.ndarray, y: np.ndarray, max_knots: int) -> tuple:
+    # keep the end points and evenly spaced knots in between
+    if len(x) <= max_knots:
+        return x, y
+    idx = np.unique(np.linspace(0, len(x) - 1, max_knots).round().astype(int))
+    return x[idx], y[idx]
+
+
+def fit_isotonic(raw_pds, target, max_knots: int = MAX_KNOTS) -> PDCalibrator:
+    iso = IsotonicRegression(y_min=PD_MIN, y_max=PD_MAX, out_of_bounds="clip")
+    iso.fit(np.asarray(raw_pds, dtype=float), np.asarray(target, dtype=float))
+
+    x, y = iso.X_thresholds_, iso.y_thresholds_
+    # collapse duplicated x (step edges) to a strictly increasing table
+    x, first = np.unique(x, return_index=True)
+    x, y = _thin(x, y[first], max_knots)
+    return PDCalibrator(x, y, "isotonic")
+
+
+def fit_platt(raw_pds, target, max_knots: int = MAX_KNOTS) -> PDCalibrator:
+    """
+    Logistic fit on logit(raw PD); tabulated on a logit grid.
+    Target must be 0/1 flags.
+    """
+    raw = np.clip(np.asarray(raw_pds, dtype=float), PD_MIN, PD_MAX)
+    z = np.log(raw / (1 - raw)).reshape(-1, 1)
+
+    lr = LogisticRegression(C=1e6).fit(z, np.asarray(target).astype(int))
+    a, b = lr.coef_[0, 0], lr.intercept_[0]
+    if a <= 0:
+        raise ValueError("Platt slope is not positive; raw PDs are not informative")
+
+    grid = np.linspace(z.min(), z.max(), max_knots)
+    x = 1 / (1 + np.exp(-grid))
+    y = 1 / (1 + np.exp(-(a * grid + b)))
+    return PDCalibrator(x, np.clip(y, PD_MIN, PD_MAX), "platt")
+
+
+FITTERS = {"isotonic": fit_isotonic, "platt": fit_platt}
+
+
+# ============================================================
+# PERSISTENCE
+# ============================================================
+
+def save_calibration(calibrators: dict, path: str = "pd_calibration.json") -> None:
+    with open(path, "w") as f:
+        json.dump({m: c.to_dict() for m, c in calibrators.items()}, f)
+
+
+def load_calibration(path: str) -> dict:
+    with open(path, "r") as f:
+        return {m: PDCalibrator.from_dict(d) for m, d in json.load(f).items()}
+
+
+# ============================================================
+# OFFLINE FIT FROM A LABELED CSV
+# ============================================================
+
+def raw_pds_csv(path: str, target: str, chunksize: int = 100_000) -> pd.DataFrame:
+    """
+    Uncalibrated PDs of both models + target, chunk by chunk.
+    Rows with a missing / non-numeric target are skipped.
+    """
+    from champion_challenger_engine import lr_model, xgb_model
+    from feature_pipeline import prepare_lr_input_batch, prepare_xgb_input_batch
+
+    parts = []
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        # unlabeled rows are dropped, not counted as non-defaults
+        y = pd.to_numeric(chunk[target], errors="coerce")
+        chunk, y = chunk[y.notna()], y[y.notna()]
+        if chunk.empty:
+            continue
+        parts.append(pd.DataFrame({
+            "lr": lr_model.predict_proba(prepare_lr_input_batch(chunk))[:, 1],
+            "xgb": xgb_model.predict_proba(prepare_xgb_input_batch(chunk))[:, 1],
+            "target": y.to_numpy(),
+        }))
+    if not parts:
+        raise ValueError(f"no labeled rows in {path}")
+    return pd.concat(parts, ignore_index=True)
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Fit PD calibration tables from a labeled CSV"
+    )
+    parser.add_argument("path")
+    parser.add_argument("--target", default="default",
+                        help="0/1 default flag column")
+    parser.add_argument("--models", nargs="+", default=["xgb"], choices=["lr", "xgb"])
+    parser.add_argument("--method", default="isotonic", choices=list(FITTERS))
+    parser.add_argument("--reference", default=None, choices=["lr", "xgb"],
+                        help="fit to this model's raw PD instead of the target "
+                             "(isotonic only)")
+    parser.add_argument("--out", default="pd_calibration.json")
+    args = parser.parse_args()
+
+    raw = raw_pds_csv(args.path, args.target)
+    y = raw[args.reference] if args.reference else raw["target"]
+    calibrators = {m: FITTERS[args.method](raw[m], y) for m in args.models}
+    save_calibration(calibrators, args.out)
+
+    for m, c in calibrators.items():
+        cal = c(raw[m].to_numpy())
+        print(f"{m}: raw mean PD {raw[m].mean():.4f} -> {cal.mean():.4f} "
+              f"(target mean {y.mean():.4f}, {len(c.x)} knots)")
+    print(f"-> {args.out}")
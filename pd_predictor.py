@@ -1,9 +1,10 @@
 
-import joblib
 import numpy as np
 import pandas as pd
 
 from woe_transformer import transform_user_input_to_woe
+from latency import stage
+from model_registry import load_lr_bundle
 
 
 # ============================================================
@@ -12,7 +13,7 @@ from woe_transformer import transform_user_input_to_woe
 
 MODEL_BUNDLE_PATH = "model.joblib"
 
-model_bundle = joblib.load(MODEL_BUNDLE_PATH)
+model_bundle = load_lr_bundle(MODEL_BUNDLE_PATH)
 model = model_bundle["model"]
 FEATURE_ORDER = model_bundle["features"]
 
@@ -39,7 +40,8 @@ def predict_pd(user_input: dict) -> float:
     # --------------------------------------------------------
     # Step 1: Raw input -> WOE transformation
     # --------------------------------------------------------
-    woe_df = transform_user_input_to_woe(user_input)
+    with stage("predict_pd.woe_binning"):
+        woe_df = transform_user_input_to_woe(user_input)
 
     # --------------------------------------------------------
     # Step 2: Defensive check for missing features
@@ -59,7 +61,8 @@ def predict_pd(user_input: dict) -> float:
     # Step 4: Predict PD
     # predict_proba -> [P(non-default), P(default)]
     # --------------------------------------------------------
-    pd_value = model.predict_proba(woe_df)[:, 1][0]
+    with stage("predict_pd.predict_proba"):
+        pd_value = model.predict_proba(woe_df)[:, 1][0]
 
     # --------------------------------------------------------
     # Step 5: Numerical safety (optional but recommended)
@@ -0,0 +1,258 @@
+# ============================================================
+# portfolio_aggregation.py
+# ------------------------------------------------------------
+# Streaming portfolio aggregation (constant memory)
+# - Consumes SCORED chunks (run_champion_challenger_batch
+#   output joined to the raw segment columns)
+# - Keeps mergeable running aggregates per segment & model:
+#   counts, PD sums, risk-band / decision counts and a
+#   fixed-grid PD quantile sketch
+# - Partial aggregators from parallel workers merge exactly
+# ============================================================
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from decision_engine import RISK_BANDS, DECISIONS
+
+
+SEGMENT_COLUMNS = ("purpose", "grade", "home_ownership")
+
+MODELS = {
+    # model key : (pd column, risk band column, decision column)
+    "lr": ("pd_lr", "risk_band_lr", "decision_lr"),
+    "xgb": ("pd_xgb", "risk_band_xgb", "decision_xgb"),
+}
+
+REPORT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+# ============================================================
+# PD QUANTILE SKETCH (fixed logit grid)
+# ------------------------------------------------------------
+# PDs are clipped to [1e-6, 1 - 1e-6] everywhere in the repo,
+# so a fixed grid in logit space covers the full range.
+# Sketches merge by adding counts; quantiles are exact up to
+# one bin (~1.4% relative error in odds with 2000 bins).
+# ============================================================
+
+SKETCH_BINS = 2000
+_LOGIT_MIN = np.log(1e-6 / (1 - 1e-6))
+_LOGIT_MAX = -_LOGIT_MIN
+_BIN_WIDTH = (_LOGIT_MAX - _LOGIT_MIN) / SKETCH_BINS
+
+
+def pd_to_sketch_bin(pd_values: np.ndarray) -> np.ndarray:
+    p = np.clip(np.asarray(pd_values, dtype=float), 1e-6, 1 - 1e-6)
+    logit = np.log(p / (1 - p))
+    idx = ((logit - _LOGIT_MIN) / _BIN_WIDTH).astype(np.int64)
+    return np.clip(idx, 0, SKETCH_BINS - 1)
+
+
+def sketch_quantiles(counts: np.ndarray, qs) -> list:
+    """
+    Quantiles (bin mid-points, back on the PD scale) from
+    sketch counts.
+    """
+    total = counts.sum()
+    if total == 0:
+        return [np.nan for _ in qs]
+
+    cum = np.cumsum(counts)
+    out = []
+    for q in qs:
+        b = int(np.searchsorted(cum, q * total, side="left"))
+        mid = _LOGIT_MIN + (min(b, SKETCH_BINS - 1) + 0.5) * _BIN_WIDTH
+        out.append(float(1 / (1 + np.exp(-mid))))
+    return out
+
+
+# ============================================================
+# SEGMENT STATS
+# ============================================================
+
+def _empty_stats() -> dict:
+    return {
+        "count": 0,
+        "pd_sum": 0.0,
+        "bands": np.zeros(len(RISK_BANDS), dtype=np.int64),
+        "decisions": np.zeros(len(DECISIONS), dtype=np.int64),
+        "sketch": np.zeros(SKETCH_BINS, dtype=np.int64),
+    }
+
+
+def _grouped_bincount(codes, values, n_groups, n_values) -> np.ndarray:
+    flat = np.bincount(
+        codes * n_values + values, minlength=n_groups * n_values
+    )
+    return flat.reshape(n_groups, n_values)
+
+
+# ============================================================
+# STREAMING AGGREGATOR
+# ============================================================
+
+class PortfolioAggregator:
+    """
+    Mergeable running aggregates per (dimension, segment, model).
+
+    Memory is O(segments x (bands + decisions + SKETCH_BINS)),
+    independent of the number of rows consumed. The overall
+    book is tracked as dimension "ALL", segment "ALL".
+    """
+
+    def __init__(self, segment_columns=SEGMENT_COLUMNS):
+        self.segment_columns = tuple(segment_columns)
+        self.stats = {}
+        self.rows = 0
+
+    # --------------------------------------------------------
+    # Update from one scored chunk
+    # --------------------------------------------------------
+
+    def update(self, scored: pd.DataFrame) -> "PortfolioAggregator":
+        if scored.empty:
+            return self
+
+        dimensions = {"ALL": np.zeros(len(scored), dtype=np.int64)}
+        labels = {"ALL": np.array(["ALL"], dtype=object)}
+
+        for dim in self.segment_columns:
+            codes, uniques = pd.factorize(
+                scored[dim].astype(str), use_na_sentinel=False
+            )
+            dimensions[dim] = codes.astype(np.int64)
+            labels[dim] = np.asarray(uniques, dtype=object)
+
+        for model, (pd_col, band_col, dec_col) in MODELS.items():
+            pd_values = scored[pd_col].to_numpy(dtype=float)
+            band_codes = pd.Categorical(
+                scored[band_col], categories=RISK_BANDS
+            ).codes.astype(np.int64)
+            dec_codes = pd.Categorical(
+                scored[dec_col], categories=DECISIONS
+            ).codes.astype(np.int64)
+            sketch_bins = pd_to_sketch_bin(pd_values)
+
+            for dim, codes in dimensions.items():
+                k = len(labels[dim])
+                counts = np.bincount(codes, minlength=k)
+                sums = np.bincount(codes, weights=pd_values, minlength=k)
+                bands = _grouped_bincount(codes, band_codes, k, len(RISK_BANDS))
+                decs = _grouped_bincount(codes, dec_codes, k, len(DECISIONS))
+                sketch = _grouped_bincount(codes, sketch_bins, k, SKETCH_BINS)
+
+                for i, segment in enumerate(labels[dim]):
+                    st = self.stats.setdefault(
+                        (dim, segment, model), _empty_stats()
+                    )
+                    st["count"] += int(counts[i])
+                    st["pd_sum"] += float(sums[i])
+                    st["bands"] += bands[i]
+                    st["decisions"] += decs[i]
+                    st["sketch"] += sketch[i]
+
+        self.rows += len(scored)
+        return self
+
+    # --------------------------------------------------------
+    # Merge partial aggregates
+    # --------------------------------------------------------
+
+    def merge(self, other: "PortfolioAggregator") -> "PortfolioAggregator":
+        for key, theirs in other.stats.items():
+            mine = self.stats.setdefault(key, _empty_stats())
+            for field in mine:
+                mine[field] += theirs[field]
+        self.rows += other.rows
+        return self
+
+    # --------------------------------------------------------
+    # Report
+    # --------------------------------------------------------
+
+    def report(self, quantiles=REPORT_QUANTILES) -> pd.DataFrame:
+        """
+        One row per (dimension, segment, model) with counts,
+        expected defaults (sum of PD), PD quantiles and the
+        risk-band / decision mix as shares.
+        """
+        rows = []
+        for (dim, segment, model), st in sorted(self.stats.items()):
+            n = st["count"]
+            row = {
+                "dimension": dim,
+                "segment": segment,
+                "model": model,
+                "count": n,
+                "expected_defaults": st["pd_sum"],
+                "mean_pd": st["pd_sum"] / n if n else np.nan,
+            }
+            for q, v in zip(quantiles, sketch_quantiles(st["sketch"], quantiles)):
+                row[f"pd_p{round(q * 100, 1):g}"] = v
+            for band, c in zip(RISK_BANDS, st["bands"]):
+                row[f"band_{band}"] = c / n if n else np.nan
+            for dec, c in zip(DECISIONS, st["decisions"]):
+                row[f"decision_{dec}"] = c / n if n else np.nan
+            rows.append(row)
+
+        return pd.DataFrame(rows)
+
+
+# ============================================================
+# FILE DRIVERS (score + aggregate, optionally in parallel)
+# ============================================================
+
+def aggregate_csv(path: str, chunksize: int = 100_000) -> PortfolioAggregator:
+    """
+    Stream a raw portfolio CSV through both models in chunks
+    and aggregate. Never holds more than one chunk in memory.
+    """
+    from champion_challenger_engine import run_champion_challenger_batch
+
+    agg = PortfolioAggregator()
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        scored = run_champion_challenger_batch(chunk)
+        agg.update(pd.concat(
+            [chunk[list(agg.segment_columns)], scored], axis=1
+        ))
+    return agg
+
+
+def aggregate_csv_files(
+    paths,
+    chunksize: int = 100_000,
+    max_workers: int | None = None
+) -> PortfolioAggregator:
+    """
+    One worker process per file, partial aggregates merged.
+    """
+    total = PortfolioAggregator()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for partial in pool.map(aggregate_csv, paths, [chunksize] * len(paths)):
+            total.merge(partial)
+    return total
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Segment-level portfolio report over raw CSV files"
+    )
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="portfolio_report.csv")
+    args = parser.parse_args()
+
+    agg = aggregate_csv_files(args.paths, args.chunksize, args.workers)
+    agg.report().to_csv(args.out, index=False)
+    print(f"{agg.rows} rows aggregated -> {args.out}")
@@ -0,0 +1,310 @@
+# ============================================================
+# profiling.py
+# ------------------------------------------------------------
+# On-demand sampled profiling for batch + service scoring
+# - A sampled fraction of requests / chunks is profiled with
+#   * a wall-clock stack sampler  -> collapsed stacks
+#     (flamegraph.pl / speedscope input)
+#   * cProfile                    -> merged .pstats
+#   * tracemalloc (opt-in,        -> peak bytes + bytes still
+#     trace_memory=True)             live at block exit, by stage
+# - At most one block is profiled at a time; a sampled block
+#   that finds another one running is skipped (counted in `busy`)
+# - Cost to other threads: an unsampled request only pays one
+#   random() call on its own thread, but while a sampled block
+#   runs, the stack sampler competes for the GIL and tracemalloc
+#   (process-global) traces EVERY thread's allocations. In the
+#   threaded service that slows all concurrent requests (several
+#   x at high rates), so keep sample_rate small (~0.01) there
+#   and enable trace_memory only for short investigations
+# - Stage "allocations" are bytes still live when the block
+#   exits, not transient peaks inside a stage; the per-sample
+#   peak is whole-process
+# ============================================================
+
+import cProfile
+import os
+import pstats
+import random
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+
+
+# Pipeline stage functions used to attribute allocations.
+# (module, function) – innermost match on a traceback wins.
+STAGE_FUNCTIONS = [
+    ("woe_transformer", "transform_user_input_to_woe"),
+    ("woe_transformer", "transform_batch_to_woe"),
+    ("feature_pipeline", "prepare_xgb_input"),
+    ("feature_pipeline", "prepare_xgb_input_batch"),
+    ("scorecard", "pd_to_score"),
+    ("decision_engine", "make_decision"),
+    ("champion_challenger_engine", "run_champion_challenger"),
+    ("champion_challenger_engine", "run_champion_challenger_batch"),
+]
+
+# Held by the one block currently being traced (process-wide)
+_TRACE_LOCK = threading.Lock()
+
+
+def _frame_label(code) -> str:
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}.{code.co_name}"
+
+
+def _stage_line_ranges() -> list:
+    """
+    (filename, first line, last line, label) per stage function,
+    resolved lazily so profiling never forces model loading.
+    """
+    ranges = []
+    for module_name, func_name in STAGE_FUNCTIONS:
+        module = sys.modules.get(module_name)
+        func = getattr(module, func_name, None) if module else None
+        if func is None:
+            continue
+        code = func.__code__
+        lines = [ln for _, _, ln in code.co_lines() if ln is not None]
+        ranges.append((code.co_filename, min(lines), max(lines), func_name))
+    return ranges
+
+
+# ============================================================
+# STACK SAMPLER (wall clock, one target thread)
+# ============================================================
+
+class _StackSampler(threading.Thread):
+
+    def __init__(self, target_thread_id: int, root: str, interval: float, out: Counter):
+        super().__init__(name="profiling-stack-sampler", daemon=True)
+        self.target = target_thread_id
+        self.root = root
+        self.interval = interval
+        self.out = out
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.append(self.root)
+            self.out[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+# ============================================================
+# PROFILER
+# ============================================================
+
+class RequestProfiler:
+    """
+    Sampled profiler for scoring requests or batch chunks.
+
+    Parameters
+    ----------
+    sample_rate : float
+        Fraction of requests / chunks profiled (0 disables)
+    out_dir : str
+        Where dump() writes collapsed stacks, pstats and the
+        allocation report
+    stack_interval : float
+        Stack sampling period in seconds
+    max_snapshots : int
+        Raw tracemalloc snapshots kept on disk
+    trace_memory : bool
+        Also run tracemalloc in sampled blocks (slows every
+        thread while it runs, see module header)
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.01,
+        out_dir: str = "profiles",
+        stack_interval: float = 0.001,
+        max_snapshots: int = 5,
+        trace_memory: bool = False
+    ):
+        self.sample_rate = sample_rate
+        self.out_dir = out_dir
+        self.stack_interval = stack_interval
+        self.max_snapshots = max_snapshots
+        self.trace_memory = trace_memory
+
+        self.seen = 0
+        self.sampled = 0
+        self.busy = 0                      # sampled but skipped: another block was traced
+        self.stacks = Counter()
+        self.alloc_bytes = Counter()       # stage -> bytes live at exit
+        self.peak_bytes = []               # per sampled request
+        self._stats = None
+        self._snapshots = 0
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    # Context manager
+    # --------------------------------------------------------
+
+    def profile(self, label: str = "request"):
+        """
+        `with profiler.profile("chunk"): ...` – profiles the
+        block if it is sampled, otherwise does nothing.
+        """
+        with self._lock:
+            self.seen += 1
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return _NOT_SAMPLED
+        if not _TRACE_LOCK.acquire(blocking=False):
+            with self._lock:
+                self.busy += 1
+            return _NOT_SAMPLED
+        return _SampledBlock(self, label)
+
+    # --------------------------------------------------------
+    # Internal – called by _SampledBlock
+    # --------------------------------------------------------
+
+    def _start_tracing(self) -> bool:
+        """
+        Start tracemalloc unless some other code already did (or
+        trace_memory is off); returns whether this block started it.
+        """
+        if not self.trace_memory:
+            return False
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(25)
+        tracemalloc.reset_peak()
+        return started
+
+    def _stop_tracing(self, profile: cProfile.Profile, stacks: Counter, started: bool):
+        snapshot = None
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            if started:
+                tracemalloc.stop()
+
+        with self._lock:
+            self.stacks.update(stacks)
+            self.sampled += 1
+            if snapshot is not None:
+                self.peak_bytes.append(peak)
+                self._attribute(snapshot)
+
+            if snapshot is not None and self._snapshots < self.max_snapshots:
+                os.makedirs(self.out_dir, exist_ok=True)
+                snapshot.dump(os.path.join(
+                    self.out_dir, f"alloc-{self._snapshots:03d}.tracemalloc"
+                ))
+                self._snapshots += 1
+
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+
+    def _attribute(self, snapshot):
+        ranges = _stage_line_ranges()
+        for stat in snapshot.statistics("traceback"):
+            stage = "other"
+            # traceback is oldest-first; keep the innermost match
+            for frame in stat.traceback:
+                for filename, lo, hi, name in ranges:
+                    if frame.filename == filename and lo <= frame.lineno <= hi:
+                        stage = name
+            self.alloc_bytes[stage] += stat.size
+
+    # --------------------------------------------------------
+    # Output
+    # --------------------------------------------------------
+
+    def dump(self) -> dict:
+        """
+        Write collapsed.txt (flamegraph input), cprofile.pstats
+        and allocations.txt to out_dir. Returns the file paths.
+        """
+        os.makedirs(self.out_dir, exist_ok=True)
+        paths = {
+            "collapsed": os.path.join(self.out_dir, "collapsed.txt"),
+            "pstats": os.path.join(self.out_dir, "cprofile.pstats"),
+            "allocations": os.path.join(self.out_dir, "allocations.txt"),
+        }
+
+        with self._lock:
+            with open(paths["collapsed"], "w") as f:
+                for stack, count in self.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+
+            if self._stats is not None:
+                self._stats.dump_stats(paths["pstats"])
+
+            with open(paths["allocations"], "w") as f:
+                f.write(f"sampled {self.sampled} of {self.seen} ({self.busy} skipped while busy)\n")
+                if self.peak_bytes:
+                    f.write(
+                        f"peak traced bytes per sample: "
+                        f"mean {sum(self.peak_bytes) / len(self.peak_bytes):,.0f}, "
+                        f"max {max(self.peak_bytes):,}\n"
+                    )
+                if not self.trace_memory:
+                    f.write("memory tracing off (trace_memory=False)\n")
+                f.write("\nlive bytes at block exit, by stage (not transient peaks)\n")
+                for stage, size in self.alloc_bytes.most_common():
+                    f.write(f"{stage:<36}{size:>14,}\n")
+
+        return paths
+
+
+class _NotSampled:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOT_SAMPLED = _NotSampled()
+
+
+class _SampledBlock:
+
+    def __init__(self, profiler: RequestProfiler, label: str):
+        self.profiler = profiler
+        self.label = label
+
+    def __enter__(self):
+        p = self.profiler
+        try:
+            self.started = p._start_tracing()
+            self.stacks = Counter()
+            self.sampler = _StackSampler(
+                threading.get_ident(), self.label, p.stack_interval, self.stacks
+            )
+            self.sampler.start()
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        except BaseException:
+            _TRACE_LOCK.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self.cprofile.disable()
+            self.sampler.stop()
+            self.profiler._stop_tracing(self.cprofile, self.stacks, self.started)
+        finally:
+            _TRACE_LOCK.release()
+        return False
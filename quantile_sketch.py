@@ -0,0 +1,330 @@
+# ============================================================
+# quantile_sketch.py
+# ------------------------------------------------------------
+# Live score-distribution monitoring with KLL sketches
+# - KLLSketch: mergeable streaming quantile sketch,
+#   O(k) memory, rank error ~ O(1/k) with high probability
+# - ScoreDistributionMonitor: one sketch per
+#   (model, risk band, metric) for PD and pd_to_score output
+# - Periodic JSON snapshots to disk, reloadable and mergeable
+# ============================================================
+
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from decision_engine import RISK_BANDS
+
+
+# ============================================================
+# KLL SKETCH
+# ============================================================
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang & Liberty 2016).
+
+    Level h holds items of weight 2**h. When the sketch is over
+    budget, the lowest over-capacity level is sorted and every
+    other item (random offset) is promoted to the next level.
+    """
+
+    def __init__(self, k: int = 200, seed: int | None = None):
+        self.k = k
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    # --------------------------------------------------------
+    # Capacity
+    # --------------------------------------------------------
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - h - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _over_budget(self) -> bool:
+        size = sum(len(level) for level in self.levels)
+        budget = sum(self._capacity(h) for h in range(len(self.levels)))
+        return size > budget
+
+    def _compress(self) -> None:
+        while self._over_budget():
+            for h, level in enumerate(self.levels):
+                if len(level) < self._capacity(h):
+                    continue
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+
+                level = np.sort(level)
+                keep = level[len(level) - len(level) % 2:]   # odd item stays
+                level = level[:len(level) - len(level) % 2]
+
+                offset = int(self._rng.integers(2))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], level[offset::2]])
+                self.levels[h] = keep
+                break
+
+    # --------------------------------------------------------
+    # Updates
+    # --------------------------------------------------------
+
+    def update(self, values) -> "KLLSketch":
+        """
+        Add one value or an array of values.
+        """
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    # --------------------------------------------------------
+    # Queries
+    # --------------------------------------------------------
+
+    def quantile(self, q):
+        """
+        Approximate quantile(s) for q in [0, 1] (scalar or array).
+        """
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)
+        ])
+        order = np.argsort(items, kind="stable")
+        items, cum = items[order], np.cumsum(weights[order])
+
+        q = np.asarray(q, dtype=float)
+        idx = np.searchsorted(cum, q * cum[-1], side="left")
+        out = items[np.clip(idx, 0, len(items) - 1)]
+        out = np.where(q <= 0, self.min, np.where(q >= 1, self.max, out))
+        return float(out) if out.ndim == 0 else out
+
+    def rank(self, value: float, inclusive: bool = True) -> float:
+        """
+        Approximate fraction of values <= value (< value if not
+        inclusive).
+        """
+        if self.n == 0:
+            return np.nan
+        total = 0.0
+        for h, level in enumerate(self.levels):
+            below = level <= value if inclusive else level < value
+            total += np.count_nonzero(below) * 2.0 ** h
+        weight = sum(len(level) * 2.0 ** h for h, level in enumerate(self.levels))
+        return total / weight
+
+    def size(self) -> int:
+        return sum(len(level) for level in self.levels)
+
+    # --------------------------------------------------------
+    # Serialisation
+    # --------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        return {
+            "k": self.k,
+            "n": self.n,
+            "min": self.min if self.n else None,
+            "max": self.max if self.n else None,
+            "levels": [level.tolist() for level in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "KLLSketch":
+        sk = cls(d["k"])
+        sk.n = d["n"]
+        sk.min = d["min"] if d["min"] is not None else np.inf
+        sk.max = d["max"] if d["max"] is not None else -np.inf
+        sk.levels = [np.asarray(level, dtype=float) for level in d["levels"]]
+        return sk
+
+
+# ============================================================
+# SCORE DISTRIBUTION MONITOR
+# ============================================================
+
+MODELS = {
+    # model : (result key, batch pd column, score column, band column)
+    "lr": ("logistic", "pd_lr", "score_lr", "risk_band_lr"),
+    "xgb": ("xgboost", "pd_xgb", "score_xgb", "risk_band_xgb"),
+}
+METRICS = ("pd", "score")
+BANDS = ["ALL"] + RISK_BANDS
+
+
+class ScoreDistributionMonitor:
+    """
+    KLL sketches of PD and score per model and risk band
+    ("ALL" covers the whole stream).
+
+    Parameters
+    ----------
+    k : int
+        Sketch accuracy parameter (memory ~ 3k floats / sketch)
+    snapshot_path : str, optional
+        JSON file rewritten by snapshot()
+    """
+
+    def __init__(self, k: int = 200, snapshot_path: str | None = None):
+        self.k = k
+        self.snapshot_path = snapshot_path
+        self.sketches = {
+            (model, band, metric): KLLSketch(k)
+            for model in MODELS for band in BANDS for metric in METRICS
+        }
+        self._lock = threading.Lock()
+        self._timer = None
+        self.snapshot_errors = 0
+
+    # --------------------------------------------------------
+    # Updates
+    # --------------------------------------------------------
+
+    def observe(self, result: dict) -> None:
+        """
+        Add one run_champion_challenger result.
+        """
+        with self._lock:
+            for model, (key, *_) in MODELS.items():
+                r = result[key]
+                pd_value = r["pd"]          # pd_percent is rounded to 1e-4
+                for band in ("ALL", r["risk_band"]):
+                    self.sketches[(model, band, "pd")].update(pd_value)
+                    self.sketches[(model, band, "score")].update(r["score"])
+
+    def observe_batch(self, scored: pd.DataFrame) -> None:
+        """
+        Add a run_champion_challenger_batch output.
+        """
+        with self._lock:
+            for model, (_, pd_col, score_col, band_col) in MODELS.items():
+                pds = scored[pd_col].to_numpy(dtype=float)
+                scores = scored[score_col].to_numpy(dtype=float)
+                bands = scored[band_col].to_numpy()
+
+                self.sketches[(model, "ALL", "pd")].update(pds)
+                self.sketches[(model, "ALL", "score")].update(scores)
+                for band in RISK_BANDS:
+                    mask = bands == band
+                    if mask.any():
+                        self.sketches[(model, band, "pd")].update(pds[mask])
+                        self.sketches[(model, band, "score")].update(scores[mask])
+
+    def merge(self, other: "ScoreDistributionMonitor") -> "ScoreDistributionMonitor":
+        with self._lock:
+            for key, sketch in other.sketches.items():
+                self.sketches[key].merge(sketch)
+        return self
+
+    # --------------------------------------------------------
+    # Queries
+    # --------------------------------------------------------
+
+    def quantile(self, model: str, q, metric: str = "score", band: str = "ALL"):
+        with self._lock:
+            return self.sketches[(model, band, metric)].quantile(q)
+
+    def summary(self, qs=(0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)) -> pd.DataFrame:
+        rows = []
+        with self._lock:
+            for (model, band, metric), sk in self.sketches.items():
+                row = {"model": model, "band": band, "metric": metric, "n": sk.n}
+                for q, v in zip(qs, np.atleast_1d(sk.quantile(np.asarray(qs)))):
+                    row[f"q{q:g}"] = v
+                rows.append(row)
+        return pd.DataFrame(rows)
+
+    # --------------------------------------------------------
+    # Snapshots
+    # --------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "ts": time.time(),
+                "k": self.k,
+                "sketches": [
+                    {"model": m, "band": b, "metric": x, **sk.to_dict()}
+                    for (m, b, x), sk in self.sketches.items()
+                ],
+            }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ScoreDistributionMonitor":
+        mon = cls(d["k"])
+        for s in d["sketches"]:
+            mon.sketches[(s["model"], s["band"], s["metric"])] = KLLSketch.from_dict(s)
+        return mon
+
+    def snapshot(self, path: str | None = None) -> str:
+        """
+        Atomically write the sketches to JSON (tmp + rename).
+        """
+        path = path or self.snapshot_path
+        if path is None:
+            raise ValueError("no snapshot path configured")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "ScoreDistributionMonitor":
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+    def start_snapshots(self, interval: float = 60.0) -> None:
+        """
+        Snapshot every `interval` seconds on a daemon timer. A
+        failed snapshot is reported on stderr (and counted in
+        snapshot_errors); the timer keeps running.
+        """
+        def tick():
+            try:
+                self.snapshot()
+            except Exception as e:
+                self.snapshot_errors += 1
+                print(f"quantile_sketch: snapshot failed: {e!r}", file=sys.stderr)
+            self._timer = threading.Timer(interval, tick)
+            self._timer.daemon = True
+            self._timer.start()
+
+        self._timer = threading.Timer(interval, tick)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def stop_snapshots(self, final: bool = True) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if final and self.snapshot_path:
+            self.snapshot()
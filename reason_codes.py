@@ -2,15 +2,32 @@
 # reason_codes.py
 # ------------------------------------------------------------
 # Purpose:
-# Generate reason codes for Logistic Regression (WOE-based)
+# Generate reason codes for Logistic Regression (WOE-based,
+# table-driven per feature bin) and for the XGBoost
+# challenger (per-feature contributions)
 # ------------------------------------------------------------
-# Input  : WOE-transformed dataframe (1 row)
-# Model  : Trained Logistic Regression
+# Input  : WOE-transformed dataframe (1 row) / raw borrowers
+# Model  : Trained Logistic Regression / calibrated XGBoost
 # Output : Top risk-increasing & risk-reducing factors
 # ============================================================
 
+import threading
+from collections import OrderedDict
+
 import numpy as np
 import pandas as pd
+import xgboost as xgb
+
+from feature_pipeline import (
+    XGB_ONE_HOT,
+    XGB_TRAIN_FEATURES,
+    prepare_xgb_input,
+    prepare_xgb_input_batch,
+)
+from feature_schema import LR_FEATURES
+from metrics import CACHE_HITS, CACHE_MISSES
+from model_registry import XGB_MODEL_PATH, load_lr_bundle, load_xgb_model, loaded_hash
+from woe_transformer import WOE_TABLES, bin_codes, bin_codes_batch
 
 
 # ============================================================
@@ -110,3 +127,283 @@ def get_reason_codes(
         "risk_increasing_factors": risk_increasing_factors,
         "risk_reducing_factors": risk_reducing_factors
     }
+
+
+# ============================================================
+# TABLE-DRIVEN LR REASON CODES
+# ------------------------------------------------------------
+# contribution = coef * WOE, and WOE is fixed per bin, so every
+# possible contribution is known at load time. Reason codes are
+# then integer lookups + a partial sort over the 18 features.
+# ============================================================
+
+def lr_contribution_table(lr_model) -> tuple:
+    """
+    Flattened coef * WOE table over all (feature, bin code) pairs.
+
+    Returns
+    -------
+    (table, offsets)
+        table[offsets[j] + code] is the contribution of feature
+        LR_FEATURES[j] in bin `code` (unmatched code -> 0.0)
+    """
+    coefs = lr_model.coef_[0]
+    if len(coefs) != len(LR_FEATURES):
+        raise ValueError("Mismatch between LR coefficients and WOE features")
+
+    sizes = [len(WOE_TABLES[f]) for f in LR_FEATURES]
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+    table = np.concatenate([
+        coef * WOE_TABLES[f] for coef, f in zip(coefs, LR_FEATURES)
+    ])
+    return table, offsets
+
+
+LR_CONTRIBUTIONS, LR_OFFSETS = lr_contribution_table(load_lr_bundle()["model"])
+
+
+def _top_reasons(contributions: np.ndarray, top_n: int) -> dict:
+    """
+    Same selection / ordering / strings as get_reason_codes,
+    via argpartition instead of a full DataFrame sort.
+    """
+    k = min(top_n, len(contributions))
+    if k <= 0:
+        return {"risk_increasing_factors": [], "risk_reducing_factors": []}
+
+    high = np.argpartition(-contributions, k - 1)[:k]
+    high = high[np.argsort(-contributions[high], kind="stable")]
+    high = high[contributions[high] > 0]
+
+    low = np.argpartition(contributions, k - 1)[:k]
+    low = low[np.argsort(-contributions[low], kind="stable")]
+    low = low[contributions[low] < 0]
+
+    return {
+        "risk_increasing_factors": [
+            f"{LR_FEATURES[j]} (impact: +{contributions[j]:.3f})" for j in high
+        ],
+        "risk_reducing_factors": [
+            f"{LR_FEATURES[j]} (impact: {contributions[j]:.3f})" for j in low
+        ],
+    }
+
+
+def get_lr_reason_codes(user_input: dict, top_n: int = 3) -> dict:
+    """
+    Table-driven get_reason_codes for one raw borrower input
+    (no WOE DataFrame built; registry LR model).
+    """
+    codes = bin_codes(user_input)
+    idx = LR_OFFSETS + np.fromiter(
+        (codes[f] for f in LR_FEATURES), dtype=np.int64, count=len(LR_FEATURES)
+    )
+    return _top_reasons(LR_CONTRIBUTIONS[idx], top_n)
+
+
+def get_lr_reason_codes_batch(df: pd.DataFrame, top_n: int = 3) -> list:
+    """
+    Table-driven LR reason codes for every borrower in df.
+
+    Returns
+    -------
+    list[dict]
+        One get_reason_codes-style dict per row of df
+    """
+    codes = np.column_stack([
+        bin_codes_batch(f, df).astype(np.int64) for f in LR_FEATURES
+    ])
+    contributions = LR_CONTRIBUTIONS[codes + LR_OFFSETS]
+    return [_top_reasons(row, top_n) for row in contributions]
+
+
+# ============================================================
+# XGBOOST REASON CODES
+# ------------------------------------------------------------
+# contribution = per-feature SHAP value from the booster
+# (pred_contribs), in log-odds units, averaged over the
+# CalibratedClassifierCV fold boosters. One-hot columns are
+# summed back onto their raw feature
+# (home_ownership_RENT -> home_ownership).
+# ============================================================
+
+XGB_RAW_FEATURES = list(dict.fromkeys(
+    XGB_ONE_HOT[col][0] if col in XGB_ONE_HOT else col
+    for col in XGB_TRAIN_FEATURES
+))
+
+# (n_train_features, n_raw_features) 0/1 grouping matrix
+XGB_GROUPING = np.zeros((len(XGB_TRAIN_FEATURES), len(XGB_RAW_FEATURES)))
+for _i, _col in enumerate(XGB_TRAIN_FEATURES):
+    _raw = XGB_ONE_HOT[_col][0] if _col in XGB_ONE_HOT else _col
+    XGB_GROUPING[_i, XGB_RAW_FEATURES.index(_raw)] = 1.0
+
+XGB_REASON_CACHE_SIZE = 4096
+_XGB_REASON_CACHE = OrderedDict()
+_XGB_REASON_LOCK = threading.Lock()
+
+
+def _fold_boosters(xgb_model) -> list:
+    """
+    Underlying boosters of a (possibly calibrated) XGBoost model.
+    """
+    if hasattr(xgb_model, "calibrated_classifiers_"):
+        return [
+            cc.estimator.get_booster()
+            for cc in xgb_model.calibrated_classifiers_
+        ]
+    return [xgb_model.get_booster()]
+
+
+def xgb_contributions_batch(
+    X: pd.DataFrame,
+    xgb_model=None,
+    approx: bool = False
+) -> np.ndarray:
+    """
+    Per-raw-feature log-odds contributions for many rows.
+
+    Parameters
+    ----------
+    X : pd.DataFrame
+        XGBoost input (XGB_TRAIN_FEATURES columns)
+    xgb_model : fitted XGBClassifier or CalibratedClassifierCV
+        Defaults to the registry challenger model
+    approx : bool
+        Saabas path attribution instead of exact TreeSHAP
+        (~50x faster, same sign / ranking in most rows)
+
+    Returns
+    -------
+    np.ndarray
+        (n_rows, len(XGB_RAW_FEATURES)); bias term dropped
+    """
+    if xgb_model is None:
+        xgb_model = load_xgb_model()
+
+    dmatrix = xgb.DMatrix(X[XGB_TRAIN_FEATURES])
+    boosters = _fold_boosters(xgb_model)
+
+    contribs = np.zeros((len(X), len(XGB_TRAIN_FEATURES)))
+    for booster in boosters:
+        contribs += booster.predict(
+            dmatrix, pred_contribs=True, approx_contribs=approx
+        )[:, :-1]
+    contribs /= len(boosters)
+
+    return contribs @ XGB_GROUPING
+
+
+def _format_reasons(contributions: np.ndarray, top_n: int) -> dict:
+    """
+    Same ordering / strings as get_reason_codes: increasing
+    factors largest first, reducing factors the top_n most
+    negative in descending order.
+    """
+    order = np.argsort(-contributions, kind="stable")
+    ranked = contributions[order]
+
+    pos = order[ranked > 0][:top_n]
+    neg = order[ranked < 0][-top_n:] if top_n > 0 else order[:0]
+
+    return {
+        "risk_increasing_factors": [
+            f"{XGB_RAW_FEATURES[i]} (impact: +{contributions[i]:.3f})"
+            for i in pos
+        ],
+        "risk_reducing_factors": [
+            f"{XGB_RAW_FEATURES[i]} (impact: {contributions[i]:.3f})"
+            for i in neg
+        ],
+    }
+
+
+def get_xgb_reason_codes_batch(
+    df: pd.DataFrame,
+    xgb_model=None,
+    top_n: int = 3,
+    approx: bool = False
+) -> list:
+    """
+    XGBoost reason codes for every borrower in df.
+
+    Identical rows are explained once: rows are deduplicated on
+    the encoded feature vector before one pred_contribs call.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Raw borrower inputs (one per row)
+    xgb_model : optional
+        Defaults to the registry challenger model
+    top_n : int
+        Number of top positive / negative contributors
+    approx : bool
+        See xgb_contributions_batch
+
+    Returns
+    -------
+    list[dict]
+        One get_reason_codes-style dict per row of df
+    """
+    X = prepare_xgb_input_batch(df)
+    values = X.to_numpy(dtype=float)
+
+    unique_rows, inverse = np.unique(values, axis=0, return_inverse=True)
+    unique_X = pd.DataFrame(unique_rows, columns=XGB_TRAIN_FEATURES)
+    contributions = xgb_contributions_batch(unique_X, xgb_model, approx)
+
+    reasons = [_format_reasons(c, top_n) for c in contributions]
+    return [reasons[i] for i in np.ravel(inverse)]
+
+
+def get_xgb_reason_codes(
+    user_input: dict,
+    xgb_model=None,
+    top_n: int = 3,
+    approx: bool = False
+) -> dict:
+    """
+    XGBoost reason codes for one borrower.
+
+    Results for the registry model are kept in an LRU cache keyed
+    on the model file's hash and the encoded feature vector (hits /
+    misses exported as cache="xgb_reason_codes"). A caller-supplied
+    model is explained uncached.
+    """
+    X = prepare_xgb_input(user_input)
+
+    registry_model = load_xgb_model()
+    if xgb_model is not None and xgb_model is not registry_model:
+        return _format_reasons(
+            xgb_contributions_batch(X, xgb_model, approx)[0], top_n
+        )
+
+    # raw bytes: NaN features compare equal (a float tuple's do not)
+    key = (loaded_hash(XGB_MODEL_PATH), top_n, approx, X.to_numpy(dtype=float).tobytes())
+
+    with _XGB_REASON_LOCK:
+        cached = _XGB_REASON_CACHE.get(key)
+        if cached is not None:
+            _XGB_REASON_CACHE.move_to_end(key)
+    if cached is not None:
+        CACHE_HITS.inc("xgb_reason_codes")
+        return _copy_reasons(cached)
+
+    CACHE_MISSES.inc("xgb_reason_codes")
+    result = _format_reasons(
+        xgb_contributions_batch(X, registry_model, approx)[0], top_n
+    )
+
+    with _XGB_REASON_LOCK:
+        _XGB_REASON_CACHE[key] = result
+        if len(_XGB_REASON_CACHE) > XGB_REASON_CACHE_SIZE:
+            _XGB_REASON_CACHE.popitem(last=False)
+    return _copy_reasons(result)
+
+
+def _copy_reasons(reasons: dict) -> dict:
+    """
+    Copy of a cached result, so callers cannot mutate the cache.
+    """
+    return {k: list(v) for k, v in reasons.items()}
@@ -20,13 +20,13 @@ def pd_to_score(pd: float) -> float:
 
     Parameters
     ----------
-    pd : float
+    pd : float or np.ndarray
         Probability of Default (0 < pd < 1)
 
     Returns
     -------
-    float
-        Credit score
+    float or np.ndarray
+        Credit score (element-wise for arrays)
     """
 
     # Safety check
@@ -38,5 +38,5 @@ def pd_to_score(pd: float) -> float:
     # Score formula
     score = BASE_SCORE + (PDO / np.log(2)) * np.log(odds / BASE_ODDS)
 
-    return round(score, 0)
+    return np.round(score, 0)
 
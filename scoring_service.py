@@ -0,0 +1,226 @@
+# ============================================================
+# scoring_service.py
+# ------------------------------------------------------------
+# Minimal local HTTP scoring service (stdlib only)
+#   POST /score    borrower JSON -> champion–challenger JSON
+#   GET  /healthz  liveness
+#   GET  /metrics  Prometheus text format (metrics.py)
+# Optional live PD/score quantile sketches (quantile_sketch.py).
+# Optional reason codes per model (reason_codes.py); the XGB
+# ones go through its LRU cache (cache_hits/misses_total).
+# One thread per connection (ThreadingHTTPServer).
+# ============================================================
+
+import json
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import latency
+import metrics
+from champion_challenger_engine import run_champion_challenger
+from profiling import RequestProfiler
+
+
+# Set by serve(); shared by all handler threads
+PROFILER = None
+DECISION_LOG = None
+SKETCHES = None
+REASON_CODES = False
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"not JSON serialisable: {type(value).__name__}")
+
+
+def result_to_response(result: dict) -> dict:
+    """
+    Strip debug input frames (X_lr / X_xgb) from a
+    run_champion_challenger result.
+    """
+    return {
+        "logistic": {k: v for k, v in result["logistic"].items() if not k.startswith("X_")},
+        "xgboost": {k: v for k, v in result["xgboost"].items() if not k.startswith("X_")},
+        "agreement": bool(result["agreement"]),
+    }
+
+
+def response_reason_codes(user_input: dict, result: dict) -> dict:
+    """
+    Top reason codes of both models for one scored request.
+    """
+    from model_registry import load_lr_bundle
+    from reason_codes import get_reason_codes, get_xgb_reason_codes
+
+    with latency.stage("svc.reason_codes"):
+        return {
+            "logistic": get_reason_codes(result["logistic"]["X_lr"], load_lr_bundle()["model"]),
+            "xgboost": get_xgb_reason_codes(user_input),
+        }
+
+
+def score_request(user_input: dict) -> dict:
+    start = time.perf_counter()
+    try:
+        if PROFILER is not None:
+            with PROFILER.profile("request"):
+                result = run_champion_challenger(user_input, DECISION_LOG)
+        else:
+            result = run_champion_challenger(user_input, DECISION_LOG)
+        reasons = response_reason_codes(user_input, result) if REASON_CODES else None
+    except Exception:
+        metrics.ERRORS.inc()
+        raise
+    metrics.record_result(result, time.perf_counter() - start)
+    if SKETCHES is not None:
+        SKETCHES.observe(result)
+    response = result_to_response(result)
+    if reasons is not None:
+        response["reason_codes"] = reasons
+    return response
+
+
+# ============================================================
+# HTTP HANDLER
+# ============================================================
+
+class ScoringHandler(BaseHTTPRequestHandler):
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/healthz":
+            self._send(200, b'{"status": "ok"}')
+        elif self.path == "/metrics":
+            self._send(200, metrics.render().encode(), metrics.CONTENT_TYPE)
+        else:
+            self._send(404, b'{"error": "not found"}')
+
+    def do_POST(self):
+        if self.path != "/score":
+            self._send(404, b'{"error": "not found"}')
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            user_input = json.loads(self.rfile.read(length))
+            response = score_request(user_input)
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, json.dumps({"error": str(e)}).encode())
+            return
+        except Exception as e:
+            self._send_internal_error(e)
+            return
+
+        try:
+            body = json.dumps(response, default=_to_json).encode()
+        except Exception as e:
+            self._send_internal_error(e)
+            return
+        self._send(200, body)
+
+    def _send_internal_error(self, e: Exception):
+        # anything unexpected still gets a response instead of a dropped connection
+        self._send(500, json.dumps({"error": f"internal error: {type(e).__name__}"}).encode())
+
+    def log_message(self, format, *args):
+        # keep the request path quiet; errors still surface via 4xx bodies
+        pass
+
+
+# ============================================================
+# ENTRY POINT
+# ============================================================
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    profiler: RequestProfiler | None = None,
+    decision_log=None,
+    sketches=None,
+    with_reason_codes: bool = False
+) -> ThreadingHTTPServer:
+    """
+    Build the server (call .serve_forever() on the result).
+    """
+    global PROFILER, DECISION_LOG, SKETCHES, REASON_CODES
+    PROFILER = profiler
+    DECISION_LOG = decision_log
+    SKETCHES = sketches
+    REASON_CODES = with_reason_codes
+    return ThreadingHTTPServer((host, port), ScoringHandler)
+
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local credit scoring service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--profile-rate", type=float, default=0.0,
+                        help="fraction of requests to profile (0 = off; keep ~0.01, profiling slows concurrent requests)")
+    parser.add_argument("--profile-dir", default="profiles")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="also run tracemalloc in profiled requests (slows every thread while active)")
+    parser.add_argument("--decision-log-dir", default=None,
+                        help="enable the async shadow decision log")
+    parser.add_argument("--stage-latency", action="store_true",
+                        help="enable per-stage latency hooks (exported on /metrics)")
+    parser.add_argument("--sketch-snapshot", default=None,
+                        help="JSON path for live PD/score quantile sketches")
+    parser.add_argument("--sketch-interval", type=float, default=60.0)
+    parser.add_argument("--reason-codes", action="store_true",
+                        help="add LR / XGB reason codes to each response")
+    args = parser.parse_args()
+
+    if args.stage_latency:
+        latency.enable()
+
+    profiler = None
+    if args.profile_rate > 0:
+        profiler = RequestProfiler(
+            args.profile_rate, args.profile_dir, trace_memory=args.profile_memory
+        )
+
+    decision_log = None
+    if args.decision_log_dir:
+        from decision_log import DecisionLog
+        decision_log = DecisionLog(args.decision_log_dir)
+
+    sketches = None
+    if args.sketch_snapshot:
+        from quantile_sketch import ScoreDistributionMonitor
+        sketches = ScoreDistributionMonitor(snapshot_path=args.sketch_snapshot)
+        sketches.start_snapshots(args.sketch_interval)
+
+    server = serve(args.host, args.port, profiler, decision_log, sketches, args.reason_codes)
+
+    # SIGTERM / SIGINT -> stop serve_forever, then flush below
+    def _shutdown(*_):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    print(f"serving on http://{args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if decision_log is not None:
+            decision_log.close()
+        if profiler is not None:
+            profiler.dump()
+        if sketches is not None:
+            sketches.stop_snapshots()
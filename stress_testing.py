@@ -0,0 +1,302 @@
+# ============================================================
+# stress_testing.py
+# ------------------------------------------------------------
+# Portfolio stress tests with selective recomputation
+# - Scenarios are declarative: a list of raw-column shocks
+#     {"name": "adverse",
+#      "shocks": [{"column": "dti", "op": "add", "value": 5},
+#                 {"column": "fico", "op": "add", "value": -30,
+#                  "min": 300, "max": 850}]}
+#   op: "add" | "mul" | "set"
+# - The base LR WOE matrix and XGB matrix are built ONCE.
+#   A scenario re-bins only the LR features / rebuilds only
+#   the XGB columns whose raw source column it shocks
+#   (bin_codes_batch / xgb_column_batch), swaps them in,
+#   re-scores, and restores the cached columns
+# - A model none of whose inputs are touched keeps its base
+#   PDs (no predict_proba call)
+# ============================================================
+
+import json
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from decision_engine import (
+    DECISIONS,
+    RISK_BANDS,
+    score_to_decision_batch,
+    score_to_risk_band_batch,
+)
+from feature_pipeline import XGB_ONE_HOT, XGB_TRAIN_FEATURES, xgb_column_batch
+from feature_schema import LR_FEATURES
+from model_registry import load_lr_bundle, load_pd_calibration, load_xgb_model
+from pd_calibration import calibrate
+from scorecard import pd_to_score
+from woe_transformer import (
+    CATEGORICAL_SOURCES,
+    NUMERIC_BINS,
+    WOE_TABLES,
+    bin_codes_batch,
+)
+
+
+# Raw columns that describe the same attribute; a shock on the
+# key is applied to the linked columns too
+LINKED_COLUMNS = {"fico": ["fico_range_low"]}
+
+XGB_ORDINAL_SOURCES = {"grade": "grade", "sub_grade": "sub_grade", "emp_length": "emp_length"}
+
+OPS = {
+    "add": lambda x, v: x + v,
+    "mul": lambda x, v: x * v,
+    "set": lambda x, v: np.full(len(x), v, dtype=object),
+}
+
+
+# ============================================================
+# DEPENDENCIES: raw column -> model inputs
+# ============================================================
+
+def _lr_source(feature: str) -> str:
+    if feature in NUMERIC_BINS:
+        return NUMERIC_BINS[feature][0]
+    return CATEGORICAL_SOURCES[feature]
+
+
+def _xgb_source(col: str) -> str:
+    if col in XGB_ONE_HOT:
+        return XGB_ONE_HOT[col][0]
+    return XGB_ORDINAL_SOURCES.get(col, col)
+
+
+LR_DEPENDENTS = {}
+for _j, _f in enumerate(LR_FEATURES):
+    LR_DEPENDENTS.setdefault(_lr_source(_f), []).append(_j)
+
+XGB_DEPENDENTS = {}
+for _j, _c in enumerate(XGB_TRAIN_FEATURES):
+    XGB_DEPENDENTS.setdefault(_xgb_source(_c), []).append(_j)
+
+
+def touched_inputs(columns) -> tuple:
+    """
+    (LR matrix column indices, XGB matrix column indices) that
+    depend on any of the given raw columns.
+    """
+    lr_cols = sorted({j for c in columns for j in LR_DEPENDENTS.get(c, [])})
+    xgb_cols = sorted({j for c in columns for j in XGB_DEPENDENTS.get(c, [])})
+    return lr_cols, xgb_cols
+
+
+# ============================================================
+# STRESS ENGINE
+# ============================================================
+
+class StressEngine:
+    """
+    Cached base matrices for one portfolio; run() applies any
+    number of scenarios against them.
+    """
+
+    def __init__(self, portfolio: pd.DataFrame):
+        self.portfolio = portfolio
+
+        bundle = load_lr_bundle()
+        self.lr_coef = bundle["model"].coef_[0]
+        self.lr_intercept = bundle["model"].intercept_[0]
+        self.xgb_model = load_xgb_model()
+        self.calibrators = load_pd_calibration()
+
+        self.X_lr = np.column_stack([
+            WOE_TABLES[f][bin_codes_batch(f, portfolio)] for f in LR_FEATURES
+        ])
+        self.X_xgb = np.column_stack([
+            xgb_column_batch(c, portfolio) for c in XGB_TRAIN_FEATURES
+        ])
+
+        self.base = self._score(self._pd_lr(), self._pd_xgb())
+
+    # --------------------------------------------------------
+    # PDs from the (possibly patched) cached matrices
+    # --------------------------------------------------------
+
+    def _pd_lr(self) -> np.ndarray:
+        pds = 1 / (1 + np.exp(-(self.X_lr @ self.lr_coef + self.lr_intercept)))
+        return calibrate(self.calibrators, "lr", pds)
+
+    def _pd_xgb(self) -> np.ndarray:
+        frame = pd.DataFrame(self.X_xgb, columns=XGB_TRAIN_FEATURES, copy=False)
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=UserWarning)
+            pds = self.xgb_model.predict_proba(frame)[:, 1]
+        return calibrate(self.calibrators, "xgb", pds)
+
+    def _score(self, pd_lr: np.ndarray, pd_xgb: np.ndarray) -> pd.DataFrame:
+        out = {}
+        for model, pds in (("lr", pd_lr), ("xgb", pd_xgb)):
+            scores = pd_to_score(pds)
+            out[f"pd_{model}"] = pds
+            out[f"score_{model}"] = scores
+            out[f"risk_band_{model}"] = score_to_risk_band_batch(scores)
+            out[f"decision_{model}"] = score_to_decision_batch(scores)
+        return pd.DataFrame(out, index=self.portfolio.index)
+
+    # --------------------------------------------------------
+    # Shocks
+    # --------------------------------------------------------
+
+    def shocked_columns(self, shocks: list) -> pd.DataFrame:
+        """
+        Only the shocked raw columns (plus linked ones), shocks
+        applied in order. "set" may assign categorical values;
+        "add" / "mul" coerce the column to numeric and honour
+        optional "min" / "max" bounds.
+        """
+        values = {}
+        for shock in shocks:
+            op = shock.get("op", "add")
+            if op not in OPS:
+                raise ValueError(f"unknown shock op {op!r}")
+
+            for column in [shock["column"]] + LINKED_COLUMNS.get(shock["column"], []):
+                if column not in self.portfolio.columns:
+                    continue
+                if op == "set":
+                    values[column] = OPS[op](self.portfolio.index, shock["value"])
+                    continue
+
+                current = values.get(column)
+                if current is None:
+                    current = self.portfolio[column]
+                current = pd.to_numeric(pd.Series(current), errors="coerce").to_numpy(dtype=float)
+                shocked = OPS[op](current, shock["value"])
+                values[column] = np.clip(shocked, shock.get("min", -np.inf), shock.get("max", np.inf))
+
+        return pd.DataFrame(values, index=self.portfolio.index)
+
+    def run_scenario(self, scenario: dict) -> pd.DataFrame:
+        """
+        Re-score the portfolio under one scenario.
+        """
+        shocked = self.shocked_columns(scenario["shocks"])
+
+        lr_cols, xgb_cols = touched_inputs(shocked.columns)
+
+        saved_lr = self.X_lr[:, lr_cols].copy()
+        saved_xgb = self.X_xgb[:, xgb_cols].copy()
+        try:
+            for j in lr_cols:
+                f = LR_FEATURES[j]
+                self.X_lr[:, j] = WOE_TABLES[f][bin_codes_batch(f, shocked)]
+            for j in xgb_cols:
+                self.X_xgb[:, j] = xgb_column_batch(XGB_TRAIN_FEATURES[j], shocked)
+
+            pd_lr = self._pd_lr() if lr_cols else self.base["pd_lr"].to_numpy()
+            pd_xgb = self._pd_xgb() if xgb_cols else self.base["pd_xgb"].to_numpy()
+        finally:
+            self.X_lr[:, lr_cols] = saved_lr
+            self.X_xgb[:, xgb_cols] = saved_xgb
+
+        return self._score(pd_lr, pd_xgb)
+
+    def run(self, scenarios: list, keep_rows: bool = False) -> dict:
+        """
+        Run every scenario; summary rows include the base case.
+
+        Returns
+        -------
+        dict
+            summary : DataFrame (scenario x model)
+            rows    : {scenario name: scored DataFrame} if keep_rows
+        """
+        results = {"base": self.base}
+        recomputed = {"base": ([], [])}
+        for scenario in scenarios:
+            name = scenario["name"]
+            results[name] = self.run_scenario(scenario)
+            columns = [
+                c for shock in scenario["shocks"]
+                for c in [shock["column"]] + LINKED_COLUMNS.get(shock["column"], [])
+                if c in self.portfolio.columns
+            ]
+            lr_cols, xgb_cols = touched_inputs(columns)
+            recomputed[name] = (
+                [LR_FEATURES[j] for j in lr_cols],
+                [XGB_TRAIN_FEATURES[j] for j in xgb_cols],
+            )
+
+        summary = pd.concat(
+            [summarise_model(name, scored, self.base, m).assign(
+                recomputed=",".join(recomputed[name][k]))
+             for name, scored in results.items()
+             for k, m in enumerate(("lr", "xgb"))],
+            ignore_index=True,
+        )
+        return {"summary": summary, "rows": results if keep_rows else {}}
+
+
+# ============================================================
+# SUMMARY
+# ============================================================
+
+def summarise_model(name: str, scored: pd.DataFrame, base: pd.DataFrame, model: str) -> pd.DataFrame:
+    """
+    One summary row: mean PD / score, shift vs base, share of
+    decisions that changed, decision and risk-band mix.
+    """
+    pds = scored[f"pd_{model}"]
+    decisions = scored[f"decision_{model}"]
+    bands = scored[f"risk_band_{model}"]
+
+    row = {
+        "scenario": name,
+        "model": model,
+        "mean_pd": pds.mean(),
+        "mean_pd_change": pds.mean() - base[f"pd_{model}"].mean(),
+        "mean_score": scored[f"score_{model}"].mean(),
+        "decision_changed": float((decisions != base[f"decision_{model}"]).mean()),
+    }
+    for d in DECISIONS:
+        row[f"rate_{d}"] = float((decisions == d).mean())
+    for b in RISK_BANDS:
+        row[f"band_{b}"] = float((bands == b).mean())
+    return pd.DataFrame([row])
+
+
+def stress_test(portfolio: pd.DataFrame, scenarios: list, keep_rows: bool = False) -> dict:
+    """
+    Convenience wrapper: StressEngine(portfolio).run(scenarios).
+    """
+    return StressEngine(portfolio).run(scenarios, keep_rows)
+
+
+def load_scenarios(path: str) -> list:
+    with open(path, "r") as f:
+        scenarios = json.load(f)
+    names = [s["name"] for s in scenarios]
+    if "base" in names or len(set(names)) != len(names):
+        raise ValueError("scenario names must be unique and not 'base'")
+    return scenarios
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Stress-test a raw portfolio CSV under shock scenarios"
+    )
+    parser.add_argument("path")
+    parser.add_argument("scenarios_json", help="list of {name, shocks}")
+    parser.add_argument("--out", default="stress_summary.csv")
+    args = parser.parse_args()
+
+    result = stress_test(pd.read_csv(args.path), load_scenarios(args.scenarios_json))
+    result["summary"].to_csv(args.out, index=False)
+    print(result["summary"].to_string(index=False))
@@ -0,0 +1,265 @@
+# ============================================================
+# vintage_backtest.py
+# ------------------------------------------------------------
+# Champion vs challenger backtest per origination vintage
+# - Scores a LABELED history in chunks through both models,
+#   keeping only (vintage, PD, risk band, outcome) per loan
+# - Per vintage & model: AUC, Gini, KS, Brier, calibration by
+#   PD decile; the same metrics plus observed vs predicted per
+#   risk band
+# - Unlabeled rows are dropped; undated rows form an explicit
+#   "UNKNOWN" vintage
+# - Rank-based metrics are O(n log n) (one argsort per
+#   vintage & model); vintages run in parallel processes
+# ============================================================
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cutoff_simulator import MODEL_COLUMNS
+from decision_engine import RISK_BANDS
+from woe_fitter import TARGET_COLUMN
+
+
+VINTAGE_COLUMN = "issue_d"
+UNKNOWN_VINTAGE = "UNKNOWN"
+
+BAND_COLUMNS = {"lr": "risk_band_lr", "xgb": "risk_band_xgb"}
+
+
+# ============================================================
+# RANK-BASED METRICS
+# ============================================================
+
+def rank_auc(pds: np.ndarray, bad: np.ndarray) -> float:
+    """
+    Mann-Whitney AUC with average ranks for ties.
+    """
+    n_bad = bad.sum()
+    n_good = len(bad) - n_bad
+    if n_bad == 0 or n_good == 0:
+        return np.nan
+
+    order = np.argsort(pds, kind="stable")
+    sorted_pds = pds[order]
+
+    # average rank of each tie group
+    starts = np.flatnonzero(np.r_[True, sorted_pds[1:] != sorted_pds[:-1]])
+    ends = np.r_[starts[1:], len(pds)]
+    ranks = np.empty(len(pds))
+    ranks[order] = np.repeat((starts + ends + 1) / 2, ends - starts)
+
+    return float((ranks[bad == 1].sum() - n_bad * (n_bad + 1) / 2) / (n_bad * n_good))
+
+
+def ks_statistic(pds: np.ndarray, bad: np.ndarray) -> float:
+    """
+    Max gap between the bad and good cumulative distributions,
+    evaluated at the end of each tie group.
+    """
+    n_bad = bad.sum()
+    n_good = len(bad) - n_bad
+    if n_bad == 0 or n_good == 0:
+        return np.nan
+
+    order = np.argsort(pds, kind="stable")
+    sorted_pds, sorted_bad = pds[order], bad[order]
+    last = np.r_[sorted_pds[1:] != sorted_pds[:-1], True]
+
+    cum_bad = np.cumsum(sorted_bad)[last] / n_bad
+    cum_good = np.cumsum(1 - sorted_bad)[last] / n_good
+    return float(np.max(np.abs(cum_bad - cum_good)))
+
+
+def calibration_deciles(pds: np.ndarray, bad: np.ndarray, n: int = 10) -> pd.DataFrame:
+    """
+    Predicted vs observed default rate per PD decile
+    (decile 1 = lowest PD).
+    """
+    order = np.argsort(pds, kind="stable")
+    decile = np.empty(len(pds), dtype=np.int64)
+    decile[order] = np.arange(len(pds)) * n // max(len(pds), 1)
+
+    rows = np.bincount(decile, minlength=n)
+    mean_pd = np.bincount(decile, weights=pds, minlength=n) / np.maximum(rows, 1)
+    bad_rate = np.bincount(decile, weights=bad, minlength=n) / np.maximum(rows, 1)
+
+    return pd.DataFrame({
+        "decile": np.arange(1, n + 1),
+        "rows": rows,
+        "mean_pd": mean_pd,
+        "bad_rate": bad_rate,
+    })
+
+
+def discrimination(pds: np.ndarray, bad: np.ndarray) -> dict:
+    """
+    AUC, Gini, KS and Brier (rank metrics NaN with one class).
+    """
+    auc = rank_auc(pds, bad)
+    return {
+        "auc": auc,
+        "gini": 2 * auc - 1,
+        "ks": ks_statistic(pds, bad),
+        "brier": float(np.mean((pds - bad) ** 2)),
+    }
+
+
+# ============================================================
+# ONE VINTAGE
+# ============================================================
+
+def backtest_vintage(vintage: str, frame: pd.DataFrame) -> dict:
+    """
+    All metrics for one vintage (frame from score_history).
+
+    Returns
+    -------
+    dict
+        {"summary": [...], "calibration": DataFrame,
+         "bands": DataFrame}
+    """
+    bad = frame[TARGET_COLUMN].to_numpy(dtype=float)
+    summary, calibration, bands = [], [], []
+
+    for model, (_, pd_col) in MODEL_COLUMNS.items():
+        pds = frame[pd_col].to_numpy(dtype=float)
+
+        summary.append({
+            "vintage": vintage,
+            "model": model,
+            "rows": len(frame),
+            "bad_rate": bad.mean(),
+            "mean_pd": pds.mean(),
+            **discrimination(pds, bad),
+        })
+
+        cal = calibration_deciles(pds, bad)
+        cal.insert(0, "model", model)
+        cal.insert(0, "vintage", vintage)
+        calibration.append(cal)
+
+        band_values = frame[BAND_COLUMNS[model]].astype(str).to_numpy()
+        for risk_band in RISK_BANDS:
+            in_band = band_values == risk_band
+            if not in_band.any():
+                continue
+            bands.append({
+                "vintage": vintage,
+                "model": model,
+                "risk_band": risk_band,
+                "rows": int(in_band.sum()),
+                "mean_pd": pds[in_band].mean(),
+                "bad_rate": bad[in_band].mean(),
+                **discrimination(pds[in_band], bad[in_band]),
+            })
+
+    return {
+        "summary": summary,
+        "calibration": pd.concat(calibration, ignore_index=True),
+        "bands": pd.DataFrame(bands),
+    }
+
+
+# ============================================================
+# SCORING + PARALLEL BACKTEST
+# ============================================================
+
+def vintage_labels(values: pd.Series, freq: str = "Q") -> pd.Series:
+    """
+    Origination date -> period label ("2017Q3"); missing or
+    unparseable dates -> UNKNOWN_VINTAGE. Row-wise, so labels
+    never depend on which chunk a row falls in.
+    """
+    dates = pd.to_datetime(values, errors="coerce", format="mixed")
+    labels = dates.dt.to_period(freq).astype(str)
+    return labels.where(dates.notna(), UNKNOWN_VINTAGE)
+
+
+def score_history(
+    path: str,
+    vintage_column: str = VINTAGE_COLUMN,
+    target: str = TARGET_COLUMN,
+    freq: str = "Q",
+    chunksize: int = 100_000
+) -> pd.DataFrame:
+    """
+    Score a labeled history CSV in chunks, keeping only the
+    columns the backtest needs (float32 PDs, categorical bands).
+    Rows with a missing / non-numeric target are skipped.
+    """
+    from champion_challenger_engine import run_champion_challenger_batch
+
+    parts = []
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        y = pd.to_numeric(chunk[target], errors="coerce")
+        chunk, y = chunk[y.notna()], y[y.notna()]
+        if chunk.empty:
+            continue
+
+        scored = run_champion_challenger_batch(chunk)
+        parts.append(pd.DataFrame({
+            "vintage": vintage_labels(chunk[vintage_column], freq).to_numpy(),
+            TARGET_COLUMN: y.to_numpy(dtype=np.int8),
+            "pd_lr": scored["pd_lr"].to_numpy(dtype=np.float32),
+            "pd_xgb": scored["pd_xgb"].to_numpy(dtype=np.float32),
+            "risk_band_lr": pd.Categorical(scored["risk_band_lr"], categories=RISK_BANDS),
+            "risk_band_xgb": pd.Categorical(scored["risk_band_xgb"], categories=RISK_BANDS),
+        }))
+    return pd.concat(parts, ignore_index=True)
+
+
+def backtest(scored: pd.DataFrame, max_workers: int | None = None) -> dict:
+    """
+    Run backtest_vintage for every vintage in parallel.
+
+    Returns
+    -------
+    dict
+        {"summary": DataFrame (vintage x model),
+         "calibration": DataFrame, "bands": DataFrame}
+    """
+    groups = [(v, g) for v, g in scored.groupby("vintage", sort=True)]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(
+            backtest_vintage, [v for v, _ in groups], [g for _, g in groups]
+        ))
+
+    return {
+        "summary": pd.DataFrame([row for r in results for row in r["summary"]]),
+        "calibration": pd.concat([r["calibration"] for r in results], ignore_index=True),
+        "bands": pd.concat([r["bands"] for r in results], ignore_index=True),
+    }
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Per-vintage champion / challenger backtest"
+    )
+    parser.add_argument("path")
+    parser.add_argument("--vintage-column", default=VINTAGE_COLUMN)
+    parser.add_argument("--target", default=TARGET_COLUMN)
+    parser.add_argument("--freq", default="Q")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out-prefix", default="backtest")
+    args = parser.parse_args()
+
+    scored = score_history(
+        args.path, args.vintage_column, args.target, args.freq, args.chunksize
+    )
+    report = backtest(scored, args.workers)
+
+    for name, table in report.items():
+        table.to_csv(f"{args.out_prefix}_{name}.csv", index=False)
+    print(report["summary"].to_string(index=False))
@@ -0,0 +1,225 @@
+# ============================================================
+# woe_fitter.py
+# ------------------------------------------------------------
+# Chunked WOE / IV fitter for the LR scorecard
+# - Streams LABELED raw training data in chunks
+# - Accumulates good / bad counts per (feature, bin label)
+#   with the same binning as woe_transformer (bin_codes_batch)
+# - Partial counts from parallel workers merge exactly
+# - Rows without a usable 0/1 target are skipped and counted
+#   (WOECounts.unlabeled), never treated as goods
+# - Writes a woe_maps.json the transformer loads as-is, plus
+#   IV per feature in a sidecar JSON
+# ------------------------------------------------------------
+# WOE = ln( (good_i / goods) / (bad_i / bads) )
+#   (same sign convention as woe_maps.json: positive = safer)
+# IV  = sum_i (good_i / goods - bad_i / bads) * WOE_i
+# ============================================================
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from feature_schema import LR_FEATURES
+from woe_transformer import (
+    CATEGORICAL_SOURCES,
+    NUMERIC_BINS,
+    _source_values,
+    bin_codes_batch,
+    bin_labels,
+    category_labels,
+    purpose_to_group,
+)
+
+
+TARGET_COLUMN = "default"     # 1 = bad, 0 = good
+
+# Added to every good / bad cell so empty bins stay finite
+SMOOTHING = 0.5
+
+
+# ============================================================
+# PER-CHUNK BIN LABELS
+# ============================================================
+
+def chunk_bin_counts(feature: str, df: pd.DataFrame, bad: np.ndarray) -> dict:
+    """
+    {bin label: [rows, bads]} for one feature over one chunk.
+
+    Numeric features use the transformer edge tables; categorical
+    features use the same string labels the transformer looks up.
+    """
+    if feature in NUMERIC_BINS:
+        labels = bin_labels(feature)
+        codes = bin_codes_batch(feature, df)
+    else:
+        values = _source_values(df, CATEGORICAL_SOURCES[feature])
+        if feature == "purpose_group":
+            values = values.map(purpose_to_group)
+        codes, uniques = pd.factorize(category_labels(values), sort=False)
+        labels = list(uniques)
+
+    n_codes = len(labels)
+    rows = np.bincount(codes, minlength=n_codes)[:n_codes]
+    bads = np.bincount(codes, weights=bad, minlength=n_codes)[:n_codes]
+
+    return {
+        label: np.array([rows[i], bads[i]], dtype=float)
+        for i, label in enumerate(labels)
+        if rows[i] > 0
+    }
+
+
+# ============================================================
+# MERGEABLE COUNTS
+# ============================================================
+
+class WOECounts:
+    """
+    Running good / bad counts per LR feature and bin label.
+    """
+
+    def __init__(self, features=None):
+        self.features = list(features or LR_FEATURES)
+        self.counts = {f: {} for f in self.features}
+        self.rows = 0
+        self.bads = 0.0
+        self.unlabeled = 0
+
+    def update(self, df: pd.DataFrame, target: str = TARGET_COLUMN) -> "WOECounts":
+        bad = pd.to_numeric(df[target], errors="coerce")
+        labeled = bad.notna().to_numpy()
+        self.unlabeled += int((~labeled).sum())
+        df, bad = df[labeled], bad[labeled].to_numpy(dtype=float)
+
+        for feature in self.features:
+            table = self.counts[feature]
+            for label, c in chunk_bin_counts(feature, df, bad).items():
+                if label in table:
+                    table[label] += c
+                else:
+                    table[label] = c
+        self.rows += len(df)
+        self.bads += float(bad.sum())
+        return self
+
+    def merge(self, other: "WOECounts") -> "WOECounts":
+        for feature in self.features:
+            table = self.counts[feature]
+            for label, c in other.counts[feature].items():
+                table[label] = table[label] + c if label in table else c.copy()
+        self.rows += other.rows
+        self.bads += other.bads
+        self.unlabeled += other.unlabeled
+        return self
+
+    # --------------------------------------------------------
+    # WOE / IV
+    # --------------------------------------------------------
+
+    def _ordered_labels(self, feature: str) -> list:
+        """
+        Transformer bin order first, then any unseen labels.
+        """
+        known = bin_labels(feature) if feature in NUMERIC_BINS else []
+        seen = self.counts[feature]
+        return [l for l in known if l in seen] + sorted(l for l in seen if l not in known)
+
+    def woe_iv(self, feature: str, smoothing: float = SMOOTHING) -> tuple:
+        labels = self._ordered_labels(feature)
+        c = np.array([self.counts[feature][l] for l in labels]).reshape(-1, 2)
+
+        bads = c[:, 1] + smoothing
+        goods = c[:, 0] - c[:, 1] + smoothing
+        good_dist = goods / goods.sum()
+        bad_dist = bads / bads.sum()
+
+        woe = np.log(good_dist / bad_dist)
+        iv = float(np.sum((good_dist - bad_dist) * woe))
+        return dict(zip(labels, np.round(woe, 6).tolist())), iv
+
+    def woe_maps(self, smoothing: float = SMOOTHING) -> dict:
+        return {f: self.woe_iv(f, smoothing)[0] for f in self.features}
+
+    def information_values(self, smoothing: float = SMOOTHING) -> dict:
+        return {f: round(self.woe_iv(f, smoothing)[1], 6) for f in self.features}
+
+    def save(self, woe_path: str = "woe_maps.json", iv_path: str | None = None) -> None:
+        """
+        Write woe_maps.json (transformer format) and IV sidecar
+        (default: <woe_path stem>_iv.json).
+        """
+        if iv_path is None:
+            iv_path = woe_path.rsplit(".", 1)[0] + "_iv.json"
+        with open(woe_path, "w") as f:
+            json.dump(self.woe_maps(), f, indent=2)
+        with open(iv_path, "w") as f:
+            json.dump({
+                "rows": self.rows,
+                "unlabeled_rows_dropped": self.unlabeled,
+                "bad_rate": self.bads / self.rows if self.rows else None,
+                "iv": self.information_values(),
+            }, f, indent=2)
+
+
+# ============================================================
+# STREAMING / PARALLEL FITTING
+# ============================================================
+
+def fit_woe_csv(
+    path: str,
+    target: str = TARGET_COLUMN,
+    chunksize: int = 500_000
+) -> WOECounts:
+    """
+    Stream one labeled CSV in chunks (one chunk in memory).
+    """
+    counts = WOECounts()
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        counts.update(chunk, target)
+    return counts
+
+
+def fit_woe_csv_files(
+    paths,
+    target: str = TARGET_COLUMN,
+    chunksize: int = 500_000,
+    max_workers: int | None = None
+) -> WOECounts:
+    """
+    One worker process per file, partial counts merged.
+    """
+    total = WOECounts()
+    n = len(paths)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for partial in pool.map(fit_woe_csv, paths, [target] * n, [chunksize] * n):
+            total.merge(partial)
+    return total
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Fit woe_maps.json + IV from labeled training CSVs"
+    )
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--target", default=TARGET_COLUMN)
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="woe_maps_refit.json")
+    args = parser.parse_args()
+
+    counts = fit_woe_csv_files(args.paths, args.target, args.chunksize, args.workers)
+    counts.save(args.out)
+
+    for feature, iv in sorted(counts.information_values().items(), key=lambda kv: -kv[1]):
+        print(f"{feature:24s} IV={iv:.4f}")
+    print(f"{counts.rows} rows ({counts.unlabeled} unlabeled dropped) -> {args.out}")
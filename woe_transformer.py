@@ -8,16 +8,19 @@
 # ============================================================
 
 import json
+import os
+
+import numpy as np
 import pandas as pd
 from feature_schema import LR_FEATURES
+from model_registry import BINNING_ENV, load_woe_maps, register_override
 
 
 # ============================================================
 # Load WOE maps
 # ============================================================
 
-with open("woe_maps.json", "r") as f:
-    WOE_MAPS = json.load(f)
+WOE_MAPS = load_woe_maps()
 
 
 # ============================================================
@@ -118,105 +121,373 @@ def bin_percent_bc_gt_75(pct: float) -> str:
         return "75%+"
 
 
+def purpose_to_group(purpose) -> str:
+    if purpose in ["credit_card", "debt_consolidation"]:
+        return "debt"
+    elif purpose in ["home_improvement", "major_purchase"]:
+        return "home"
+    else:
+        return "other"
+
+
 # ============================================================
-# MAIN TRANSFORM FUNCTION
+# MAIN TRANSFORM FUNCTIONS
 # ============================================================
 
-def transform_user_input_to_woe(user_input: dict) -> pd.DataFrame:
+# LR feature -> (scalar binning function, raw column)
+SCALAR_BINNERS = {
+    "fico": (bin_fico, "fico"),
+    "dti": (bin_dti, "dti"),
+    "loan_amnt": (bin_loan_amnt, "loan_amnt"),
+    "revol_util": (bin_revol_util, "revol_util"),
+    "int_rate": (bin_int_rate, "int_rate"),
+    "credit_age": (bin_credit_age, "credit_age_months"),
+    "bc_util": (bin_bc_util, "bc_util"),
+    "percent_bc_gt_75": (bin_percent_bc_gt_75, "percent_bc_gt_75"),
+}
+
+
+def transform_user_input_to_bins(user_input: dict) -> dict:
     """
-    Convert RAW borrower input into EXACT WOE feature vector
-    matching LR training.
+    Convert RAW borrower input into the BIN LABEL of every
+    LR feature (the keys looked up in WOE_MAPS).
     """
 
-    data = {}
+    bins = {}
 
     # --------------------------------------------------------
     # CATEGORICAL
     # --------------------------------------------------------
 
-    data["emp_length"] = safe_woe("emp_length", user_input["emp_length"])
-    data["home_ownership"] = safe_woe("home_ownership", user_input["home_ownership"])
-    data["term"] = safe_woe("term", str(user_input["term"]))
-    data["verification_status"] = safe_woe(
-        "verification_status", user_input["verification_status"]
-    )
+    # same labels as bin_codes_batch: missing -> "Missing",
+    # integral floats without ".0" (see category_labels)
+    for f, column in CATEGORICAL_SOURCES.items():
+        if f != "purpose_group":
+            bins[f] = _category_label(user_input[column])
 
     # PURPOSE → PURPOSE_GROUP
-    purpose = user_input["purpose"]
-
-    if purpose in ["credit_card", "debt_consolidation"]:
-        purpose_group = "debt"
-    elif purpose in ["home_improvement", "major_purchase"]:
-        purpose_group = "home"
-    else:
-        purpose_group = "other"
-
-    data["purpose_group"] = safe_woe("purpose_group", purpose_group)
+    bins["purpose_group"] = purpose_to_group(user_input["purpose"])
 
     # --------------------------------------------------------
-    # NUMERIC (BINNED)
+    # NUMERIC (BINNED; fitted overrides are binned below)
     # --------------------------------------------------------
 
-    data["fico"] = safe_woe("fico", bin_fico(user_input["fico"]))
-    data["dti"] = safe_woe("dti", bin_dti(user_input["dti"]))
-    data["loan_amnt"] = safe_woe("loan_amnt", bin_loan_amnt(user_input["loan_amnt"]))
-    data["revol_util"] = safe_woe(
-        "revol_util", bin_revol_util(user_input["revol_util"])
-    )
-    data["int_rate"] = safe_woe(
-        "int_rate", bin_int_rate(user_input["int_rate"])
-    )
+    for f, (binner, column) in SCALAR_BINNERS.items():
+        if f in BINNING_OVERRIDES:
+            continue
+        if column in OPTIONAL_SOURCES:
+            value = user_input.get(column, OPTIONAL_SOURCES[column])
+        else:
+            value = user_input[column]
+        # coerce like the batch path (None / text -> NaN -> top bin)
+        bins[f] = binner(_as_float(value))
 
     # --------------------------------------------------------
-    # CREDIT AGE
+    # FITTED BINS (apply_binning) replace the cut points above
     # --------------------------------------------------------
 
-    credit_age = user_input.get("credit_age_months", 0)
-    data["credit_age"] = safe_woe("credit_age", bin_credit_age(credit_age))
+    for f in BINNING_OVERRIDES:
+        column, edges, labels = NUMERIC_BINS[f]
+        value = pd.to_numeric(user_input.get(column, OPTIONAL_SOURCES.get(column)), errors="coerce")
+        if pd.isna(value):
+            bins[f] = MISSING_LABEL
+        else:
+            bins[f] = labels[int(np.searchsorted(edges, float(value), side="right"))]
+
+    return bins
+
+
+def transform_user_input_to_woe(user_input: dict) -> pd.DataFrame:
+    """
+    Convert RAW borrower input into EXACT WOE feature vector
+    matching LR training.
+    """
+
+    bins = transform_user_input_to_bins(user_input)
 
     # --------------------------------------------------------
-    # COUNT / RATIO FEATURES
+    # FINAL – ENFORCE EXACT FEATURE ORDER
     # --------------------------------------------------------
 
-    data["inq_last_6mths"] = safe_woe(
-        "inq_last_6mths", str(user_input["inq_last_6mths"])
+    return pd.DataFrame(
+        [[safe_woe(f, bins[f]) for f in LR_FEATURES]], columns=LR_FEATURES
     )
 
-    data["acc_open_past_24mths"] = safe_woe(
-        "acc_open_past_24mths", str(user_input["acc_open_past_24mths"])
-    )
 
-    data["mo_sin_rcnt_tl"] = safe_woe(
-        "mo_sin_rcnt_tl", str(user_input["mo_sin_rcnt_tl"])
-    )
+# ============================================================
+# BATCH (VECTORISED) TRANSFORM
+# ------------------------------------------------------------
+# Same cut points as the scalar binning functions above,
+# expressed as edge tables so a whole column is binned with
+# one np.searchsorted call ("x < edge" chains == side="right").
+#
+# Every LR feature is reduced to integer BIN CODES indexing
+# into bin_labels(feature). One extra trailing code marks an
+# unmatched value (safe_woe fallback -> WOE 0.0).
+# ============================================================
 
-    data["mths_since_recent_inq"] = safe_woe(
-        "mths_since_recent_inq", str(user_input["mths_since_recent_inq"])
-    )
+NUMERIC_BINS = {
+    # LR feature : (raw column, edges, labels)
+    "fico": ("fico", [580, 670, 740],
+             ["<580", "580-669", "670-739", "740+"]),
+    "dti": ("dti", [20, 35],
+            ["<20", "20-34", "35+"]),
+    "loan_amnt": ("loan_amnt", [5000, 10000, 20000],
+                  ["<5k", "5k-10k", "10k-20k", "20k+"]),
+    "revol_util": ("revol_util", [30, 60],
+                   ["<30%", "30-59%", "60%+"]),
+    "int_rate": ("int_rate", [10, 15, 20],
+                 ["<10%", "10-15%", "15-20%", "20%+"]),
+    "credit_age": ("credit_age_months", [24, 60, 120],
+                   ["<2y", "2-5y", "5-10y", "10y+"]),
+    "bc_util": ("bc_util", [30, 60, 75],
+                ["<30%", "30-59%", "60-74%", "75%+"]),
+    # exact zero is split out to "0%" in bin_codes_batch
+    "percent_bc_gt_75": ("percent_bc_gt_75", [25, 50, 75],
+                         ["1-24%", "25-49%", "50-74%", "75%+"]),
+}
+
+# LR feature : raw column looked up (as string) in WOE_MAPS
+CATEGORICAL_SOURCES = {
+    "emp_length": "emp_length",
+    "home_ownership": "home_ownership",
+    "purpose_group": "purpose",
+    "term": "term",
+    "verification_status": "verification_status",
+    "inq_last_6mths": "inq_last_6mths",
+    "acc_open_past_24mths": "acc_open_past_24mths",
+    "mo_sin_rcnt_tl": "mo_sin_rcnt_tl",
+    "mths_since_recent_inq": "mths_since_recent_inq",
+    "annual_inc": "annual_inc",
+}
+
+# Columns that default instead of raising when absent
+# (mirrors user_input.get(...) in the scalar transform)
+OPTIONAL_SOURCES = {"credit_age_months": 0}
+
+# LR feature -> fitted spec from optimal_binning.py
+BINNING_OVERRIDES = {}
+
+
+def _zero_bin(feature: str) -> bool:
+    # hand-written percent_bc_gt_75 bins split out exact zero
+    return feature == "percent_bc_gt_75" and feature not in BINNING_OVERRIDES
+
+
+def bin_labels(feature: str) -> list:
+    """
+    Ordered bin labels for an LR feature. Bin code i refers to
+    bin_labels(feature)[i]; code len(labels) means unmatched.
+    """
+    if feature in NUMERIC_BINS:
+        labels = list(NUMERIC_BINS[feature][2])
+        if _zero_bin(feature):
+            labels = ["0%"] + labels
+        if feature in BINNING_OVERRIDES:
+            labels = labels + [MISSING_LABEL]
+        return labels
+    return list(WOE_MAPS.get(feature, {}).keys())
 
-    # --------------------------------------------------------
-    # BC FEATURES
-    # --------------------------------------------------------
 
-    data["bc_util"] = safe_woe(
-        "bc_util", bin_bc_util(user_input["bc_util"])
-    )
+MISSING_LABEL = "Missing"
 
-    data["percent_bc_gt_75"] = safe_woe(
-        "percent_bc_gt_75",
-        bin_percent_bc_gt_75(user_input["percent_bc_gt_75"])
-    )
 
-    # --------------------------------------------------------
-    # ANNUAL INCOME (as string category)
-    # --------------------------------------------------------
+def _as_float(value) -> float:
+    # scalar pd.to_numeric(value, errors="coerce")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _category_label(value) -> str:
+    if value is None or (isinstance(value, (float, np.floating)) and np.isnan(value)):
+        return MISSING_LABEL
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
 
-    data["annual_inc"] = safe_woe(
-        "annual_inc", str(user_input["annual_inc"])
+
+def category_labels(values: pd.Series) -> pd.Series:
+    """
+    String label per categorical value, independent of column
+    dtype: integral floats drop ".0" (a column forced to float
+    by a NaN gives "1", like str(1)); missing -> MISSING_LABEL.
+    """
+    return values.map(_category_label)
+
+
+def _source_values(df: pd.DataFrame, column: str) -> pd.Series:
+    if column in df.columns:
+        return df[column]
+    if column in OPTIONAL_SOURCES:
+        return pd.Series(OPTIONAL_SOURCES[column], index=df.index)
+    raise KeyError(column)
+
+
+def bin_codes_batch(feature: str, df: pd.DataFrame) -> np.ndarray:
+    """
+    Bin one LR feature for every row of a raw-input DataFrame.
+
+    Returns
+    -------
+    np.ndarray (int16)
+        Codes into bin_labels(feature); len(labels) = unmatched
+    """
+    if feature in NUMERIC_BINS:
+        column, edges, _ = NUMERIC_BINS[feature]
+        if feature in BINNING_OVERRIDES and column not in df.columns:
+            # fitted bins: an absent column is missing, like the scalar path
+            values = np.full(len(df), OPTIONAL_SOURCES.get(column, np.nan), dtype=float)
+        else:
+            values = pd.to_numeric(
+                _source_values(df, column), errors="coerce"
+            ).to_numpy(dtype=float)
+        codes = np.searchsorted(edges, values, side="right")
+
+        if _zero_bin(feature):
+            codes = np.where(values == 0, 0, codes + 1)
+        if feature in BINNING_OVERRIDES:
+            # explicit Missing bin, last label
+            codes = np.where(np.isnan(values), len(edges) + 1, codes)
+
+        return codes.astype(np.int16)
+
+    values = _source_values(df, CATEGORICAL_SOURCES[feature])
+    if feature == "purpose_group":
+        values = values.map(purpose_to_group)
+
+    labels = bin_labels(feature)
+    codes = pd.Categorical(category_labels(values), categories=labels).codes
+    return np.where(codes < 0, len(labels), codes).astype(np.int16)
+
+
+def woe_table(feature: str) -> np.ndarray:
+    """
+    WOE value per bin code (trailing 0.0 for unmatched codes).
+    """
+    return np.array(
+        [safe_woe(feature, label) for label in bin_labels(feature)] + [0.0]
     )
 
-    # --------------------------------------------------------
-    # FINAL – ENFORCE EXACT FEATURE ORDER
-    # --------------------------------------------------------
 
-    return pd.DataFrame([[data[f] for f in LR_FEATURES]], columns=LR_FEATURES)
+WOE_TABLES = {f: woe_table(f) for f in LR_FEATURES}
+
+# label -> bin code, for single-borrower lookups
+BIN_CODES = {
+    f: {label: i for i, label in enumerate(bin_labels(f))}
+    for f in LR_FEATURES
+}
+
+
+def bin_codes(user_input: dict) -> dict:
+    """
+    Single-borrower bin codes (same coding as bin_codes_batch).
+    """
+    bins = transform_user_input_to_bins(user_input)
+    return {
+        f: BIN_CODES[f].get(str(bins[f]), len(BIN_CODES[f]))
+        for f in LR_FEATURES
+    }
+
+
+def transform_batch_to_woe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorised transform_user_input_to_woe for many borrowers.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        One row per borrower, raw input columns
+
+    Returns
+    -------
+    pd.DataFrame
+        WOE features in LR_FEATURES order, same index as df
+    """
+    data = {
+        f: WOE_TABLES[f][bin_codes_batch(f, df)]
+        for f in LR_FEATURES
+    }
+    return pd.DataFrame(data, index=df.index, columns=LR_FEATURES)
+
+
+def check_parity(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Bin every row of df through both the scalar (bin_codes) and
+    the batch (bin_codes_batch) path.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (row, feature) where the codes differ
+        (empty when the paths agree)
+    """
+    batch = {f: bin_codes_batch(f, df) for f in LR_FEATURES}
+    rows = []
+    for i, (index, record) in enumerate(zip(df.index, df.to_dict("records"))):
+        scalar = bin_codes(record)
+        for f in LR_FEATURES:
+            if scalar[f] != batch[f][i]:
+                rows.append({
+                    "row": index,
+                    "feature": f,
+                    "scalar_code": scalar[f],
+                    "batch_code": int(batch[f][i]),
+                })
+    return pd.DataFrame(rows, columns=["row", "feature", "scalar_code", "batch_code"])
+
+
+# ============================================================
+# FITTED BINNING OVERRIDES
+# ------------------------------------------------------------
+# optimal_binning.py emits {feature: {"column", "edges",
+# "labels", "woe", ...}}. Applying it swaps the edge table,
+# labels and WOE for those features in both the scalar and the
+# batch transforms. Set CREDIT_RISK_BINNING=<json path> to
+# apply at import, before any lookup tables are derived from
+# WOE_TABLES (reason_codes, low_memory_scoring).
+# NOTE: the LR coefficients must be refit on the new bins.
+# ============================================================
+
+def apply_binning(spec) -> None:
+    """
+    Override numeric bins + WOE from an optimal_binning spec
+    (dict or JSON path). Missing values of those features map
+    to a MISSING_LABEL bin (spec "missing_woe", default 0.0).
+
+    WOE_MAPS is rebound to a new dict; the registry's cached
+    woe_maps.json object is never modified.
+    """
+    global WOE_MAPS
+
+    source = "<dict>"
+    if isinstance(spec, str):
+        source = spec
+        with open(spec, "r") as f:
+            spec = json.load(f)
+
+    for feature, s in spec.items():
+        if len(s["labels"]) != len(s["edges"]) + 1 or len(s["woe"]) != len(s["labels"]):
+            raise ValueError(f"inconsistent binning spec for {feature}")
+
+    for feature, s in spec.items():
+        # the active spec is part of model_registry.loaded_fingerprint
+        register_override(
+            f"binning:{feature}", source, json.dumps(s, sort_keys=True).encode()
+        )
+
+        BINNING_OVERRIDES[feature] = s
+        NUMERIC_BINS[feature] = (s["column"], list(s["edges"]), list(s["labels"]))
+        woe = dict(zip(s["labels"], s["woe"]))
+        woe[MISSING_LABEL] = s.get("missing_woe", 0.0)
+        WOE_MAPS = {**WOE_MAPS, feature: woe}
+        WOE_TABLES[feature] = woe_table(feature)
+        BIN_CODES[feature] = {
+            label: i for i, label in enumerate(bin_labels(feature))
+        }
+
+
+BINNING_PATH = os.environ.get(BINNING_ENV)
+if BINNING_PATH:
+    apply_binning(BINNING_PATH)
@@ -1,9 +1,10 @@
 
-import json
-import joblib
 import numpy as np
 import pandas as pd
 
+from latency import stage
+from model_registry import load_xgb_model, load_xgb_features
+
 
 # ============================================================
 # Load trained XGBoost model + feature order
@@ -12,10 +13,8 @@ import pandas as pd
 MODEL_PATH = "xgb_model.joblib"
 FEATURE_PATH = "xgb_features.json"
 
-xgb_model = joblib.load(MODEL_PATH)
-
-with open(FEATURE_PATH, "r") as f:
-    FEATURE_ORDER = json.load(f)
+xgb_model = load_xgb_model(MODEL_PATH)
+FEATURE_ORDER = load_xgb_features(FEATURE_PATH)
 
 
 # ============================================================
@@ -41,7 +40,8 @@ def predict_pd_xgb(user_input: dict) -> float:
     # --------------------------------------------------------
     # Step 1: Convert input to DataFrame
     # --------------------------------------------------------
-    df_input = pd.DataFrame([user_input])
+    with stage("predict_pd_xgb.build_frame"):
+        df_input = pd.DataFrame([user_input])
 
     # --------------------------------------------------------
     # Step 2: Defensive check for missing features
@@ -61,7 +61,8 @@ def predict_pd_xgb(user_input: dict) -> float:
     # Step 4: Predict PD
     # predict_proba -> [P(non-default), P(default)]
     # --------------------------------------------------------
-    pd_value = xgb_model.predict_proba(df_input)[:, 1][0]
+    with stage("predict_pd_xgb.predict_proba"):
+        pd_value = xgb_model.predict_proba(df_input)[:, 1][0]
 
     # --------------------------------------------------------
     # Step 5: Numerical safety
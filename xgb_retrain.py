@@ -0,0 +1,307 @@
+# ============================================================
+# xgb_retrain.py
+# ------------------------------------------------------------
+# External-memory retraining of the XGBoost challenger
+# - CSVChunkIter (xgboost.DataIter) rebuilds the
+#   xgb_features.json feature space chunk by chunk with
+#   prepare_xgb_input_batch; xgboost quantises each chunk into
+#   an on-disk page cache (ExtMemQuantileDMatrix), so the
+#   training set is never fully in RAM
+# - The page cache lives in a temporary directory removed
+#   after training, unless the caller passes cache_dir
+# - Rows without a usable target are skipped
+# - Hyperparameters default to the deployed challenger's
+# - Optional validation file: early stopping + Platt (sigmoid)
+#   calibration on a bounded sample, like the deployed model
+# - Output: drop-in xgb_model.joblib + xgb_features.json
+# - Needs scikit-learn>=1.6 (FrozenEstimator) and xgboost>=3.0
+#   (ExtMemQuantileDMatrix), newer than requirements.txt; they
+#   are checked when retrain_xgb runs, so importing this module
+#   never forces the upgrade on the scoring path
+# ============================================================
+
+import importlib.util
+import json
+import os
+import tempfile
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.calibration import CalibratedClassifierCV
+
+from feature_pipeline import XGB_TRAIN_FEATURES, prepare_xgb_input_batch
+from model_registry import load_xgb_model
+from woe_fitter import TARGET_COLUMN
+
+
+# Parameters copied from the deployed challenger's fold model
+PARAM_KEYS = (
+    "objective", "learning_rate", "max_depth", "min_child_weight",
+    "subsample", "colsample_bytree", "scale_pos_weight", "eval_metric",
+    "random_state",
+)
+
+
+# ============================================================
+# CHUNKED DATA ITERATOR
+# ============================================================
+
+def _labeled(chunk: pd.DataFrame, target: str) -> tuple:
+    """
+    (rows with a numeric target, target array).
+    """
+    y = pd.to_numeric(chunk[target], errors="coerce")
+    keep = y.notna()
+    return chunk[keep], y[keep].to_numpy()
+
+
+class CSVChunkIter(xgb.DataIter):
+    """
+    Feeds labeled raw CSV chunks, encoded into XGB_TRAIN_FEATURES,
+    to xgboost one at a time.
+    """
+
+    def __init__(self, paths, target: str, chunksize: int, cache_prefix: str):
+        self.paths = list(paths)
+        self.target = target
+        self.chunksize = chunksize
+        self._file = 0
+        self._reader = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def _next_chunk(self):
+        while self._file < len(self.paths):
+            if self._reader is None:
+                self._reader = pd.read_csv(self.paths[self._file], chunksize=self.chunksize)
+            try:
+                return next(self._reader)
+            except StopIteration:
+                self._reader.close()
+                self._reader = None
+                self._file += 1
+        return None
+
+    def next(self, input_data) -> bool:
+        while True:
+            chunk = self._next_chunk()
+            if chunk is None:
+                return False
+            chunk, y = _labeled(chunk, self.target)
+            if not chunk.empty:
+                break
+        input_data(
+            data=prepare_xgb_input_batch(chunk).to_numpy(dtype=np.float32),
+            label=y.astype(np.float32),
+            feature_names=XGB_TRAIN_FEATURES,
+        )
+        return True
+
+    def reset(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+        self._file = 0
+        self._reader = None
+
+
+# ============================================================
+# TRAINING
+# ============================================================
+
+def deployed_params() -> tuple:
+    """
+    (xgb.train params, n_estimators) of the deployed challenger.
+    """
+    model = load_xgb_model()
+    est = model.calibrated_classifiers_[0].estimator if hasattr(
+        model, "calibrated_classifiers_") else model
+    p = est.get_params()
+
+    params = {k: p[k] for k in PARAM_KEYS if p.get(k) is not None}
+    params["seed"] = params.pop("random_state", 0)
+    params["eta"] = params.pop("learning_rate", 0.3)
+    params["tree_method"] = "hist"
+    return params, p.get("n_estimators") or 100
+
+
+def _sample(path: str, target: str, max_rows: int, chunksize: int) -> tuple:
+    """
+    First max_rows of a labeled CSV, encoded (bounded memory).
+    """
+    parts, n = [], 0
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        chunk, _ = _labeled(chunk, target)
+        parts.append(chunk.iloc[: max_rows - n])
+        n += len(parts[-1])
+        if n >= max_rows:
+            break
+    df = pd.concat(parts, ignore_index=True)
+    y = pd.to_numeric(df[target]).to_numpy(dtype=int)
+    return prepare_xgb_input_batch(df), y
+
+
+def _train_booster(
+    train_paths: list,
+    valid_path: str | None,
+    target: str,
+    chunksize: int,
+    params: dict,
+    num_boost_round: int,
+    early_stopping_rounds: int | None,
+    cache_dir: str,
+    verbose: bool
+) -> xgb.Booster:
+    train_iter = CSVChunkIter(
+        train_paths, target, chunksize, os.path.join(cache_dir, "train")
+    )
+    dtrain = xgb.ExtMemQuantileDMatrix(train_iter)
+
+    evals, stopping = [], None
+    if valid_path is not None:
+        valid_iter = CSVChunkIter(
+            [valid_path], target, chunksize, os.path.join(cache_dir, "valid")
+        )
+        evals = [(xgb.ExtMemQuantileDMatrix(valid_iter, ref=dtrain), "valid")]
+        stopping = early_stopping_rounds
+
+    booster = xgb.train(
+        params,
+        dtrain,
+        num_boost_round=num_boost_round,
+        evals=evals,
+        early_stopping_rounds=stopping,
+        verbose_eval=verbose,
+    )
+    if stopping and booster.best_iteration + 1 < booster.num_boosted_rounds():
+        booster = booster[: booster.best_iteration + 1]
+    return booster
+
+
+def _require_training_libraries() -> None:
+    missing = []
+    if importlib.util.find_spec("sklearn.frozen") is None:
+        missing.append("scikit-learn>=1.6")
+    if not hasattr(xgb, "ExtMemQuantileDMatrix"):
+        missing.append("xgboost>=3.0")
+    if missing:
+        raise ImportError(
+            "xgb_retrain requires " + " and ".join(missing)
+            + " (pip install -U " + " ".join(f"'{m}'" for m in missing) + ")"
+        )
+
+
+def retrain_xgb(
+    train_paths,
+    valid_path: str | None = None,
+    target: str = TARGET_COLUMN,
+    chunksize: int = 500_000,
+    num_boost_round: int | None = None,
+    early_stopping_rounds: int | None = 30,
+    params: dict | None = None,
+    cache_dir: str | None = None,
+    calibration_rows: int = 500_000,
+    verbose: bool = False
+):
+    """
+    Train the challenger from chunked files in external memory.
+
+    Parameters
+    ----------
+    train_paths : str or list[str]
+        Labeled raw training CSV(s)
+    valid_path : str, optional
+        Labeled raw validation CSV: early stopping (streamed)
+        and sigmoid calibration (first calibration_rows rows)
+    num_boost_round : int, optional
+        Default: the deployed model's n_estimators
+    params : dict, optional
+        Overrides on top of deployed_params()
+    cache_dir : str, optional
+        Where xgboost writes its quantised page cache (kept);
+        default: a temporary directory removed after training
+
+    Returns
+    -------
+    CalibratedClassifierCV (with valid_path) or XGBClassifier;
+    both expose predict_proba over XGB_TRAIN_FEATURES
+    """
+    _require_training_libraries()
+
+    if isinstance(train_paths, str):
+        train_paths = [train_paths]
+
+    base_params, n_estimators = deployed_params()
+    base_params.update(params or {})
+    num_boost_round = num_boost_round or n_estimators
+
+    tmp = None
+    if cache_dir is None:
+        tmp = tempfile.TemporaryDirectory(prefix="xgb_extmem_")
+        cache_dir = tmp.name
+    os.makedirs(cache_dir, exist_ok=True)
+
+    try:
+        # the DMatrix page caches are released when this returns
+        booster = _train_booster(
+            train_paths, valid_path, target, chunksize, base_params,
+            num_boost_round, early_stopping_rounds, cache_dir, verbose,
+        )
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    # sklearn wrapper so the artifact keeps the predict_proba API
+    clf = xgb.XGBClassifier()
+    clf.load_model(bytearray(booster.save_raw("json")))
+
+    if valid_path is None:
+        return clf
+
+    from sklearn.frozen import FrozenEstimator
+
+    X_cal, y_cal = _sample(valid_path, target, calibration_rows, chunksize)
+    return CalibratedClassifierCV(FrozenEstimator(clf), method="sigmoid").fit(X_cal, y_cal)
+
+
+def save_artifacts(
+    model,
+    model_path: str = "xgb_model_retrained.joblib",
+    features_path: str = "xgb_features_retrained.json"
+) -> None:
+    """
+    Drop-in replacements for xgb_model.joblib / xgb_features.json.
+    """
+    joblib.dump(model, model_path)
+    with open(features_path, "w") as f:
+        json.dump(XGB_TRAIN_FEATURES, f)
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="External-memory retraining of the XGBoost challenger"
+    )
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--valid", default=None)
+    parser.add_argument("--target", default=TARGET_COLUMN)
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    parser.add_argument("--rounds", type=int, default=None)
+    parser.add_argument("--early-stopping", type=int, default=30)
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--out", default="xgb_model_retrained.joblib")
+    parser.add_argument("--features-out", default="xgb_features_retrained.json")
+    args = parser.parse_args()
+
+    model = retrain_xgb(
+        args.paths, args.valid, args.target, args.chunksize, args.rounds,
+        args.early_stopping, cache_dir=args.cache_dir, verbose=True
+    )
+    save_artifacts(model, args.out, args.features_out)
+    print(f"-> {args.out}, {args.features_out}")
@@ -0,0 +1,308 @@
+# ============================================================
+# xgb_tuning.py
+# ------------------------------------------------------------
+# Parallel, resumable hyperparameter search for the challenger
+# - The encoded training / validation matrices are built ONCE
+#   (prepare_xgb_input_batch, chunked) and cached as .npy
+# - Each worker process memory-maps the cache and quantises it
+#   ONCE (QuantileDMatrix, fixed max_bin) in the pool
+#   initializer; every trial it runs reuses those matrices
+# - Fixed thread budget per trial (nthread); workers =
+#   total threads // threads per trial
+# - Early stopping on the validation split
+# - Every finished trial is appended to a JSONL log; rerunning
+#   skips trial ids already in it (interrupted searches resume)
+# - A trial that raises is logged as failed and the search
+#   goes on; failed trials are retried on the next run
+# - The matrix cache is written into preallocated .npy memmaps
+#   (never concatenated in RAM); unlabeled rows are skipped
+# ============================================================
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from feature_pipeline import XGB_TRAIN_FEATURES, prepare_xgb_input_batch
+from woe_fitter import TARGET_COLUMN
+from xgb_retrain import deployed_params
+
+
+# name : (scale, low, high)
+SEARCH_SPACE = {
+    "max_depth": ("int", 3, 8),
+    "eta": ("log", 0.01, 0.3),
+    "min_child_weight": ("log", 1, 100),
+    "subsample": ("float", 0.5, 1.0),
+    "colsample_bytree": ("float", 0.5, 1.0),
+    "lambda": ("log", 0.1, 10.0),
+}
+
+MAX_BIN = 256
+
+
+# ============================================================
+# MATRIX CACHE (built once)
+# ============================================================
+
+def _labels(path: str, target: str, chunksize: int) -> np.ndarray:
+    """
+    Target column only (cheap pass): float32, NaN where missing.
+    """
+    return np.concatenate([
+        pd.to_numeric(chunk[target], errors="coerce").to_numpy(dtype=np.float32)
+        for chunk in pd.read_csv(path, usecols=[target], chunksize=chunksize)
+    ])
+
+
+def build_matrix_cache(
+    train_path: str,
+    cache_dir: str,
+    valid_path: str | None = None,
+    valid_fraction: float = 0.2,
+    target: str = TARGET_COLUMN,
+    chunksize: int = 500_000,
+    seed: int = 0
+) -> dict:
+    """
+    Encode train / validation data into float32 .npy files.
+
+    Without valid_path, rows are split at random (valid_fraction).
+    Rows without a usable target are skipped. A cheap pass over
+    the target column sizes the splits; encoded chunks are then
+    written straight into preallocated memory-mapped .npy files,
+    so the full matrix is never held in RAM.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    splits = ("train", "valid")
+
+    # per file: (path, labels, split code per row: -1 skip, 0 train, 1 valid)
+    sources = []
+    y = _labels(train_path, target, chunksize)
+    if valid_path is None:
+        code = (rng.random(len(y)) < valid_fraction).astype(np.int8)
+        sources.append((train_path, y, np.where(np.isnan(y), -1, code)))
+    else:
+        sources.append((train_path, y, np.where(np.isnan(y), -1, 0)))
+        y = _labels(valid_path, target, chunksize)
+        sources.append((valid_path, y, np.where(np.isnan(y), -1, 1)))
+
+    sizes = {}
+    X_out, pos = {}, {}
+    for k, split in enumerate(splits):
+        labels = np.concatenate([y[code == k] for _, y, code in sources])
+        np.save(os.path.join(cache_dir, f"y_{split}.npy"), labels)
+        sizes[split] = len(labels)
+        X_out[split] = np.lib.format.open_memmap(
+            os.path.join(cache_dir, f"X_{split}.npy"), mode="w+",
+            dtype=np.float32, shape=(len(labels), len(XGB_TRAIN_FEATURES)),
+        )
+        pos[split] = 0
+
+    for path, _, code in sources:
+        offset = 0
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            c = code[offset:offset + len(chunk)]
+            offset += len(chunk)
+            for k, split in enumerate(splits):
+                rows = chunk[c == k]
+                if rows.empty:
+                    continue
+                X = prepare_xgb_input_batch(rows).to_numpy(dtype=np.float32)
+                X_out[split][pos[split]:pos[split] + len(X)] = X
+                pos[split] += len(X)
+
+    for split in splits:
+        X_out[split].flush()
+        if pos[split] != sizes[split]:
+            raise ValueError(f"{split}: wrote {pos[split]} of {sizes[split]} rows")
+    del X_out
+    return sizes
+
+
+# ============================================================
+# WORKER (one quantised matrix pair per process)
+# ============================================================
+
+_DTRAIN = None
+_DVALID = None
+
+
+def _init_worker(cache_dir: str, max_bin: int, nthread: int) -> None:
+    global _DTRAIN, _DVALID
+
+    def load(name):
+        return np.load(os.path.join(cache_dir, name), mmap_mode="r")
+
+    _DTRAIN = xgb.QuantileDMatrix(
+        load("X_train.npy"), load("y_train.npy"),
+        feature_names=XGB_TRAIN_FEATURES, max_bin=max_bin, nthread=nthread,
+    )
+    _DVALID = xgb.QuantileDMatrix(
+        load("X_valid.npy"), load("y_valid.npy"),
+        feature_names=XGB_TRAIN_FEATURES, ref=_DTRAIN, nthread=nthread,
+    )
+
+
+def _run_trial(
+    trial_id: int,
+    params: dict,
+    num_boost_round: int,
+    early_stopping_rounds: int
+) -> dict:
+    start = time.perf_counter()
+    evals_result = {}
+    booster = xgb.train(
+        params,
+        _DTRAIN,
+        num_boost_round=num_boost_round,
+        evals=[(_DVALID, "valid")],
+        early_stopping_rounds=early_stopping_rounds,
+        evals_result=evals_result,
+        verbose_eval=False,
+    )
+    best = booster.best_iteration
+    return {
+        "trial": trial_id,
+        "params": params,
+        "best_iteration": int(best),
+        "valid_logloss": float(evals_result["valid"]["logloss"][best]),
+        "valid_auc": float(evals_result["valid"]["auc"][best]),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+# ============================================================
+# SEARCH DRIVER
+# ============================================================
+
+def sample_params(trial_id: int, seed: int = 0, space: dict | None = None) -> dict:
+    """
+    Deterministic random-search draw for one trial id.
+    """
+    rng = np.random.default_rng([seed, trial_id])
+    params = {}
+    for name, (scale, low, high) in (space or SEARCH_SPACE).items():
+        if scale == "int":
+            params[name] = int(rng.integers(low, high + 1))
+        elif scale == "log":
+            params[name] = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+        else:
+            params[name] = float(rng.uniform(low, high))
+    return params
+
+
+def load_trials(results_path: str) -> list:
+    if not os.path.exists(results_path):
+        return []
+    with open(results_path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def tune(
+    cache_dir: str,
+    n_trials: int = 50,
+    results_path: str = "xgb_tuning_trials.jsonl",
+    threads_per_trial: int = 1,
+    max_workers: int | None = None,
+    num_boost_round: int = 1000,
+    early_stopping_rounds: int = 50,
+    space: dict | None = None,
+    seed: int = 0,
+    max_bin: int = MAX_BIN
+) -> pd.DataFrame:
+    """
+    Run (or resume) a random search over `space`.
+
+    Returns
+    -------
+    pd.DataFrame
+        Latest record per trial, best validation AUC first;
+        status "failed" rows (with "error") sort last
+    """
+    done = {t["trial"] for t in load_trials(results_path) if t.get("status") != "failed"}
+    pending = [i for i in range(n_trials) if i not in done]
+
+    if max_workers is None:
+        max_workers = max(1, (os.cpu_count() or 1) // threads_per_trial)
+
+    base, _ = deployed_params()
+    base.update({
+        "eval_metric": ["logloss", "auc"],
+        "nthread": threads_per_trial,
+        "max_bin": max_bin,
+    })
+
+    if pending:
+        with ProcessPoolExecutor(
+            max_workers=min(max_workers, len(pending)),
+            initializer=_init_worker,
+            initargs=(cache_dir, max_bin, threads_per_trial),
+        ) as pool, open(results_path, "a") as log:
+            futures = {}
+            for i in pending:
+                params = {**base, **sample_params(i, seed, space)}
+                futures[pool.submit(
+                    _run_trial, i, params, num_boost_round, early_stopping_rounds,
+                )] = (i, params)
+
+            for future in as_completed(futures):
+                i, params = futures[future]
+                try:
+                    record = {**future.result(), "status": "ok"}
+                except Exception as e:
+                    # one bad trial must not abort the search
+                    record = {"trial": i, "params": params, "status": "failed", "error": repr(e)}
+                log.write(json.dumps(record) + "\n")
+                log.flush()
+
+    # latest record per trial (failed trials are retried on resume)
+    trials = pd.DataFrame(load_trials(results_path)).drop_duplicates("trial", keep="last")
+    if "valid_auc" not in trials:
+        trials["valid_auc"] = np.nan
+    return trials.sort_values("valid_auc", ascending=False).reset_index(drop=True)
+
+
+# ============================================================
+# CLI
+# ============================================================
+
+if __name__ == "__main__":
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Parallel, resumable XGBoost hyperparameter search"
+    )
+    parser.add_argument("train_path")
+    parser.add_argument("--valid", default=None)
+    parser.add_argument("--target", default=TARGET_COLUMN)
+    parser.add_argument("--cache-dir", default="xgb_tuning_cache")
+    parser.add_argument("--trials", type=int, default=50)
+    parser.add_argument("--threads-per-trial", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rounds", type=int, default=1000)
+    parser.add_argument("--early-stopping", type=int, default=50)
+    parser.add_argument("--results", default="xgb_tuning_trials.jsonl")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(args.cache_dir, "X_train.npy")):
+        sizes = build_matrix_cache(
+            args.train_path, args.cache_dir, args.valid, target=args.target, seed=args.seed
+        )
+        print(f"matrix cache: {sizes}")
+
+    trials = tune(
+        args.cache_dir, args.trials, args.results, args.threads_per_trial,
+        args.workers, args.rounds, args.early_stopping, seed=args.seed,
+    )
+    best = trials.iloc[0]
+    columns = ["trial", "status", "valid_auc", "valid_logloss", "best_iteration"]
+    print(trials.reindex(columns=columns).head(10).to_string(index=False))
+    print(f"best trial {best['trial']}: {json.dumps(best['params'])}")